@@ -8,6 +8,8 @@ import os
 import json
 import plotly.express as px
 
+from utils.sheets import read_sales_and_leads
+
 st.set_page_config(
     page_title="Dashboard PSI - Resumo",
     page_icon="📊",
@@ -313,15 +315,9 @@ def main():
         client = gspread.authorize(creds)
 
         # Carregar dados
-        sheet_vendas = client.open("[PAX] CENTRAL DADOS").worksheet('central_vendas')
-        sheet_leads = client.open("[PAX] CENTRAL DADOS").worksheet('central_leads')
-        
-        data_vendas = pd.DataFrame(sheet_vendas.get_all_records())
-        data_leads = pd.DataFrame(sheet_leads.get_all_records())
-        
-        # Converter datas
-        data_vendas['Data'] = pd.to_datetime(data_vendas['Data'], dayfirst=True)
-        data_leads['Submitted At'] = pd.to_datetime(data_leads['Submitted At'], dayfirst=True)
+        spreadsheet = client.open("[PAX] CENTRAL DADOS")
+        data_vendas, data_leads = read_sales_and_leads(spreadsheet)
+        # As colunas 'Data' e 'Submitted At' já chegam como datas (formato dia/mês detectado na leitura)
         
         # Obter mês e ano atual
         hoje = datetime.today()
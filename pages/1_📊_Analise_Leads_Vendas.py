@@ -11,102 +11,75 @@ import matplotlib.pyplot as plt
 from collections import Counter
 import re
 
-def create_comparison_analysis(dados_filtrados_vendas, dados_filtrados_leads):
-    # Mapping of similar fields between leads and sales
-    field_mapping = {
-        'Idade': {
-            'leads': 'Qual a sua idade?',
-            'vendas': 'Qual a sua idade?'
-        },
-        'Estado Civil': {
-            'leads': 'Qual é o seu estado civil?',
-            'vendas': 'Qual é o seu estado civil?'
-        },
-        'Escolaridade': {
-            'leads': 'Qual é o seu nível de escolaridade?',
-            'vendas': 'Qual é o seu nível de escolaridade?'
-        },
-        'Experiência com TCC': {
-            'leads': 'Já fez terapia com uma psicóloga da abordagem da TCC (Terapia Cognitivo Comportamental) antes?',
-            'vendas': 'Já fez terapia com uma psicóloga da abordagem da TCC Terapia Cognitivo Comportamental antes?'
-        },
-        'Motivo Terapia': {
-            'leads': 'Qual seria o principal motivo para buscar terapia?',
-            'vendas': 'Qual seria o principal motivo para buscar terapia?'
-        },
-        'Renda': {
-            'leads': 'Selecione a sua média de renda familiar.',
-            'vendas': 'Selecione a sua média de renda familiar.'
-        },
-        'Estado Emocional': {
-            'leads': 'Como você se sente hoje com relação a suas emoções e relacionamentos?',
-            'vendas': 'Como você se sente hoje com relação a suas emoções e relacionamentos?'
-        },
-        'Maior Desafio': {
-            'leads': 'Com base na sua resposta anterior, qual está sendo o seu maior desafio?',
-            'vendas': 'Com base na sua resposta anterior, qual está sendo o seu maior desafio?'
-        },
-        'Capacidade de Lidar': {
-            'leads': 'Você se sente capaz de lidar com as demandas diárias ou está se sentindo sobrecarregado(a)?',
-            'vendas': 'Você se sente capaz de lidar com as demandas diárias ou está se sentindo sobrecarregado(a)?'
-        },
-        'Necessidade de Ajuda': {
-            'leads': 'Você sente que precisa de ajuda para lidar com essas dificuldades?',
-            'vendas': 'Você sente que precisa de ajuda para lidar com essas dificuldades?'
-        },
-        'Investimento': {
-            'leads': 'Escolha o investimento ideal para você:',
-            'vendas': 'Escolha o investimento ideal para você:'
-        },
-        'Origem': {
-            'leads': 'utm_source',
-            'vendas': 'Source'
-        },
-        'Meio': {
-            'leads': 'utm_medium',
-            'vendas': 'Medium'
-        },
-        'Campanha': {
-            'leads': 'utm_campaign',
-            'vendas': 'Campaign'
-        }
-    }
+from utils.cohorts import conversion_days, get_cohort_matrix, render_cohorts
+from utils.crosstab import build_pair_cube, encode_fields, render_crosstab
+from utils.matching import match_sales_to_leads
+from utils.schemas import BLANK_CATEGORY, LEAD_SALE_FIELDS
+from utils.segments import BitmapIndex, build_segment_indexes
+from utils.sheets import read_sales_and_leads
+from utils.stats import SIGNIFICANCE_COLUMNS, add_significance, wilson_interval
 
+@st.cache_data(show_spinner=False, max_entries=20)
+def create_comparison_analysis(dados_filtrados_vendas, dados_filtrados_leads, leads_convertidos=None):
+    # Os campos equivalentes entre leads e vendas compartilham o mesmo dicionário
+    # de categorias (ver read_sales_and_leads), então as contagens já saem alinhadas
     comparisons = {}
+    total_leads = len(dados_filtrados_leads)
+    total_vendas = len(dados_filtrados_vendas)
+    field_counts = {}
     
-    for field_name, field_data in field_mapping.items():
+    for field_name, field_data in LEAD_SALE_FIELDS.items():
         leads_field = field_data['leads']
         vendas_field = field_data['vendas']
         
-        leads_dist = dados_filtrados_leads[leads_field].value_counts().to_dict()
-        total_leads = len(dados_filtrados_leads)
+        counts = pd.concat({
+            'Qtd Leads': dados_filtrados_leads[leads_field].value_counts(sort=False),
+            'Qtd Vendas': dados_filtrados_vendas[vendas_field].value_counts(sort=False)
+        }, axis=1).fillna(0).astype(int)
         
-        vendas_dist = dados_filtrados_vendas[vendas_field].value_counts().to_dict()
-        total_vendas = len(dados_filtrados_vendas)
+        # Manter apenas os valores presentes no período
+        counts = counts[(counts['Qtd Leads'] > 0) | (counts['Qtd Vendas'] > 0)]
         
-        all_values = set(leads_dist.keys()) | set(vendas_dist.keys())
+        # Leads do período ligados a uma venda paga (ver match_sales_to_leads)
+        if leads_convertidos is not None:
+            convertidos = dados_filtrados_leads.loc[leads_convertidos, leads_field].value_counts(sort=False)
+            counts['Leads Convertidos'] = convertidos.reindex(counts.index, fill_value=0).astype(int)
         
-        comparison_data = []
-        for value in all_values:
-            leads_count = leads_dist.get(value, 0)
-            vendas_count = vendas_dist.get(value, 0)
-            leads_percent = (leads_count / total_leads * 100) if total_leads > 0 else 0
-            vendas_percent = (vendas_count / total_vendas * 100) if total_vendas > 0 else 0
-            conversion_rate = (vendas_count / leads_count * 100) if leads_count > 0 else 0
-            
-            comparison_data.append({
-                'Valor': value,
-                'Qtd Leads': leads_count,
-                '% Leads': round(leads_percent, 2),
-                'Qtd Vendas': vendas_count,
-                '% Vendas': round(vendas_percent, 2),
-                'Taxa Conversão (%)': round(conversion_rate, 2)
-            })
+        counts.index = counts.index.astype(object)
+        field_counts[field_name] = counts
+    
+    # Intervalos e testes de todos os valores de todos os campos em uma única passada.
+    # Com os vínculos, a proporção é a de leads convertidos; sem eles, vendas limitadas aos leads.
+    stacked = pd.concat(field_counts, names=['Campo', 'Valor'])
+    if leads_convertidos is not None:
+        stacked['Sucessos'] = stacked['Leads Convertidos']
+        total_sucessos = int(leads_convertidos.sum())
+    else:
+        stacked['Sucessos'] = stacked[['Qtd Vendas', 'Qtd Leads']].min(axis=1)
+        total_sucessos = min(total_vendas, total_leads)
+    stacked = add_significance(stacked, 'Sucessos', 'Qtd Leads', total_sucessos, total_leads).drop(columns='Sucessos')
+    
+    for field_name, counts in field_counts.items():
+        counts = stacked.loc[field_name] if len(counts) else stacked.iloc[:0].droplevel('Campo')
+        
+        df = pd.DataFrame({
+            'Valor': counts.index.to_numpy(),
+            'Qtd Leads': counts['Qtd Leads'].to_numpy(),
+            '% Leads': (counts['Qtd Leads'] / total_leads * 100).round(2).to_numpy() if total_leads > 0 else 0,
+            'Qtd Vendas': counts['Qtd Vendas'].to_numpy(),
+            '% Vendas': (counts['Qtd Vendas'] / total_vendas * 100).round(2).to_numpy() if total_vendas > 0 else 0,
+            'Taxa Conversão (%)': (counts['Qtd Vendas'] / counts['Qtd Leads'].where(counts['Qtd Leads'] > 0) * 100).fillna(0).round(2).to_numpy()
+        })
+        
+        if leads_convertidos is not None:
+            df['Leads Convertidos'] = counts['Leads Convertidos'].to_numpy()
+            df['Conversão Real (%)'] = (counts['Leads Convertidos'] / counts['Qtd Leads'].where(counts['Qtd Leads'] > 0) * 100).fillna(0).round(2).to_numpy()
+        
+        for column in SIGNIFICANCE_COLUMNS:
+            df[column] = counts[column].to_numpy()
         
-        # Criar DataFrame e ordenar por taxa de conversão
-        df = pd.DataFrame(comparison_data)
-        # Ordenar excluindo a linha de total
-        df_sem_total = df.sort_values('Taxa Conversão (%)', ascending=False)
+        # Ordenar por taxa de conversão (a linha de total entra depois)
+        df_sem_total = df.sort_values('Taxa Conversão (%)', ascending=False, kind='stable')
         
         # Adicionar totais ao final do DataFrame
         totals = pd.DataFrame([{
@@ -118,6 +91,16 @@ def create_comparison_analysis(dados_filtrados_vendas, dados_filtrados_leads):
             'Taxa Conversão (%)': (total_vendas / total_leads * 100) if total_leads > 0 else 0
         }])
         
+        if leads_convertidos is not None:
+            total_convertidos = int(leads_convertidos.sum())
+            totals['Leads Convertidos'] = total_convertidos
+            totals['Conversão Real (%)'] = (total_convertidos / total_leads * 100) if total_leads > 0 else 0
+        
+        # Intervalo da taxa geral (a comparação com ela mesma não se aplica)
+        low, high = wilson_interval([total_sucessos], [total_leads])
+        totals['IC 95% Inf (%)'] = low * 100
+        totals['IC 95% Sup (%)'] = high * 100
+        
         # Concatenar mantendo a ordem
         df = pd.concat([df_sem_total, totals])
         
@@ -151,9 +134,9 @@ def create_word_clouds(dados_filtrados_leads, dados_filtrados_vendas):
     word_clouds = {}
     
     for campo_nome, campo in campos.items():
-        # Preparar textos para leads e vendas
-        leads_text = ' '.join(dados_filtrados_leads[campo].fillna('').astype(str).str.lower())
-        vendas_text = ' '.join(dados_filtrados_vendas[campo].fillna('').astype(str).str.lower())
+        # Preparar textos para leads e vendas (respostas em branco não entram na nuvem)
+        leads_text = ' '.join(dados_filtrados_leads[campo].astype(object).replace(BLANK_CATEGORY, '').fillna('').astype(str).str.lower())
+        vendas_text = ' '.join(dados_filtrados_vendas[campo].astype(object).replace(BLANK_CATEGORY, '').fillna('').astype(str).str.lower())
         
         # Limpar textos
         leads_text = limpar_texto(leads_text)
@@ -184,6 +167,94 @@ def create_word_clouds(dados_filtrados_leads, dados_filtrados_vendas):
     
     return word_clouds
 
+# Função para exibir as nuvens de palavras de leads e compradores
+def show_word_clouds(dados_filtrados_leads, dados_filtrados_vendas):
+    word_clouds = create_word_clouds(dados_filtrados_leads, dados_filtrados_vendas)
+    
+    # Estado Emocional
+    st.write("#### Estado Emocional")
+    st.write("Visualização das palavras mais frequentes nas respostas sobre estado emocional")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.write("##### Leads")
+        fig_leads, ax_leads = plt.subplots(figsize=(10, 6))
+        ax_leads.imshow(word_clouds['emocional'][0], interpolation='bilinear')
+        ax_leads.axis('off')
+        st.pyplot(fig_leads)
+        
+    with col2:
+        st.write("##### Compradores")
+        fig_vendas, ax_vendas = plt.subplots(figsize=(10, 6))
+        ax_vendas.imshow(word_clouds['emocional'][1], interpolation='bilinear')
+        ax_vendas.axis('off')
+        st.pyplot(fig_vendas)
+    
+    # Maior Desafio
+    st.write("#### Maior Desafio")
+    st.write("Visualização das palavras mais frequentes nas respostas sobre os maiores desafios")
+    
+    col3, col4 = st.columns(2)
+    
+    with col3:
+        st.write("##### Leads")
+        fig_leads2, ax_leads2 = plt.subplots(figsize=(10, 6))
+        ax_leads2.imshow(word_clouds['desafio'][0], interpolation='bilinear')
+        ax_leads2.axis('off')
+        st.pyplot(fig_leads2)
+        
+    with col4:
+        st.write("##### Compradores")
+        fig_vendas2, ax_vendas2 = plt.subplots(figsize=(10, 6))
+        ax_vendas2.imshow(word_clouds['desafio'][1], interpolation='bilinear')
+        ax_vendas2.axis('off')
+        st.pyplot(fig_vendas2)
+
+# Fragmento do painel de segmentos: mudar o filtro não recarrega a página inteira
+@st.fragment
+def render_segment_panel(data_leads, data_vendas, indice_leads, indice_vendas, periodo_leads, periodo_vendas, convertidos):
+    with st.expander("Filtrar segmento por respostas", expanded=False):
+        cols = st.columns(3)
+        selecionados = {}
+        for posicao, (nome, campos) in enumerate(LEAD_SALE_FIELDS.items()):
+            with cols[posicao % 3]:
+                selecionados[nome] = st.multiselect(
+                    nome,
+                    options=indice_leads.categories.get(campos['leads'], []),
+                    key=f"segmento_{nome}"
+                )
+    
+    # Mesmas respostas nos dois lados: leads e vendas compartilham as categorias.
+    # Os índices cobrem as abas completas; o período entra como mais um bitmap.
+    bits_leads = indice_leads.evaluate({LEAD_SALE_FIELDS[nome]['leads']: valores for nome, valores in selecionados.items()}) & periodo_leads
+    bits_vendas = indice_vendas.evaluate({LEAD_SALE_FIELDS[nome]['vendas']: valores for nome, valores in selecionados.items()}) & periodo_vendas
+    
+    total_leads = indice_leads.count(bits_leads)
+    total_vendas = indice_vendas.count(bits_vendas)
+    total_convertidos = indice_leads.count(bits_leads & convertidos)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Leads no Segmento", f"{total_leads}")
+    with col2:
+        st.metric("Vendas no Segmento", f"{total_vendas}")
+    with col3:
+        st.metric("Conversão do Segmento", f"{(total_vendas / total_leads * 100) if total_leads > 0 else 0:.2f}%")
+    with col4:
+        st.metric("Conversão Real do Segmento", f"{(total_convertidos / total_leads * 100) if total_leads > 0 else 0:.2f}%")
+    
+    if total_leads == 0 or total_vendas == 0:
+        st.info("Segmento sem leads ou sem vendas no período para gerar as nuvens de palavras.")
+        return
+    
+    # Criar e exibir nuvens de palavras do segmento
+    st.write("### Análise de Texto - Nuvens de Palavras")
+    show_word_clouds(
+        data_leads[indice_leads.mask(bits_leads)],
+        data_vendas[indice_vendas.mask(bits_vendas)]
+    )
+
 def main():
     # Configurar o idioma para português
     try:
@@ -237,8 +308,7 @@ def main():
 
         # Carregar as planilhas com tratamento de erro
         try:
-            sheet_vendas = client.open("[PAX] CENTRAL DADOS").worksheet('central_vendas')
-            sheet_leads = client.open("[PAX] CENTRAL DADOS").worksheet('central_leads')
+            spreadsheet = client.open("[PAX] CENTRAL DADOS")
         except gspread.exceptions.SpreadsheetNotFound:
             st.error("Planilha não encontrada. Verifique o nome da planilha e as permissões.")
             return
@@ -246,22 +316,13 @@ def main():
             st.error(f"Erro ao acessar as planilhas: {str(e)}")
             return
 
-        # Carregar dados com tratamento de erro
+        # Carregar dados com tratamento de erro (as datas já chegam convertidas pelo esquema da aba)
         try:
-            data_vendas = pd.DataFrame(sheet_vendas.get_all_records())
-            data_leads = pd.DataFrame(sheet_leads.get_all_records())
+            data_vendas, data_leads = read_sales_and_leads(spreadsheet)
         except Exception as e:
             st.error(f"Erro ao carregar os dados: {str(e)}")
             return
 
-        # Converter e limpar datas
-        try:
-            data_vendas["Data"] = pd.to_datetime(data_vendas["Data"], dayfirst=True)
-            data_leads["Submitted At"] = pd.to_datetime(data_leads["Submitted At"], dayfirst=True)
-        except Exception as e:
-            st.error(f"Erro ao processar as datas: {str(e)}")
-            return
-
         # Interface do Streamlit
         st.title("Análise de Vendas e Leads")
         
@@ -275,17 +336,19 @@ def main():
         data_fim = pd.to_datetime(data_fim)
 
         # Filtrar os dados
-        dados_filtrados_vendas = data_vendas[
+        periodo_vendas = (
             (data_vendas["Data"] >= data_inicio) & 
             (data_vendas["Data"] <= data_fim) &
             (data_vendas["Status"] == "Pago") &
             (data_vendas["Recebedores"] == "Recebedor padrão")
-        ]
+        )
+        dados_filtrados_vendas = data_vendas[periodo_vendas]
 
-        dados_filtrados_leads = data_leads[
+        periodo_leads = (
             (data_leads["Submitted At"] >= data_inicio) & 
             (data_leads["Submitted At"] <= data_fim)
-        ]
+        )
+        dados_filtrados_leads = data_leads[periodo_leads]
 
         # Criar coluna de mês/ano para ambos os dataframes
         dados_filtrados_vendas['mes_ano'] = dados_filtrados_vendas['Data'].dt.strftime('%m/%Y')
@@ -326,10 +389,47 @@ def main():
             'Taxa de Conversão (%)': '{:.2f}%'
         }))
 
+        # Ligar cada venda paga ao lead que a originou (e-mail, telefone ou nome)
+        vendas_pagas = data_vendas[data_vendas["Status"] == "Pago"]
+        vinculos = match_sales_to_leads(data_leads, vendas_pagas)
+        leads_convertidos = dados_filtrados_leads.index.isin(vinculos['lead'])
+        
+        # Dias entre o lead e a primeira venda paga de cada lead do período
+        dias_primeira_compra = vinculos.groupby('lead')['dias_para_converter'].min()
+        dias_primeira_compra = dias_primeira_compra[dias_primeira_compra.index.isin(dados_filtrados_leads.index)]
+        
+        st.write("### Conversão por Lead")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Leads do Período que Compraram", f"{int(leads_convertidos.sum())}")
+        with col2:
+            conversao_real = (leads_convertidos.sum() / len(dados_filtrados_leads) * 100) if len(dados_filtrados_leads) > 0 else 0
+            st.metric("Conversão Real por Lead", f"{conversao_real:.2f}%")
+        with col3:
+            mediana_dias = f"{dias_primeira_compra.median():.0f} dias" if not dias_primeira_compra.empty else "-"
+            st.metric("Mediana até a Primeira Compra", mediana_dias)
+        
+        chaves = vinculos['chave'].value_counts()
+        st.caption(
+            f"{len(vinculos)} de {len(vendas_pagas)} vendas pagas ligadas a um lead "
+            f"(e-mail: {chaves.get('email', 0)}, telefone: {chaves.get('telefone', 0)}, nome: {chaves.get('nome', 0)})."
+        )
+
+        # Coortes semanais com todo o histórico de leads (não só o período escolhido)
+        st.write("### Coortes Semanais de Leads")
+        coortes = get_cohort_matrix('central_leads')
+        coortes.update(data_leads, conversion_days(vendas_pagas, vinculos))
+        render_cohorts(coortes, key="leads")
+
         # Criar e exibir análise comparativa detalhada
-        comparisons = create_comparison_analysis(dados_filtrados_vendas, dados_filtrados_leads)
+        comparisons = create_comparison_analysis(dados_filtrados_vendas, dados_filtrados_leads, leads_convertidos)
 
         st.write("### Análise Detalhada por Campo")
+        st.caption(
+            "IC 95%: intervalo de Wilson da conversão real de cada resposta. "
+            "z e p-valor comparam a resposta com os demais leads; "
+            "diferenças com p-valor abaixo de 0,05 aparecem como acima ou abaixo da média."
+        )
         
         for field_name, comparison_df in comparisons.items():
             st.write(f"#### {field_name}")
@@ -350,56 +450,45 @@ def main():
                             '% Leads': '{:.2f}%',
                             'Qtd Vendas': '{:.0f}',
                             '% Vendas': '{:.2f}%',
-                            'Taxa Conversão (%)': '{:.2f}%'
-                        }))
+                            'Taxa Conversão (%)': '{:.2f}%',
+                            'Leads Convertidos': '{:.0f}',
+                            'Conversão Real (%)': '{:.2f}%',
+                            'IC 95% Inf (%)': '{:.2f}%',
+                            'IC 95% Sup (%)': '{:.2f}%',
+                            'z vs Geral': '{:.2f}',
+                            'p-valor': '{:.4f}'
+                        }, na_rep='-'))
             
             # Adicionar espaço entre as tabelas
             st.write("")
             
-        # Criar e exibir nuvens de palavras
-        st.write("### Análise de Texto - Nuvens de Palavras")
-        
-        word_clouds = create_word_clouds(dados_filtrados_leads, dados_filtrados_vendas)
-        
-        # Estado Emocional
-        st.write("#### Estado Emocional")
-        st.write("Visualização das palavras mais frequentes nas respostas sobre estado emocional")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.write("##### Leads")
-            fig_leads, ax_leads = plt.subplots(figsize=(10, 6))
-            ax_leads.imshow(word_clouds['emocional'][0], interpolation='bilinear')
-            ax_leads.axis('off')
-            st.pyplot(fig_leads)
-            
-        with col2:
-            st.write("##### Compradores")
-            fig_vendas, ax_vendas = plt.subplots(figsize=(10, 6))
-            ax_vendas.imshow(word_clouds['emocional'][1], interpolation='bilinear')
-            ax_vendas.axis('off')
-            st.pyplot(fig_vendas)
-        
-        # Maior Desafio
-        st.write("#### Maior Desafio")
-        st.write("Visualização das palavras mais frequentes nas respostas sobre os maiores desafios")
-        
-        col3, col4 = st.columns(2)
+        # Conversão real por pares de campos, a partir do cubo de pares pré-calculado
+        st.write("### Conversão por Pares de Campos")
+        campos_pares = [
+            nome for nome, campos in LEAD_SALE_FIELDS.items()
+            if campos['leads'] in dados_filtrados_leads.columns
+        ]
+        codigos, categorias = encode_fields(dados_filtrados_leads, [LEAD_SALE_FIELDS[nome]['leads'] for nome in campos_pares])
+        cubo_pares = build_pair_cube(codigos, leads_convertidos, categorias)
+        render_crosstab(cubo_pares, categorias, campos_pares, key="leads")
         
-        with col3:
-            st.write("##### Leads")
-            fig_leads2, ax_leads2 = plt.subplots(figsize=(10, 6))
-            ax_leads2.imshow(word_clouds['desafio'][0], interpolation='bilinear')
-            ax_leads2.axis('off')
-            st.pyplot(fig_leads2)
-            
-        with col4:
-            st.write("##### Compradores")
-            fig_vendas2, ax_vendas2 = plt.subplots(figsize=(10, 6))
-            ax_vendas2.imshow(word_clouds['desafio'][1], interpolation='bilinear')
-            ax_vendas2.axis('off')
-            st.pyplot(fig_vendas2)
+        # Segmentos: índices de bitmap por resposta das abas completas, montados uma vez por carga
+        st.write("### Segmentos")
+        indice_leads, indice_vendas = build_segment_indexes(
+            data_leads,
+            data_vendas,
+            [campos['leads'] for campos in LEAD_SALE_FIELDS.values()],
+            [campos['vendas'] for campos in LEAD_SALE_FIELDS.values()]
+        )
+        render_segment_panel(
+            data_leads,
+            data_vendas,
+            indice_leads,
+            indice_vendas,
+            BitmapIndex.from_mask(periodo_leads),
+            BitmapIndex.from_mask(periodo_vendas),
+            BitmapIndex.from_mask(data_leads.index.isin(vinculos['lead']))
+        )
 
     except Exception as e:
         st.error(f"Ocorreu um erro inesperado: {str(e)}")
@@ -7,6 +7,12 @@ import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 import os
 import json
+from utils.backend import process_ad_metrics, aggregate_ad_metrics
+from utils.sheets import read_worksheet
+from utils.accounts import partition_by_account, get_account_frame
+from utils.charts import date_window, time_series_trace
+from utils.tables import show_paginated_table
+from utils.formatting import INTEGER, CURRENCY, PERCENT, RATIO
 
 st.set_page_config(
     page_title="Dashboard PSI - Meta Ads",
@@ -129,16 +135,14 @@ def load_meta_ads_data(client):
         
         # Carregar dados de campanhas
         try:
-            sheet_campaigns = sheet.worksheet('campanhas')
-            data_campaigns = pd.DataFrame(sheet_campaigns.get_all_records())
+            data_campaigns = read_worksheet(sheet, 'campanhas')
         except Exception as e:
             st.error(f"Erro ao carregar dados de campanhas: {str(e)}")
             data_campaigns = None
         
         # Carregar dados de métricas
         try:
-            sheet_metrics = sheet.worksheet('metricas')
-            data_metrics = pd.DataFrame(sheet_metrics.get_all_records())
+            data_metrics = read_worksheet(sheet, 'metricas')
         except Exception as e:
             st.error(f"Erro ao carregar dados de métricas: {str(e)}")
             data_metrics = None
@@ -155,29 +159,9 @@ def process_meta_ads_data(data_campaigns, data_metrics):
         return None
     
     try:
-        # Converter datas
-        data_metrics['data'] = pd.to_datetime(data_metrics['data'], errors='coerce')
-        
-        # Converter métricas numéricas
-        numeric_columns = ['impressoes', 'cliques', 'conversoes', 'custo', 'valor_conversao']
-        for col in numeric_columns:
-            if col in data_metrics.columns:
-                data_metrics[col] = pd.to_numeric(data_metrics[col], errors='coerce')
-        
-        # Calcular métricas derivadas
-        data_metrics['ctr'] = (data_metrics['cliques'] / data_metrics['impressoes'] * 100).round(2)
-        data_metrics['cpc'] = (data_metrics['custo'] / data_metrics['cliques']).round(2)
-        data_metrics['cpa'] = (data_metrics['custo'] / data_metrics['conversoes']).round(2)
-        data_metrics['roas'] = (data_metrics['valor_conversao'] / data_metrics['custo']).round(2)
-        
-        # Mesclar dados de campanhas e métricas
-        data_merged = pd.merge(
-            data_metrics, 
-            data_campaigns, 
-            left_on='id_campanha', 
-            right_on='id_campanha', 
-            how='left'
-        )
+        # Converter tipos, calcular métricas derivadas e mesclar com as campanhas
+        # (pandas ou Polars, conforme PSI_BACKEND; ver utils/backend.py)
+        data_merged = process_ad_metrics(data_campaigns, data_metrics)
         
         return data_merged
     
@@ -185,103 +169,73 @@ def process_meta_ads_data(data_campaigns, data_metrics):
         st.error(f"Erro ao processar dados do Meta Ads: {str(e)}")
         return None
 
-# Função para criar visualizações
-def create_visualizations(data, account_id=None):
-    if data is None:
-        return
-    
-    # Filtrar por conta se especificado
-    if account_id:
-        data = data[data['id_conta'] == account_id]
-    
-    # Verificar se há dados após filtragem
-    if len(data) == 0:
-        st.warning(f"Não há dados disponíveis para a conta selecionada: {account_id}")
-        return
-    
-    # Agrupar dados por data para métricas gerais
-    daily_metrics = data.groupby('data').agg({
-        'impressoes': 'sum',
-        'cliques': 'sum',
-        'conversoes': 'sum',
-        'custo': 'sum',
-        'valor_conversao': 'sum'
-    }).reset_index()
-    
-    # Calcular métricas derivadas
-    daily_metrics['ctr'] = (daily_metrics['cliques'] / daily_metrics['impressoes'] * 100).round(2)
-    daily_metrics['cpc'] = (daily_metrics['custo'] / daily_metrics['cliques']).round(2)
-    daily_metrics['cpa'] = (daily_metrics['custo'] / daily_metrics['conversoes']).round(2)
-    daily_metrics['roas'] = (daily_metrics['valor_conversao'] / daily_metrics['custo']).round(2)
-    
-    # Calcular totais para métricas principais
-    total_impressions = daily_metrics['impressoes'].sum()
-    total_clicks = daily_metrics['cliques'].sum()
-    total_conversions = daily_metrics['conversoes'].sum()
-    total_cost = daily_metrics['custo'].sum()
-    total_conversion_value = daily_metrics['valor_conversao'].sum()
-    
-    # Calcular médias para métricas derivadas
-    avg_ctr = (total_clicks / total_impressions * 100) if total_impressions > 0 else 0
-    avg_cpc = (total_cost / total_clicks) if total_clicks > 0 else 0
-    avg_cpa = (total_cost / total_conversions) if total_conversions > 0 else 0
-    avg_roas = (total_conversion_value / total_cost) if total_cost > 0 else 0
-    
-    # Exibir métricas principais
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric("Impressões", f"{total_impressions:,.0f}")
-        st.metric("CTR", f"{avg_ctr:.2f}%")
-    
-    with col2:
-        st.metric("Cliques", f"{total_clicks:,.0f}")
-        st.metric("CPC Médio", f"R$ {avg_cpc:.2f}")
-    
-    with col3:
-        st.metric("Conversões", f"{total_conversions:,.0f}")
-        st.metric("CPA Médio", f"R$ {avg_cpa:.2f}")
-    
-    with col4:
-        st.metric("Custo Total", f"R$ {total_cost:,.2f}")
-        st.metric("ROAS", f"{avg_roas:.2f}x")
-    
-    # Gráfico de tendência de métricas ao longo do tempo
-    st.subheader("Tendência de Métricas ao Longo do Tempo")
-    
-    # Opções de métricas para visualização
-    metric_options = {
-        "Impressões": "impressoes",
-        "Cliques": "cliques",
-        "Conversões": "conversoes",
-        "Custo": "custo",
-        "CTR (%)": "ctr",
-        "CPC (R$)": "cpc",
-        "CPA (R$)": "cpa",
-        "ROAS": "roas"
-    }
-    
+# Opções de métricas para seletores e gráficos
+METRIC_OPTIONS = {
+    "Impressões": "impressoes",
+    "Cliques": "cliques",
+    "Conversões": "conversoes",
+    "Custo": "custo",
+    "CTR (%)": "ctr",
+    "CPC (R$)": "cpc",
+    "CPA (R$)": "cpa",
+    "ROAS": "roas"
+}
+
+# Formatos e rótulos de exibição das tabelas de métricas
+AD_METRIC_FORMATS = {
+    'impressoes': INTEGER,
+    'cliques': INTEGER,
+    'conversoes': INTEGER,
+    'custo': CURRENCY,
+    'valor_conversao': CURRENCY,
+    'ctr': PERCENT,
+    'cpc': CURRENCY,
+    'cpa': CURRENCY,
+    'roas': RATIO
+}
+
+AD_METRIC_LABELS = {
+    'nome_campanha': 'Campanha',
+    'objetivo': 'Objetivo',
+    'impressoes': 'Impressões',
+    'cliques': 'Cliques',
+    'conversoes': 'Conversões',
+    'custo': 'Custo',
+    'valor_conversao': 'Valor de Conversão',
+    'ctr': 'CTR',
+    'cpc': 'CPC',
+    'cpa': 'CPA',
+    'roas': 'ROAS'
+}
+
+# Função para agregar métricas e calcular indicadores derivados
+@st.cache_data(show_spinner=False)
+def aggregate_metrics(data, group_columns):
+    """Soma as métricas base por `group_columns` e recalcula CTR, CPC, CPA e ROAS."""
+    return aggregate_ad_metrics(data, group_columns)
+
+# Fragmento do gráfico de tendência: trocar as métricas redesenha apenas este gráfico
+@st.fragment
+def render_trend_chart(daily_metrics):
     # Seletor de métricas
     selected_metrics = st.multiselect(
         "Selecione as métricas para visualizar",
-        options=list(metric_options.keys()),
+        options=list(METRIC_OPTIONS.keys()),
         default=["Impressões", "Cliques", "Conversões"]
     )
     
     if selected_metrics:
+        # Em históricos longos, limitar o período exibido (séries reduzidas por LTTB)
+        daily_window = date_window(daily_metrics, 'data', key="trend_period")
+        
         # Criar figura
         fig = go.Figure()
         
         for metric_name in selected_metrics:
-            metric_col = metric_options[metric_name]
+            metric_col = METRIC_OPTIONS[metric_name]
             
             # Adicionar linha para cada métrica selecionada
-            fig.add_trace(go.Scatter(
-                x=daily_metrics['data'],
-                y=daily_metrics[metric_col],
-                mode='lines+markers',
-                name=metric_name
-            ))
+            fig.add_trace(time_series_trace(daily_window['data'], daily_window[metric_col], metric_name))
         
         # Configurar layout
         fig.update_layout(
@@ -294,45 +248,18 @@ def create_visualizations(data, account_id=None):
         )
         
         st.plotly_chart(fig, use_container_width=True)
-    
-    # Gráfico de desempenho por campanha
-    st.subheader("Desempenho por Campanha")
-    
-    # Agrupar dados por campanha
-    campaign_metrics = data.groupby(['nome_campanha', 'objetivo']).agg({
-        'impressoes': 'sum',
-        'cliques': 'sum',
-        'conversoes': 'sum',
-        'custo': 'sum',
-        'valor_conversao': 'sum'
-    }).reset_index()
-    
-    # Calcular métricas derivadas
-    campaign_metrics['ctr'] = (campaign_metrics['cliques'] / campaign_metrics['impressoes'] * 100).round(2)
-    campaign_metrics['cpc'] = (campaign_metrics['custo'] / campaign_metrics['cliques']).round(2)
-    campaign_metrics['cpa'] = (campaign_metrics['custo'] / campaign_metrics['conversoes']).round(2)
-    campaign_metrics['roas'] = (campaign_metrics['valor_conversao'] / campaign_metrics['custo']).round(2)
-    
+
+# Fragmento do gráfico por campanha: trocar a métrica redesenha apenas este gráfico
+@st.fragment
+def render_campaign_chart(campaign_metrics):
     # Seletor de métrica para comparação
     campaign_metric = st.selectbox(
         "Selecione a métrica para comparar campanhas",
-        options=["Impressões", "Cliques", "Conversões", "Custo", "CTR (%)", "CPC (R$)", "CPA (R$)", "ROAS"],
+        options=list(METRIC_OPTIONS.keys()),
         index=2
     )
     
-    # Mapear seleção para coluna
-    metric_mapping = {
-        "Impressões": "impressoes",
-        "Cliques": "cliques",
-        "Conversões": "conversoes",
-        "Custo": "custo",
-        "CTR (%)": "ctr",
-        "CPC (R$)": "cpc",
-        "CPA (R$)": "cpa",
-        "ROAS": "roas"
-    }
-    
-    selected_col = metric_mapping[campaign_metric]
+    selected_col = METRIC_OPTIONS[campaign_metric]
     
     # Ordenar campanhas pela métrica selecionada
     campaign_metrics = campaign_metrics.sort_values(by=selected_col, ascending=False)
@@ -357,38 +284,77 @@ def create_visualizations(data, account_id=None):
     )
     
     st.plotly_chart(fig, use_container_width=True)
+
+# Função para criar visualizações
+def create_visualizations(data, account_id=None):
+    if data is None:
+        return
+    
+    # Os dados chegam já recortados pela conta (ver partition_by_account em main)
+    
+    # Verificar se há dados para a conta
+    if len(data) == 0:
+        st.warning(f"Não há dados disponíveis para a conta selecionada: {account_id}")
+        return
+    
+    # Agrupar dados por data para métricas gerais (agregado em cache)
+    daily_metrics = aggregate_metrics(data, 'data')
+    
+    # Calcular totais para métricas principais
+    total_impressions = daily_metrics['impressoes'].sum()
+    total_clicks = daily_metrics['cliques'].sum()
+    total_conversions = daily_metrics['conversoes'].sum()
+    total_cost = daily_metrics['custo'].sum()
+    total_conversion_value = daily_metrics['valor_conversao'].sum()
+    
+    # Calcular médias para métricas derivadas
+    avg_ctr = (total_clicks / total_impressions * 100) if total_impressions > 0 else 0
+    avg_cpc = (total_cost / total_clicks) if total_clicks > 0 else 0
+    avg_cpa = (total_cost / total_conversions) if total_conversions > 0 else 0
+    avg_roas = (total_conversion_value / total_cost) if total_cost > 0 else 0
+    
+    # Exibir métricas principais
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Impressões", f"{total_impressions:,.0f}")
+        st.metric("CTR", f"{avg_ctr:.2f}%")
+    
+    with col2:
+        st.metric("Cliques", f"{total_clicks:,.0f}")
+        st.metric("CPC Médio", f"R$ {avg_cpc:.2f}")
+    
+    with col3:
+        st.metric("Conversões", f"{total_conversions:,.0f}")
+        st.metric("CPA Médio", f"R$ {avg_cpa:.2f}")
+    
+    with col4:
+        st.metric("Custo Total", f"R$ {total_cost:,.2f}")
+        st.metric("ROAS", f"{avg_roas:.2f}x")
+    
+    # Gráfico de tendência de métricas ao longo do tempo
+    st.subheader("Tendência de Métricas ao Longo do Tempo")
+    
+    render_trend_chart(daily_metrics)
+    
+    # Gráfico de desempenho por campanha
+    st.subheader("Desempenho por Campanha")
+    
+    # Agrupar dados por campanha (agregado em cache)
+    campaign_metrics = aggregate_metrics(data, ['nome_campanha', 'objetivo'])
+    render_campaign_chart(campaign_metrics)
     
     # Tabela detalhada de campanhas
     st.subheader("Detalhes das Campanhas")
     
-    # Formatar tabela
-    formatted_campaign_metrics = campaign_metrics.copy()
-    formatted_campaign_metrics['impressoes'] = formatted_campaign_metrics['impressoes'].apply(lambda x: f"{x:,.0f}")
-    formatted_campaign_metrics['cliques'] = formatted_campaign_metrics['cliques'].apply(lambda x: f"{x:,.0f}")
-    formatted_campaign_metrics['conversoes'] = formatted_campaign_metrics['conversoes'].apply(lambda x: f"{x:,.0f}")
-    formatted_campaign_metrics['custo'] = formatted_campaign_metrics['custo'].apply(lambda x: f"R$ {x:,.2f}")
-    formatted_campaign_metrics['valor_conversao'] = formatted_campaign_metrics['valor_conversao'].apply(lambda x: f"R$ {x:,.2f}")
-    formatted_campaign_metrics['ctr'] = formatted_campaign_metrics['ctr'].apply(lambda x: f"{x:.2f}%")
-    formatted_campaign_metrics['cpc'] = formatted_campaign_metrics['cpc'].apply(lambda x: f"R$ {x:.2f}")
-    formatted_campaign_metrics['cpa'] = formatted_campaign_metrics['cpa'].apply(lambda x: f"R$ {x:.2f}")
-    formatted_campaign_metrics['roas'] = formatted_campaign_metrics['roas'].apply(lambda x: f"{x:.2f}x")
-    
-    # Renomear colunas para exibição
-    formatted_campaign_metrics = formatted_campaign_metrics.rename(columns={
-        'nome_campanha': 'Campanha',
-        'objetivo': 'Objetivo',
-        'impressoes': 'Impressões',
-        'cliques': 'Cliques',
-        'conversoes': 'Conversões',
-        'custo': 'Custo',
-        'valor_conversao': 'Valor de Conversão',
-        'ctr': 'CTR',
-        'cpc': 'CPC',
-        'cpa': 'CPA',
-        'roas': 'ROAS'
-    })
-    
-    st.dataframe(formatted_campaign_metrics, use_container_width=True)
+    # Exibir tabela ordenada por conversões (como o seletor padrão do gráfico)
+    show_paginated_table(
+        campaign_metrics,
+        formats=AD_METRIC_FORMATS,
+        labels=AD_METRIC_LABELS,
+        key=f"campaign_table_{account_id}",
+        sort_by='conversoes'
+    )
 
 def main():
     st.title("📊 Dashboard PSI - Meta Ads")
@@ -446,6 +412,9 @@ def main():
         unique_accounts = data_processed[['id_conta', 'nome_conta']].drop_duplicates()
         
         if len(unique_accounts) > 1:
+            # Particionar os dados por conta uma única vez por atualização
+            account_frames = partition_by_account(data_processed)
+            
             # Adicionar opção para visualizar todas as contas
             all_accounts_option = pd.DataFrame({
                 'id_conta': ['all'],
@@ -469,20 +438,8 @@ def main():
                 # Mostrar métricas por conta
                 st.header("Métricas por Conta")
                 
-                # Agrupar dados por conta
-                account_metrics = data_processed.groupby(['id_conta', 'nome_conta']).agg({
-                    'impressoes': 'sum',
-                    'cliques': 'sum',
-                    'conversoes': 'sum',
-                    'custo': 'sum',
-                    'valor_conversao': 'sum'
-                }).reset_index()
-                
-                # Calcular métricas derivadas
-                account_metrics['ctr'] = (account_metrics['cliques'] / account_metrics['impressoes'] * 100).round(2)
-                account_metrics['cpc'] = (account_metrics['custo'] / account_metrics['cliques']).round(2)
-                account_metrics['cpa'] = (account_metrics['custo'] / account_metrics['conversoes']).round(2)
-                account_metrics['roas'] = (account_metrics['valor_conversao'] / account_metrics['custo']).round(2)
+                # Agrupar dados por conta (agregado em cache)
+                account_metrics = aggregate_metrics(data_processed, ['id_conta', 'nome_conta'])
                 
                 # Exibir métricas por conta
                 for _, account in account_metrics.iterrows():
@@ -513,7 +470,7 @@ def main():
                 # Mostrar dados da conta selecionada
                 account_name = unique_accounts.loc[unique_accounts['id_conta'] == selected_account, 'nome_conta'].iloc[0]
                 st.header(f"Conta: {account_name}")
-                create_visualizations(data_processed, selected_account)
+                create_visualizations(get_account_frame(account_frames, data_processed, selected_account), selected_account)
         else:
             # Apenas uma conta, mostrar dados diretamente
             create_visualizations(data_processed)
@@ -1,12 +1,20 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 import os
 import json
+from utils.sheets import read_worksheet
+from utils.accounts import partition_by_account, get_account_frame
+from utils.lazy import render_lazy_tabs
+from utils.charts import render_time_series
+from utils.posting_cube import get_posting_cube, render_posting_times
+from utils.image_cache import local_thumbnails
+from utils.cards import render_cards, format_count, format_percent
+from utils.tables import show_paginated_table
+from utils.formatting import INTEGER, PERCENT, DATE, DATETIME
 
 st.set_page_config(
     page_title="Dashboard PSI - Instagram Insights",
@@ -75,6 +83,8 @@ st.markdown("""
     
     /* Estilo para cards de posts */
     .post-card {
+        display: flex;
+        gap: 20px;
         border: 1px solid #e0e0e0;
         border-radius: 10px;
         padding: 15px;
@@ -82,6 +92,20 @@ st.markdown("""
         background-color: white;
     }
     
+    .post-card-media {
+        flex: 1;
+        text-align: center;
+    }
+    
+    .post-card-body {
+        flex: 2;
+    }
+    
+    .post-caption, .post-no-image {
+        font-size: 12px;
+        color: #666;
+    }
+    
     .post-image {
         border-radius: 8px;
         width: 100%;
@@ -165,24 +189,21 @@ def load_instagram_data(client):
         
         # Carregar dados de perfil
         try:
-            sheet_profile = sheet.worksheet('perfil')
-            data_profile = pd.DataFrame(sheet_profile.get_all_records())
+            data_profile = read_worksheet(sheet, 'perfil')
         except Exception as e:
             st.error(f"Erro ao carregar dados de perfil: {str(e)}")
             data_profile = None
         
         # Carregar dados de métricas diárias
         try:
-            sheet_daily = sheet.worksheet('metricas_diarias')
-            data_daily = pd.DataFrame(sheet_daily.get_all_records())
+            data_daily = read_worksheet(sheet, 'metricas_diarias')
         except Exception as e:
             st.error(f"Erro ao carregar dados de métricas diárias: {str(e)}")
             data_daily = None
         
         # Carregar dados de posts
         try:
-            sheet_posts = sheet.worksheet('posts')
-            data_posts = pd.DataFrame(sheet_posts.get_all_records())
+            data_posts = read_worksheet(sheet, 'posts')
         except Exception as e:
             st.error(f"Erro ao carregar dados de posts: {str(e)}")
             data_posts = None
@@ -199,42 +220,10 @@ def process_instagram_data(data_profile, data_daily, data_posts):
         return None, None, None
     
     try:
-        # Processar dados de perfil
-        if not data_profile.empty:
-            # Converter datas
-            if 'data_atualizacao' in data_profile.columns:
-                data_profile['data_atualizacao'] = pd.to_datetime(data_profile['data_atualizacao'], errors='coerce')
-            
-            # Converter métricas numéricas
-            numeric_columns = ['seguidores', 'seguindo', 'posts', 'alcance', 'impressoes', 'engajamento']
-            for col in numeric_columns:
-                if col in data_profile.columns:
-                    data_profile[col] = pd.to_numeric(data_profile[col], errors='coerce')
-        
-        # Processar dados diários
-        if not data_daily.empty:
-            # Converter datas
-            if 'data' in data_daily.columns:
-                data_daily['data'] = pd.to_datetime(data_daily['data'], errors='coerce')
-            
-            # Converter métricas numéricas
-            numeric_columns = ['seguidores', 'alcance', 'impressoes', 'visitas_perfil', 'cliques_site', 'novos_seguidores']
-            for col in numeric_columns:
-                if col in data_daily.columns:
-                    data_daily[col] = pd.to_numeric(data_daily[col], errors='coerce')
+        # Os tipos das colunas (datas e métricas) já vêm do esquema da aba (ver utils/schemas.py)
         
         # Processar dados de posts
         if not data_posts.empty:
-            # Converter datas
-            if 'data_publicacao' in data_posts.columns:
-                data_posts['data_publicacao'] = pd.to_datetime(data_posts['data_publicacao'], errors='coerce')
-            
-            # Converter métricas numéricas
-            numeric_columns = ['curtidas', 'comentarios', 'salvos', 'compartilhamentos', 'alcance', 'impressoes', 'engajamento']
-            for col in numeric_columns:
-                if col in data_posts.columns:
-                    data_posts[col] = pd.to_numeric(data_posts[col], errors='coerce')
-            
             # Calcular taxa de engajamento
             if all(col in data_posts.columns for col in ['curtidas', 'comentarios', 'alcance']):
                 data_posts['taxa_engajamento'] = ((data_posts['curtidas'] + data_posts['comentarios']) / data_posts['alcance'] * 100).round(2)
@@ -251,11 +240,9 @@ def create_profile_visualizations(data_profile, account_id=None):
         st.warning("Não há dados de perfil disponíveis.")
         return
     
-    # Filtrar por conta se especificado
-    if account_id:
-        data_profile = data_profile[data_profile['id_conta'] == account_id]
+    # Os dados chegam já recortados pela conta (ver partition_by_account em main)
     
-    # Verificar se há dados após filtragem
+    # Verificar se há dados para a conta
     if len(data_profile) == 0:
         st.warning(f"Não há dados de perfil disponíveis para a conta selecionada: {account_id}")
         return
@@ -309,11 +296,9 @@ def create_daily_visualizations(data_daily, account_id=None):
         st.warning("Não há dados de métricas diárias disponíveis.")
         return
     
-    # Filtrar por conta se especificado
-    if account_id:
-        data_daily = data_daily[data_daily['id_conta'] == account_id]
+    # Os dados chegam já recortados pela conta (ver partition_by_account em main)
     
-    # Verificar se há dados após filtragem
+    # Verificar se há dados para a conta
     if len(data_daily) == 0:
         st.warning(f"Não há dados de métricas diárias disponíveis para a conta selecionada: {account_id}")
         return
@@ -324,23 +309,20 @@ def create_daily_visualizations(data_daily, account_id=None):
     # Gráfico de tendência de seguidores
     st.subheader("Evolução de Seguidores")
     
-    fig = px.line(
+    render_time_series(
         data_daily,
-        x='data',
-        y='seguidores',
-        title="Evolução do Número de Seguidores",
-        markers=True
-    )
-    
-    fig.update_layout(
-        xaxis_title="Data",
-        yaxis_title="Seguidores",
-        template="plotly_white",
-        height=400
+        'data',
+        traces=[{'column': 'seguidores', 'name': 'Seguidores'}],
+        layout=dict(
+            title="Evolução do Número de Seguidores",
+            xaxis_title="Data",
+            yaxis_title="Seguidores",
+            template="plotly_white",
+            height=400
+        ),
+        key=f"followers_chart_{account_id}"
     )
     
-    st.plotly_chart(fig, use_container_width=True)
-    
     # Gráfico de tendência de métricas de alcance e impressões
     st.subheader("Alcance e Impressões")
     
@@ -352,26 +334,20 @@ def create_daily_visualizations(data_daily, account_id=None):
         available_metrics.append('impressoes')
     
     if available_metrics:
-        fig = go.Figure()
-        
-        for metric in available_metrics:
-            fig.add_trace(go.Scatter(
-                x=data_daily['data'],
-                y=data_daily[metric],
-                mode='lines+markers',
-                name=metric.capitalize()
-            ))
-        
-        fig.update_layout(
-            title="Evolução de Alcance e Impressões",
-            xaxis_title="Data",
-            yaxis_title="Valor",
-            legend_title="Métrica",
-            template="plotly_white",
-            height=400
+        render_time_series(
+            data_daily,
+            'data',
+            traces=[{'column': metric, 'name': metric.capitalize()} for metric in available_metrics],
+            layout=dict(
+                title="Evolução de Alcance e Impressões",
+                xaxis_title="Data",
+                yaxis_title="Valor",
+                legend_title="Métrica",
+                template="plotly_white",
+                height=400
+            ),
+            key=f"reach_chart_{account_id}"
         )
-        
-        st.plotly_chart(fig, use_container_width=True)
     
     # Gráfico de tendência de engajamento
     engagement_metrics = []
@@ -385,41 +361,39 @@ def create_daily_visualizations(data_daily, account_id=None):
     if engagement_metrics:
         st.subheader("Métricas de Engajamento")
         
-        fig = go.Figure()
-        
-        for metric in engagement_metrics:
-            fig.add_trace(go.Scatter(
-                x=data_daily['data'],
-                y=data_daily[metric],
-                mode='lines+markers',
-                name=' '.join(word.capitalize() for word in metric.split('_'))
-            ))
-        
-        fig.update_layout(
-            title="Evolução de Métricas de Engajamento",
-            xaxis_title="Data",
-            yaxis_title="Valor",
-            legend_title="Métrica",
-            template="plotly_white",
-            height=400
+        render_time_series(
+            data_daily,
+            'data',
+            traces=[
+                {'column': metric, 'name': ' '.join(word.capitalize() for word in metric.split('_'))}
+                for metric in engagement_metrics
+            ],
+            layout=dict(
+                title="Evolução de Métricas de Engajamento",
+                xaxis_title="Data",
+                yaxis_title="Valor",
+                legend_title="Métrica",
+                template="plotly_white",
+                height=400
+            ),
+            key=f"engagement_chart_{account_id}"
         )
-        
-        st.plotly_chart(fig, use_container_width=True)
     
     # Tabela de métricas diárias
     st.subheader("Tabela de Métricas Diárias")
     
-    # Formatar tabela
-    formatted_daily = data_daily.copy()
-    formatted_daily['data'] = formatted_daily['data'].dt.strftime('%d/%m/%Y')
-    
-    # Formatar colunas numéricas
-    numeric_columns = ['seguidores', 'alcance', 'impressoes', 'visitas_perfil', 'cliques_site', 'novos_seguidores']
-    for col in numeric_columns:
-        if col in formatted_daily.columns:
-            formatted_daily[col] = formatted_daily[col].apply(lambda x: f"{x:,.0f}" if pd.notnull(x) else "")
+    # Formatos de exibição (os valores continuam numéricos na tabela)
+    daily_formats = {
+        'data': DATE,
+        'seguidores': INTEGER,
+        'alcance': INTEGER,
+        'impressoes': INTEGER,
+        'visitas_perfil': INTEGER,
+        'cliques_site': INTEGER,
+        'novos_seguidores': INTEGER
+    }
     
-    # Renomear colunas para exibição
+    # Rótulos das colunas para exibição
     column_mapping = {
         'data': 'Data',
         'seguidores': 'Seguidores',
@@ -430,35 +404,30 @@ def create_daily_visualizations(data_daily, account_id=None):
         'novos_seguidores': 'Novos Seguidores'
     }
     
-    formatted_daily = formatted_daily.rename(columns={col: column_mapping.get(col, col) for col in formatted_daily.columns})
-    
     # Exibir tabela
-    st.dataframe(formatted_daily, use_container_width=True)
+    show_paginated_table(data_daily, formats=daily_formats, labels=column_mapping, key=f"daily_table_{account_id}", sort_by='data')
 
-# Função para criar visualizações de posts
-def create_posts_visualizations(data_posts, account_id=None):
-    if data_posts is None or data_posts.empty:
-        st.warning("Não há dados de posts disponíveis.")
-        return
-    
-    # Filtrar por conta se especificado
-    if account_id:
-        data_posts = data_posts[data_posts['id_conta'] == account_id]
-    
-    # Verificar se há dados após filtragem
-    if len(data_posts) == 0:
-        st.warning(f"Não há dados de posts disponíveis para a conta selecionada: {account_id}")
-        return
-    
+# Métricas do cubo de melhores horários para postar
+POSTING_METRICS = {
+    "Taxa de Engajamento (%)": "taxa_engajamento",
+    "Alcance": "alcance",
+    "Impressões": "impressoes"
+}
+
+# Quantidades disponíveis para o ranking de top posts
+TOP_N_OPTIONS = [5, 10, 20, 50]
+
+# Função para pré-calcular os agregados da aba de posts
+@st.cache_data(show_spinner=False)
+def summarize_posts(data_posts):
+    """Calcula uma única vez por conta os agregados exibidos na aba de posts."""
     # Ordenar por data de publicação (mais recentes primeiro)
     data_posts = data_posts.sort_values('data_publicacao', ascending=False)
+    summary = {'posts': data_posts}
     
-    # Análise de desempenho por tipo de post
+    # Agrupar dados por tipo de post
     if 'tipo' in data_posts.columns:
-        st.subheader("Desempenho por Tipo de Post")
-        
-        # Agrupar dados por tipo de post
-        post_type_metrics = data_posts.groupby('tipo').agg({
+        post_type_metrics = data_posts.groupby('tipo', observed=True).agg({
             'curtidas': 'mean',
             'comentarios': 'mean',
             'salvos': 'mean',
@@ -474,146 +443,160 @@ def create_posts_visualizations(data_posts, account_id=None):
             if col in post_type_metrics.columns:
                 post_type_metrics[col] = post_type_metrics[col].round(2)
         
-        # Seletor de métrica para comparação
-        post_metric = st.selectbox(
-            "Selecione a métrica para comparar tipos de post",
-            options=["Taxa de Engajamento", "Curtidas", "Comentários", "Salvos", "Compartilhamentos", "Alcance", "Impressões"],
-            index=0
-        )
-        
-        # Mapear seleção para coluna
-        metric_mapping = {
-            "Taxa de Engajamento": "taxa_engajamento",
-            "Curtidas": "curtidas",
-            "Comentários": "comentarios",
-            "Salvos": "salvos",
-            "Compartilhamentos": "compartilhamentos",
-            "Alcance": "alcance",
-            "Impressões": "impressoes"
-        }
-        
-        selected_col = metric_mapping[post_metric]
-        
-        # Criar gráfico de barras
-        fig = px.bar(
-            post_type_metrics,
-            x='tipo',
-            y=selected_col,
-            title=f"{post_metric} Média por Tipo de Post",
-            labels={'tipo': 'Tipo de Post', selected_col: post_metric},
-            color='tipo',
-            height=400
-        )
+        summary['post_type_metrics'] = post_type_metrics
+    
+    # Ordenar por taxa de engajamento (o ranking exibido é recortado pelo seletor)
+    summary['top_posts'] = data_posts.sort_values('taxa_engajamento', ascending=False).head(max(TOP_N_OPTIONS))
+    
+    return summary
+
+# Fragmento do gráfico por tipo de post: trocar a métrica redesenha apenas este gráfico
+@st.fragment
+def render_post_type_chart(post_type_metrics, account_id=None):
+    # Seletor de métrica para comparação
+    post_metric = st.selectbox(
+        "Selecione a métrica para comparar tipos de post",
+        options=["Taxa de Engajamento", "Curtidas", "Comentários", "Salvos", "Compartilhamentos", "Alcance", "Impressões"],
+        index=0,
+        key=f"post_metric_{account_id}"
+    )
+    
+    # Mapear seleção para coluna
+    metric_mapping = {
+        "Taxa de Engajamento": "taxa_engajamento",
+        "Curtidas": "curtidas",
+        "Comentários": "comentarios",
+        "Salvos": "salvos",
+        "Compartilhamentos": "compartilhamentos",
+        "Alcance": "alcance",
+        "Impressões": "impressoes"
+    }
+    
+    selected_col = metric_mapping[post_metric]
+    
+    # Criar gráfico de barras
+    fig = px.bar(
+        post_type_metrics,
+        x='tipo',
+        y=selected_col,
+        title=f"{post_metric} Média por Tipo de Post",
+        labels={'tipo': 'Tipo de Post', selected_col: post_metric},
+        color='tipo',
+        height=400
+    )
+    
+    # Ajustar layout
+    fig.update_layout(
+        xaxis_title="Tipo de Post",
+        yaxis_title=post_metric,
+        template="plotly_white"
+    )
+    
+    st.plotly_chart(fig, use_container_width=True, key=f"post_type_chart_{account_id}")
+
+# Fragmento dos top posts: trocar a quantidade redesenha apenas os cards
+@st.fragment
+def render_top_posts(top_posts, account_id=None):
+    top_n = st.select_slider(
+        "Quantidade de posts",
+        options=TOP_N_OPTIONS,
+        value=TOP_N_OPTIONS[0],
+        key=f"top_posts_n_{account_id}"
+    )
+    top_posts = top_posts.head(top_n)
+    
+    # Detalhes de texto de todos os cards
+    details = {}
+    if 'legenda' in top_posts.columns:
+        captions = top_posts['legenda'].fillna('').astype(str)
+        details['Legenda'] = captions.where(captions.str.len() <= 100, captions.str.slice(0, 100) + '...')
+    
+    if 'tipo' in top_posts.columns:
+        details['Tipo'] = top_posts['tipo']
+    
+    details['Data'] = top_posts['data_publicacao'].dt.strftime('%d/%m/%Y %H:%M')
+    
+    # Métricas dos posts
+    metrics = {
+        'Curtidas': format_count(top_posts['curtidas']),
+        'Comentários': format_count(top_posts['comentarios']),
+        'Alcance': format_count(top_posts['alcance']),
+        'Taxa Eng.': format_percent(top_posts['taxa_engajamento'])
+    }
+    
+    # Miniaturas servidas a partir do cache local (ver utils/image_cache.py)
+    if 'url_imagem' in top_posts.columns:
+        images = local_thumbnails(top_posts['url_imagem'])
+    else:
+        images = pd.Series('', index=top_posts.index)
+    
+    render_cards(
+        images,
+        "Post de " + top_posts['data_publicacao'].dt.strftime('%d/%m/%Y'),
+        details,
+        metrics,
+        prefix="post",
+        missing_image_text="Imagem não disponível"
+    )
+
+# Função para criar visualizações de posts
+def create_posts_visualizations(data_posts, account_id=None):
+    if data_posts is None or data_posts.empty:
+        st.warning("Não há dados de posts disponíveis.")
+        return
+    
+    # Os dados chegam já recortados pela conta (ver partition_by_account em main)
+    
+    # Verificar se há dados para a conta
+    if len(data_posts) == 0:
+        st.warning(f"Não há dados de posts disponíveis para a conta selecionada: {account_id}")
+        return
+    
+    # Agregados memoizados por conta (ordenação, agrupamentos e top posts)
+    summary = summarize_posts(data_posts)
+    data_posts = summary['posts']
+    
+    # Análise de desempenho por tipo de post
+    if 'tipo' in data_posts.columns:
+        st.subheader("Desempenho por Tipo de Post")
         
-        # Ajustar layout
-        fig.update_layout(
-            xaxis_title="Tipo de Post",
-            yaxis_title=post_metric,
-            template="plotly_white"
-        )
+        post_type_metrics = summary['post_type_metrics']
         
-        st.plotly_chart(fig, use_container_width=True)
+        render_post_type_chart(post_type_metrics, account_id)
     
     # Melhores horários para postar
     if 'data_publicacao' in data_posts.columns:
         st.subheader("Melhores Horários para Postar")
         
-        # Extrair hora do dia
-        data_posts['hora'] = data_posts['data_publicacao'].dt.hour
-        
-        # Agrupar por hora
-        hourly_performance = data_posts.groupby('hora').agg({
-            'taxa_engajamento': 'mean',
-            'alcance': 'mean',
-            'curtidas': 'mean'
-        }).reset_index()
-        
-        # Criar gráfico
-        fig = px.line(
-            hourly_performance,
-            x='hora',
-            y='taxa_engajamento',
-            title="Taxa de Engajamento Média por Hora do Dia",
-            markers=True
-        )
-        
-        # Ajustar layout
-        fig.update_layout(
-            xaxis_title="Hora do Dia",
-            yaxis_title="Taxa de Engajamento Média (%)",
-            template="plotly_white",
-            height=400,
-            xaxis=dict(
-                tickmode='linear',
-                tick0=0,
-                dtick=1
-            )
-        )
+        # Cubo dia da semana × hora atualizado apenas com as publicações novas
+        posting_cube = get_posting_cube('instagram', account_id, list(POSTING_METRICS.values()))
+        posting_cube.update(data_posts, id_column='id_post')
         
-        st.plotly_chart(fig, use_container_width=True)
+        render_posting_times(posting_cube, POSTING_METRICS, key=account_id, color_scale="RdPu")
     
     # Top posts
     st.subheader("Top Posts por Engajamento")
     
-    # Ordenar por taxa de engajamento
-    top_posts = data_posts.sort_values('taxa_engajamento', ascending=False).head(5)
-    
-    # Exibir cards para os top posts
-    for _, post in top_posts.iterrows():
-        col1, col2 = st.columns([1, 2])
-        
-        with col1:
-            if 'url_imagem' in post and post['url_imagem']:
-                st.image(post['url_imagem'], caption=f"Post de {post['data_publicacao'].strftime('%d/%m/%Y')}")
-            else:
-                st.write("Imagem não disponível")
-        
-        with col2:
-            if 'legenda' in post:
-                st.write(f"**Legenda:** {post['legenda'][:100]}..." if len(post['legenda']) > 100 else f"**Legenda:** {post['legenda']}")
-            
-            if 'tipo' in post:
-                st.write(f"**Tipo:** {post['tipo']}")
-            
-            if 'data_publicacao' in post:
-                st.write(f"**Data:** {post['data_publicacao'].strftime('%d/%m/%Y %H:%M')}")
-            
-            # Métricas do post
-            metrics_col1, metrics_col2, metrics_col3, metrics_col4 = st.columns(4)
-            
-            with metrics_col1:
-                st.metric("Curtidas", f"{post['curtidas']:,.0f}")
-            
-            with metrics_col2:
-                st.metric("Comentários", f"{post['comentarios']:,.0f}")
-            
-            with metrics_col3:
-                st.metric("Alcance", f"{post['alcance']:,.0f}")
-            
-            with metrics_col4:
-                st.metric("Taxa Eng.", f"{post['taxa_engajamento']:.2f}%")
-        
-        st.markdown("---")
+    render_top_posts(summary['top_posts'], account_id)
     
     # Tabela completa de posts
     st.subheader("Todos os Posts")
     
-    # Formatar tabela
-    formatted_posts = data_posts.copy()
-    formatted_posts['data_publicacao'] = formatted_posts['data_publicacao'].dt.strftime('%d/%m/%Y %H:%M')
-    
-    # Formatar colunas numéricas
-    numeric_columns = ['curtidas', 'comentarios', 'salvos', 'compartilhamentos', 'alcance', 'impressoes']
-    for col in numeric_columns:
-        if col in formatted_posts.columns:
-            formatted_posts[col] = formatted_posts[col].apply(lambda x: f"{x:,.0f}" if pd.notnull(x) else "")
-    
-    if 'taxa_engajamento' in formatted_posts.columns:
-        formatted_posts['taxa_engajamento'] = formatted_posts['taxa_engajamento'].apply(lambda x: f"{x:.2f}%" if pd.notnull(x) else "")
+    # Formatos de exibição (os valores continuam numéricos na tabela)
+    posts_formats = {
+        'data_publicacao': DATETIME,
+        'curtidas': INTEGER,
+        'comentarios': INTEGER,
+        'salvos': INTEGER,
+        'compartilhamentos': INTEGER,
+        'alcance': INTEGER,
+        'impressoes': INTEGER,
+        'taxa_engajamento': PERCENT
+    }
     
     # Selecionar e renomear colunas para exibição
     display_columns = ['data_publicacao', 'tipo', 'curtidas', 'comentarios', 'salvos', 'compartilhamentos', 'alcance', 'impressoes', 'taxa_engajamento']
-    display_columns = [col for col in display_columns if col in formatted_posts.columns]
+    display_columns = [col for col in display_columns if col in data_posts.columns]
     
     column_mapping = {
         'data_publicacao': 'Data',
@@ -627,10 +610,8 @@ def create_posts_visualizations(data_posts, account_id=None):
         'taxa_engajamento': 'Taxa Eng.'
     }
     
-    formatted_posts = formatted_posts[display_columns].rename(columns={col: column_mapping.get(col, col) for col in display_columns})
-    
     # Exibir tabela
-    st.dataframe(formatted_posts, use_container_width=True)
+    show_paginated_table(data_posts[display_columns], formats=posts_formats, labels=column_mapping, key=f"posts_table_{account_id}", sort_by='data_publicacao')
 
 def main():
     st.title("📊 Dashboard PSI - Instagram Insights")
@@ -740,6 +721,11 @@ def main():
         # Mesclar informações de contas
         unique_accounts = pd.concat(accounts).drop_duplicates(subset=[account_column])
         
+        # Particionar os dados por conta uma única vez por atualização
+        profile_frames = partition_by_account(data_profile, account_column)
+        daily_frames = partition_by_account(data_daily, account_column)
+        posts_frames = partition_by_account(data_posts, account_column)
+        
         # Adicionar opção para visualizar todas as contas
         all_accounts_option = pd.DataFrame({
             account_column: ['all'],
@@ -773,17 +759,12 @@ def main():
                 </div>
                 """, unsafe_allow_html=True)
                 
-                # Criar abas para diferentes visualizações
-                tab1, tab2, tab3 = st.tabs(["Perfil", "Métricas Diárias", "Posts"])
-                
-                with tab1:
-                    create_profile_visualizations(data_profile, account_id)
-                
-                with tab2:
-                    create_daily_visualizations(data_daily, account_id)
-                
-                with tab3:
-                    create_posts_visualizations(data_posts, account_id)
+                # Renderizar sob demanda apenas a aba aberta de cada conta
+                render_lazy_tabs({
+                    "Perfil": lambda: create_profile_visualizations(get_account_frame(profile_frames, data_profile, account_id), account_id),
+                    "Métricas Diárias": lambda: create_daily_visualizations(get_account_frame(daily_frames, data_daily, account_id), account_id),
+                    "Posts": lambda: create_posts_visualizations(get_account_frame(posts_frames, data_posts, account_id), account_id)
+                }, key=f"account_view_{account_id}")
         else:
             # Mostrar dados da conta selecionada
             account_name = unique_accounts.loc[unique_accounts[account_column] == selected_account, 'nome_usuario'].iloc[0]
@@ -793,13 +774,13 @@ def main():
             tab1, tab2, tab3 = st.tabs(["Perfil", "Métricas Diárias", "Posts"])
             
             with tab1:
-                create_profile_visualizations(data_profile, selected_account)
+                create_profile_visualizations(get_account_frame(profile_frames, data_profile, selected_account), selected_account)
             
             with tab2:
-                create_daily_visualizations(data_daily, selected_account)
+                create_daily_visualizations(get_account_frame(daily_frames, data_daily, selected_account), selected_account)
             
             with tab3:
-                create_posts_visualizations(data_posts, selected_account)
+                create_posts_visualizations(get_account_frame(posts_frames, data_posts, selected_account), selected_account)
     else:
         # Apenas uma conta, mostrar dados diretamente
         # Criar abas para diferentes visualizações
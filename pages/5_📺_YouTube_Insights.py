@@ -1,12 +1,21 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 import os
 import json
+from utils.sheets import read_worksheet
+from utils.accounts import partition_by_account, get_account_frame
+from utils.lazy import render_lazy_tabs
+from utils.charts import render_time_series
+from utils.posting_cube import get_posting_cube, render_posting_times
+from utils.image_cache import local_thumbnails
+from utils.durations import parse_durations
+from utils.cards import render_cards, format_count, format_percent
+from utils.tables import show_paginated_table
+from utils.formatting import INTEGER, PERCENT, DATE, DATETIME
 
 st.set_page_config(
     page_title="Dashboard PSI - YouTube Insights",
@@ -75,6 +84,8 @@ st.markdown("""
     
     /* Estilo para cards de vídeos */
     .video-card {
+        display: flex;
+        gap: 20px;
         border: 1px solid #e0e0e0;
         border-radius: 10px;
         padding: 15px;
@@ -82,7 +93,21 @@ st.markdown("""
         background-color: white;
     }
     
-    .video-thumbnail {
+    .video-card-media {
+        flex: 1;
+        text-align: center;
+    }
+    
+    .video-card-body {
+        flex: 2;
+    }
+    
+    .video-caption, .video-no-image {
+        font-size: 12px;
+        color: #666;
+    }
+    
+    .video-image {
         border-radius: 8px;
         width: 100%;
         margin-bottom: 10px;
@@ -165,24 +190,21 @@ def load_youtube_data(client):
         
         # Carregar dados de canal
         try:
-            sheet_channel = sheet.worksheet('canal')
-            data_channel = pd.DataFrame(sheet_channel.get_all_records())
+            data_channel = read_worksheet(sheet, 'canal')
         except Exception as e:
             st.error(f"Erro ao carregar dados de canal: {str(e)}")
             data_channel = None
         
         # Carregar dados de métricas diárias
         try:
-            sheet_daily = sheet.worksheet('metricas_diarias')
-            data_daily = pd.DataFrame(sheet_daily.get_all_records())
+            data_daily = read_worksheet(sheet, 'metricas_diarias')
         except Exception as e:
             st.error(f"Erro ao carregar dados de métricas diárias: {str(e)}")
             data_daily = None
         
         # Carregar dados de vídeos
         try:
-            sheet_videos = sheet.worksheet('videos')
-            data_videos = pd.DataFrame(sheet_videos.get_all_records())
+            data_videos = read_worksheet(sheet, 'videos')
         except Exception as e:
             st.error(f"Erro ao carregar dados de vídeos: {str(e)}")
             data_videos = None
@@ -199,45 +221,25 @@ def process_youtube_data(data_channel, data_daily, data_videos):
         return None, None, None
     
     try:
-        # Processar dados de canal
-        if not data_channel.empty:
-            # Converter datas
-            if 'data_atualizacao' in data_channel.columns:
-                data_channel['data_atualizacao'] = pd.to_datetime(data_channel['data_atualizacao'], errors='coerce')
-            
-            # Converter métricas numéricas
-            numeric_columns = ['inscritos', 'videos', 'visualizacoes', 'horas_assistidas']
-            for col in numeric_columns:
-                if col in data_channel.columns:
-                    data_channel[col] = pd.to_numeric(data_channel[col], errors='coerce')
-        
-        # Processar dados diários
-        if not data_daily.empty:
-            # Converter datas
-            if 'data' in data_daily.columns:
-                data_daily['data'] = pd.to_datetime(data_daily['data'], errors='coerce')
-            
-            # Converter métricas numéricas
-            numeric_columns = ['inscritos', 'visualizacoes', 'horas_assistidas', 'novos_inscritos', 'impressoes', 'ctr']
-            for col in numeric_columns:
-                if col in data_daily.columns:
-                    data_daily[col] = pd.to_numeric(data_daily[col], errors='coerce')
+        # Os tipos das colunas (datas e métricas) já vêm do esquema da aba (ver utils/schemas.py)
         
         # Processar dados de vídeos
         if not data_videos.empty:
-            # Converter datas
-            if 'data_publicacao' in data_videos.columns:
-                data_videos['data_publicacao'] = pd.to_datetime(data_videos['data_publicacao'], errors='coerce')
-            
-            # Converter métricas numéricas
-            numeric_columns = ['visualizacoes', 'likes', 'comentarios', 'compartilhamentos', 'tempo_assistido', 'impressoes', 'ctr']
-            for col in numeric_columns:
-                if col in data_videos.columns:
-                    data_videos[col] = pd.to_numeric(data_videos[col], errors='coerce')
-            
             # Calcular taxa de engajamento
             if all(col in data_videos.columns for col in ['likes', 'comentarios', 'visualizacoes']):
                 data_videos['taxa_engajamento'] = ((data_videos['likes'] + data_videos['comentarios']) / data_videos['visualizacoes'] * 100).round(2)
+            
+            # Converter duração (HH:MM:SS, MM:SS, segundos ou ISO-8601) para minutos
+            if 'duracao' in data_videos.columns:
+                duration_seconds, invalid_durations = parse_durations(data_videos['duracao'])
+                data_videos['duracao_min'] = duration_seconds / 60
+                
+                if invalid_durations.any():
+                    invalid_examples = data_videos.loc[invalid_durations, 'duracao'].astype(str).unique()[:5]
+                    st.warning(
+                        f"{invalid_durations.sum()} vídeo(s) com duração em formato não reconhecido "
+                        f"(ex.: {', '.join(invalid_examples)}). Esses vídeos ficam fora da análise de duração."
+                    )
         
         return data_channel, data_daily, data_videos
     
@@ -251,11 +253,9 @@ def create_channel_visualizations(data_channel, account_id=None):
         st.warning("Não há dados de canal disponíveis.")
         return
     
-    # Filtrar por conta se especificado
-    if account_id:
-        data_channel = data_channel[data_channel['id_conta'] == account_id]
+    # Os dados chegam já recortados pela conta (ver partition_by_account em main)
     
-    # Verificar se há dados após filtragem
+    # Verificar se há dados para a conta
     if len(data_channel) == 0:
         st.warning(f"Não há dados de canal disponíveis para a conta selecionada: {account_id}")
         return
@@ -304,11 +304,9 @@ def create_daily_visualizations(data_daily, account_id=None):
         st.warning("Não há dados de métricas diárias disponíveis.")
         return
     
-    # Filtrar por conta se especificado
-    if account_id:
-        data_daily = data_daily[data_daily['id_conta'] == account_id]
+    # Os dados chegam já recortados pela conta (ver partition_by_account em main)
     
-    # Verificar se há dados após filtragem
+    # Verificar se há dados para a conta
     if len(data_daily) == 0:
         st.warning(f"Não há dados de métricas diárias disponíveis para a conta selecionada: {account_id}")
         return
@@ -319,23 +317,20 @@ def create_daily_visualizations(data_daily, account_id=None):
     # Gráfico de tendência de inscritos
     st.subheader("Evolução de Inscritos")
     
-    fig = px.line(
+    render_time_series(
         data_daily,
-        x='data',
-        y='inscritos',
-        title="Evolução do Número de Inscritos",
-        markers=True
-    )
-    
-    fig.update_layout(
-        xaxis_title="Data",
-        yaxis_title="Inscritos",
-        template="plotly_white",
-        height=400
+        'data',
+        traces=[{'column': 'inscritos', 'name': 'Inscritos'}],
+        layout=dict(
+            title="Evolução do Número de Inscritos",
+            xaxis_title="Data",
+            yaxis_title="Inscritos",
+            template="plotly_white",
+            height=400
+        ),
+        key=f"subscribers_chart_{account_id}"
     )
     
-    st.plotly_chart(fig, use_container_width=True)
-    
     # Gráfico de tendência de visualizações e horas assistidas
     st.subheader("Visualizações e Horas Assistidas")
     
@@ -347,89 +342,64 @@ def create_daily_visualizations(data_daily, account_id=None):
         available_metrics.append('horas_assistidas')
     
     if available_metrics:
-        # Criar figura com dois eixos Y
-        fig = go.Figure()
+        traces = []
         
-        # Adicionar visualizações no eixo Y primário
+        # Visualizações no eixo Y primário
         if 'visualizacoes' in available_metrics:
-            fig.add_trace(go.Scatter(
-                x=data_daily['data'],
-                y=data_daily['visualizacoes'],
-                mode='lines+markers',
-                name='Visualizações',
-                line=dict(color='#FF0000')
-            ))
-        
-        # Adicionar horas assistidas no eixo Y secundário
+            traces.append({'column': 'visualizacoes', 'name': 'Visualizações', 'line': dict(color='#FF0000')})
+        
+        # Horas assistidas no eixo Y secundário
         if 'horas_assistidas' in available_metrics:
-            fig.add_trace(go.Scatter(
-                x=data_daily['data'],
-                y=data_daily['horas_assistidas'],
-                mode='lines+markers',
-                name='Horas Assistidas',
-                line=dict(color='#0066FF'),
-                yaxis='y2'
-            ))
-        
-        # Configurar layout com dois eixos Y
-        fig.update_layout(
-            title="Evolução de Visualizações e Horas Assistidas",
-            xaxis_title="Data",
-            yaxis_title="Visualizações",
-            yaxis2=dict(
-                title="Horas Assistidas",
-                overlaying='y',
-                side='right'
+            traces.append({'column': 'horas_assistidas', 'name': 'Horas Assistidas', 'line': dict(color='#0066FF'), 'yaxis': 'y2'})
+        
+        # Gráfico com dois eixos Y
+        render_time_series(
+            data_daily,
+            'data',
+            traces=traces,
+            layout=dict(
+                title="Evolução de Visualizações e Horas Assistidas",
+                xaxis_title="Data",
+                yaxis_title="Visualizações",
+                yaxis2=dict(
+                    title="Horas Assistidas",
+                    overlaying='y',
+                    side='right'
+                ),
+                legend_title="Métrica",
+                template="plotly_white",
+                height=400
             ),
-            legend_title="Métrica",
-            template="plotly_white",
-            height=400
+            key=f"views_chart_{account_id}"
         )
-        
-        st.plotly_chart(fig, use_container_width=True)
     
     # Gráfico de tendência de impressões e CTR
     if 'impressoes' in data_daily.columns and 'ctr' in data_daily.columns:
         st.subheader("Impressões e CTR")
         
-        # Criar figura com dois eixos Y
-        fig = go.Figure()
-        
-        # Adicionar impressões no eixo Y primário
-        fig.add_trace(go.Scatter(
-            x=data_daily['data'],
-            y=data_daily['impressoes'],
-            mode='lines+markers',
-            name='Impressões',
-            line=dict(color='#FF9900')
-        ))
-        
-        # Adicionar CTR no eixo Y secundário
-        fig.add_trace(go.Scatter(
-            x=data_daily['data'],
-            y=data_daily['ctr'],
-            mode='lines+markers',
-            name='CTR (%)',
-            line=dict(color='#00CC66'),
-            yaxis='y2'
-        ))
-        
-        # Configurar layout com dois eixos Y
-        fig.update_layout(
-            title="Evolução de Impressões e CTR",
-            xaxis_title="Data",
-            yaxis_title="Impressões",
-            yaxis2=dict(
-                title="CTR (%)",
-                overlaying='y',
-                side='right'
+        # Impressões no eixo Y primário e CTR no secundário
+        render_time_series(
+            data_daily,
+            'data',
+            traces=[
+                {'column': 'impressoes', 'name': 'Impressões', 'line': dict(color='#FF9900')},
+                {'column': 'ctr', 'name': 'CTR (%)', 'line': dict(color='#00CC66'), 'yaxis': 'y2'}
+            ],
+            layout=dict(
+                title="Evolução de Impressões e CTR",
+                xaxis_title="Data",
+                yaxis_title="Impressões",
+                yaxis2=dict(
+                    title="CTR (%)",
+                    overlaying='y',
+                    side='right'
+                ),
+                legend_title="Métrica",
+                template="plotly_white",
+                height=400
             ),
-            legend_title="Métrica",
-            template="plotly_white",
-            height=400
+            key=f"impressions_chart_{account_id}"
         )
-        
-        st.plotly_chart(fig, use_container_width=True)
     
     # Gráfico de novos inscritos
     if 'novos_inscritos' in data_daily.columns:
@@ -450,26 +420,23 @@ def create_daily_visualizations(data_daily, account_id=None):
             height=400
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, key=f"new_subscribers_chart_{account_id}")
     
     # Tabela de métricas diárias
     st.subheader("Tabela de Métricas Diárias")
     
-    # Formatar tabela
-    formatted_daily = data_daily.copy()
-    formatted_daily['data'] = formatted_daily['data'].dt.strftime('%d/%m/%Y')
-    
-    # Formatar colunas numéricas
-    numeric_columns = ['inscritos', 'visualizacoes', 'horas_assistidas', 'novos_inscritos', 'impressoes']
-    for col in numeric_columns:
-        if col in formatted_daily.columns:
-            formatted_daily[col] = formatted_daily[col].apply(lambda x: f"{x:,.0f}" if pd.notnull(x) else "")
-    
-    # Formatar CTR
-    if 'ctr' in formatted_daily.columns:
-        formatted_daily['ctr'] = formatted_daily['ctr'].apply(lambda x: f"{x:.2f}%" if pd.notnull(x) else "")
+    # Formatos de exibição (os valores continuam numéricos na tabela)
+    daily_formats = {
+        'data': DATE,
+        'inscritos': INTEGER,
+        'visualizacoes': INTEGER,
+        'horas_assistidas': INTEGER,
+        'novos_inscritos': INTEGER,
+        'impressoes': INTEGER,
+        'ctr': PERCENT
+    }
     
-    # Renomear colunas para exibição
+    # Rótulos das colunas para exibição
     column_mapping = {
         'data': 'Data',
         'inscritos': 'Inscritos',
@@ -480,35 +447,30 @@ def create_daily_visualizations(data_daily, account_id=None):
         'ctr': 'CTR'
     }
     
-    formatted_daily = formatted_daily.rename(columns={col: column_mapping.get(col, col) for col in formatted_daily.columns})
-    
     # Exibir tabela
-    st.dataframe(formatted_daily, use_container_width=True)
+    show_paginated_table(data_daily, formats=daily_formats, labels=column_mapping, key=f"daily_table_{account_id}", sort_by='data')
 
-# Função para criar visualizações de vídeos
-def create_videos_visualizations(data_videos, account_id=None):
-    if data_videos is None or data_videos.empty:
-        st.warning("Não há dados de vídeos disponíveis.")
-        return
-    
-    # Filtrar por conta se especificado
-    if account_id:
-        data_videos = data_videos[data_videos['id_conta'] == account_id]
-    
-    # Verificar se há dados após filtragem
-    if len(data_videos) == 0:
-        st.warning(f"Não há dados de vídeos disponíveis para a conta selecionada: {account_id}")
-        return
-    
+# Métricas do cubo de melhores horários para publicar
+POSTING_METRICS = {
+    "Visualizações": "visualizacoes",
+    "Taxa de Engajamento (%)": "taxa_engajamento",
+    "Impressões": "impressoes"
+}
+
+# Quantidades disponíveis para o ranking de top vídeos
+TOP_N_OPTIONS = [5, 10, 20, 50]
+
+# Função para pré-calcular os agregados da aba de vídeos
+@st.cache_data(show_spinner=False)
+def summarize_videos(data_videos):
+    """Calcula uma única vez por canal os agregados exibidos na aba de vídeos."""
     # Ordenar por data de publicação (mais recentes primeiro)
     data_videos = data_videos.sort_values('data_publicacao', ascending=False)
+    summary = {}
     
-    # Análise de desempenho por categoria
+    # Agrupar dados por categoria
     if 'categoria' in data_videos.columns:
-        st.subheader("Desempenho por Categoria")
-        
-        # Agrupar dados por categoria
-        category_metrics = data_videos.groupby('categoria').agg({
+        category_metrics = data_videos.groupby('categoria', observed=True).agg({
             'visualizacoes': 'mean',
             'likes': 'mean',
             'comentarios': 'mean',
@@ -524,222 +486,220 @@ def create_videos_visualizations(data_videos, account_id=None):
             if col in category_metrics.columns:
                 category_metrics[col] = category_metrics[col].round(2)
         
-        # Seletor de métrica para comparação
-        video_metric = st.selectbox(
-            "Selecione a métrica para comparar categorias",
-            options=["Visualizações", "Likes", "Comentários", "Compartilhamentos", "Tempo Assistido (min)", "Impressões", "CTR (%)"],
-            index=0
-        )
-        
-        # Mapear seleção para coluna
-        metric_mapping = {
-            "Visualizações": "visualizacoes",
-            "Likes": "likes",
-            "Comentários": "comentarios",
-            "Compartilhamentos": "compartilhamentos",
-            "Tempo Assistido (min)": "tempo_assistido",
-            "Impressões": "impressoes",
-            "CTR (%)": "ctr"
-        }
-        
-        selected_col = metric_mapping[video_metric]
-        
-        # Criar gráfico de barras
-        fig = px.bar(
-            category_metrics,
-            x='categoria',
-            y=selected_col,
-            title=f"{video_metric} Média por Categoria",
-            labels={'categoria': 'Categoria', selected_col: video_metric},
-            color='categoria',
-            height=400
+        summary['category_metrics'] = category_metrics
+    
+    # Ordenar por visualizações
+    summary['top_videos'] = data_videos.sort_values('visualizacoes', ascending=False).head(max(TOP_N_OPTIONS))
+    summary['videos'] = data_videos
+    
+    return summary
+
+# Fragmento do gráfico por categoria: trocar a métrica redesenha apenas este gráfico
+@st.fragment
+def render_category_chart(category_metrics, account_id=None):
+    # Seletor de métrica para comparação
+    video_metric = st.selectbox(
+        "Selecione a métrica para comparar categorias",
+        options=["Visualizações", "Likes", "Comentários", "Compartilhamentos", "Tempo Assistido (min)", "Impressões", "CTR (%)"],
+        index=0,
+        key=f"video_metric_{account_id}"
+    )
+    
+    # Mapear seleção para coluna
+    metric_mapping = {
+        "Visualizações": "visualizacoes",
+        "Likes": "likes",
+        "Comentários": "comentarios",
+        "Compartilhamentos": "compartilhamentos",
+        "Tempo Assistido (min)": "tempo_assistido",
+        "Impressões": "impressoes",
+        "CTR (%)": "ctr"
+    }
+    
+    selected_col = metric_mapping[video_metric]
+    
+    # Criar gráfico de barras
+    fig = px.bar(
+        category_metrics,
+        x='categoria',
+        y=selected_col,
+        title=f"{video_metric} Média por Categoria",
+        labels={'categoria': 'Categoria', selected_col: video_metric},
+        color='categoria',
+        height=400
+    )
+    
+    # Ajustar layout
+    fig.update_layout(
+        xaxis_title="Categoria",
+        yaxis_title=video_metric,
+        template="plotly_white"
+    )
+    
+    st.plotly_chart(fig, use_container_width=True, key=f"category_chart_{account_id}")
+
+# Fragmento do gráfico de duração: trocar a métrica redesenha apenas este gráfico
+@st.fragment
+def render_duration_chart(data_videos, account_id=None):
+    # Seletor de métrica para comparação
+    perf_metric = st.selectbox(
+        "Selecione a métrica de desempenho",
+        options=["Visualizações", "Likes", "Comentários", "Tempo Médio de Visualização", "CTR (%)"],
+        index=0,
+        key=f"duration_metric_{account_id}"
+    )
+    
+    # Mapear seleção para coluna
+    perf_mapping = {
+        "Visualizações": "visualizacoes",
+        "Likes": "likes",
+        "Comentários": "comentarios",
+        "Tempo Médio de Visualização": "tempo_medio_visualizacao",
+        "CTR (%)": "ctr"
+    }
+    
+    selected_perf = perf_mapping[perf_metric]
+    
+    # Verificar se a coluna selecionada existe
+    if selected_perf in data_videos.columns:
+        # Criar gráfico de dispersão
+        fig = px.scatter(
+            data_videos,
+            x='duracao_min',
+            y=selected_perf,
+            title=f"Relação entre Duração do Vídeo e {perf_metric}",
+            labels={'duracao_min': 'Duração (minutos)', selected_perf: perf_metric},
+            hover_name='titulo',
+            size='visualizacoes',
+            color='categoria' if 'categoria' in data_videos.columns else None,
+            height=500
         )
         
-        # Ajustar layout
+        # Adicionar linha de tendência
         fig.update_layout(
-            xaxis_title="Categoria",
-            yaxis_title=video_metric,
+            xaxis_title="Duração (minutos)",
+            yaxis_title=perf_metric,
             template="plotly_white"
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, key=f"duration_chart_{account_id}")
+    else:
+        st.warning(f"A métrica {perf_metric} não está disponível nos dados.")
+
+# Fragmento dos top vídeos: trocar a quantidade redesenha apenas os cards
+@st.fragment
+def render_top_videos(top_videos, account_id=None):
+    top_n = st.select_slider(
+        "Quantidade de vídeos",
+        options=TOP_N_OPTIONS,
+        value=TOP_N_OPTIONS[0],
+        key=f"top_videos_n_{account_id}"
+    )
+    top_videos = top_videos.head(top_n)
+    
+    # Detalhes de texto de todos os cards
+    details = {}
+    for label, col in [('Título', 'titulo'), ('Categoria', 'categoria')]:
+        if col in top_videos.columns:
+            details[label] = top_videos[col]
+    
+    details['Data'] = top_videos['data_publicacao'].dt.strftime('%d/%m/%Y %H:%M')
+    
+    if 'duracao' in top_videos.columns:
+        details['Duração'] = top_videos['duracao']
+    
+    # Métricas dos vídeos
+    metrics = {
+        'Visualizações': format_count(top_videos['visualizacoes']),
+        'Likes': format_count(top_videos['likes'])
+    }
+    
+    if 'tempo_assistido' in top_videos.columns:
+        metrics['Tempo Assistido'] = format_count(top_videos['tempo_assistido'], suffix=' min')
+    
+    if 'ctr' in top_videos.columns:
+        metrics['CTR'] = format_percent(top_videos['ctr'])
+    
+    # Miniaturas servidas a partir do cache local (ver utils/image_cache.py)
+    if 'thumbnail' in top_videos.columns:
+        images = local_thumbnails(top_videos['thumbnail'])
+    else:
+        images = pd.Series('', index=top_videos.index)
+    
+    render_cards(
+        images,
+        "Vídeo de " + top_videos['data_publicacao'].dt.strftime('%d/%m/%Y'),
+        details,
+        metrics,
+        prefix="video",
+        missing_image_text="Thumbnail não disponível"
+    )
+
+# Função para criar visualizações de vídeos
+def create_videos_visualizations(data_videos, account_id=None):
+    if data_videos is None or data_videos.empty:
+        st.warning("Não há dados de vídeos disponíveis.")
+        return
+    
+    # Os dados chegam já recortados pela conta (ver partition_by_account em main)
+    
+    # Verificar se há dados para a conta
+    if len(data_videos) == 0:
+        st.warning(f"Não há dados de vídeos disponíveis para a conta selecionada: {account_id}")
+        return
+    
+    # Agregados memoizados por canal (ordenação, agrupamentos e top vídeos);
+    # a duração em minutos já vem calculada na carga (parse_durations em main)
+    summary = summarize_videos(data_videos)
+    data_videos = summary['videos']
+    
+    # Análise de desempenho por categoria
+    if 'categoria' in data_videos.columns:
+        st.subheader("Desempenho por Categoria")
+        
+        category_metrics = summary['category_metrics']
+        
+        render_category_chart(category_metrics, account_id)
     
     # Análise de duração do vídeo vs. desempenho
     if 'duracao' in data_videos.columns and 'visualizacoes' in data_videos.columns:
         st.subheader("Relação entre Duração e Desempenho")
         
-        # Converter duração para minutos se estiver em formato de string (HH:MM:SS)
-        if data_videos['duracao'].dtype == 'object':
-            try:
-                # Tentar converter de formato HH:MM:SS para minutos
-                data_videos['duracao_min'] = data_videos['duracao'].apply(
-                    lambda x: sum(int(x) * 60 ** i for i, x in enumerate(reversed(x.split(':'))))
-                ) / 60
-            except:
-                # Se falhar, tentar converter diretamente para número
-                data_videos['duracao_min'] = pd.to_numeric(data_videos['duracao'], errors='coerce')
-        else:
-            # Se já for numérico, assumir que está em segundos e converter para minutos
-            data_videos['duracao_min'] = data_videos['duracao'] / 60
-        
-        # Seletor de métrica para comparação
-        perf_metric = st.selectbox(
-            "Selecione a métrica de desempenho",
-            options=["Visualizações", "Likes", "Comentários", "Tempo Médio de Visualização", "CTR (%)"],
-            index=0,
-            key="duration_metric"
-        )
-        
-        # Mapear seleção para coluna
-        perf_mapping = {
-            "Visualizações": "visualizacoes",
-            "Likes": "likes",
-            "Comentários": "comentarios",
-            "Tempo Médio de Visualização": "tempo_medio_visualizacao",
-            "CTR (%)": "ctr"
-        }
-        
-        selected_perf = perf_mapping[perf_metric]
-        
-        # Verificar se a coluna selecionada existe
-        if selected_perf in data_videos.columns:
-            # Criar gráfico de dispersão
-            fig = px.scatter(
-                data_videos,
-                x='duracao_min',
-                y=selected_perf,
-                title=f"Relação entre Duração do Vídeo e {perf_metric}",
-                labels={'duracao_min': 'Duração (minutos)', selected_perf: perf_metric},
-                hover_name='titulo',
-                size='visualizacoes',
-                color='categoria' if 'categoria' in data_videos.columns else None,
-                height=500
-            )
-            
-            # Adicionar linha de tendência
-            fig.update_layout(
-                xaxis_title="Duração (minutos)",
-                yaxis_title=perf_metric,
-                template="plotly_white"
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.warning(f"A métrica {perf_metric} não está disponível nos dados.")
+        render_duration_chart(data_videos, account_id)
     
     # Melhores horários para publicar
     if 'data_publicacao' in data_videos.columns:
         st.subheader("Melhores Horários para Publicar")
         
-        # Extrair hora do dia
-        data_videos['hora'] = data_videos['data_publicacao'].dt.hour
-        
-        # Verificar qual métrica usar para avaliar desempenho
-        perf_cols = ['visualizacoes', 'likes', 'comentarios', 'taxa_engajamento']
-        available_perf = [col for col in perf_cols if col in data_videos.columns]
+        # Cubo dia da semana × hora atualizado apenas com os vídeos novos
+        posting_cube = get_posting_cube('youtube', account_id, list(POSTING_METRICS.values()))
+        posting_cube.update(data_videos, id_column='id_video')
         
-        if available_perf:
-            # Usar a primeira métrica disponível
-            perf_col = available_perf[0]
-            
-            # Agrupar por hora
-            hourly_performance = data_videos.groupby('hora').agg({
-                perf_col: 'mean'
-            }).reset_index()
-            
-            # Criar gráfico
-            fig = px.bar(
-                hourly_performance,
-                x='hora',
-                y=perf_col,
-                title=f"{perf_col.capitalize().replace('_', ' ')} Média por Hora do Dia",
-                labels={'hora': 'Hora do Dia', perf_col: perf_col.capitalize().replace('_', ' ')},
-                color_discrete_sequence=['#FF0000']
-            )
-            
-            # Ajustar layout
-            fig.update_layout(
-                xaxis_title="Hora do Dia",
-                yaxis_title=perf_col.capitalize().replace('_', ' '),
-                template="plotly_white",
-                height=400,
-                xaxis=dict(
-                    tickmode='linear',
-                    tick0=0,
-                    dtick=1
-                )
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+        render_posting_times(posting_cube, POSTING_METRICS, key=account_id, color_scale="Reds")
     
     # Top vídeos
     st.subheader("Top Vídeos por Visualizações")
     
-    # Ordenar por visualizações
-    top_videos = data_videos.sort_values('visualizacoes', ascending=False).head(5)
-    
-    # Exibir cards para os top vídeos
-    for _, video in top_videos.iterrows():
-        col1, col2 = st.columns([1, 2])
-        
-        with col1:
-            if 'thumbnail' in video and video['thumbnail']:
-                st.image(video['thumbnail'], caption=f"Vídeo de {video['data_publicacao'].strftime('%d/%m/%Y')}")
-            else:
-                st.write("Thumbnail não disponível")
-        
-        with col2:
-            if 'titulo' in video:
-                st.write(f"**Título:** {video['titulo']}")
-            
-            if 'categoria' in video:
-                st.write(f"**Categoria:** {video['categoria']}")
-            
-            if 'data_publicacao' in video:
-                st.write(f"**Data:** {video['data_publicacao'].strftime('%d/%m/%Y %H:%M')}")
-            
-            if 'duracao' in video:
-                st.write(f"**Duração:** {video['duracao']}")
-            
-            # Métricas do vídeo
-            metrics_col1, metrics_col2, metrics_col3, metrics_col4 = st.columns(4)
-            
-            with metrics_col1:
-                st.metric("Visualizações", f"{video['visualizacoes']:,.0f}")
-            
-            with metrics_col2:
-                st.metric("Likes", f"{video['likes']:,.0f}")
-            
-            with metrics_col3:
-                if 'tempo_assistido' in video:
-                    st.metric("Tempo Assistido", f"{video['tempo_assistido']:,.0f} min")
-            
-            with metrics_col4:
-                if 'ctr' in video:
-                    st.metric("CTR", f"{video['ctr']:.2f}%")
-        
-        st.markdown("---")
+    render_top_videos(summary['top_videos'], account_id)
     
     # Tabela completa de vídeos
     st.subheader("Todos os Vídeos")
     
-    # Formatar tabela
-    formatted_videos = data_videos.copy()
-    formatted_videos['data_publicacao'] = formatted_videos['data_publicacao'].dt.strftime('%d/%m/%Y %H:%M')
-    
-    # Formatar colunas numéricas
-    numeric_columns = ['visualizacoes', 'likes', 'comentarios', 'compartilhamentos', 'tempo_assistido', 'impressoes']
-    for col in numeric_columns:
-        if col in formatted_videos.columns:
-            formatted_videos[col] = formatted_videos[col].apply(lambda x: f"{x:,.0f}" if pd.notnull(x) else "")
-    
-    # Formatar CTR
-    if 'ctr' in formatted_videos.columns:
-        formatted_videos['ctr'] = formatted_videos['ctr'].apply(lambda x: f"{x:.2f}%" if pd.notnull(x) else "")
+    # Formatos de exibição (os valores continuam numéricos na tabela)
+    videos_formats = {
+        'data_publicacao': DATETIME,
+        'visualizacoes': INTEGER,
+        'likes': INTEGER,
+        'comentarios': INTEGER,
+        'compartilhamentos': INTEGER,
+        'tempo_assistido': INTEGER,
+        'impressoes': INTEGER,
+        'ctr': PERCENT
+    }
     
     # Selecionar e renomear colunas para exibição
     display_columns = ['data_publicacao', 'titulo', 'duracao', 'categoria', 'visualizacoes', 'likes', 'comentarios', 'tempo_assistido', 'ctr']
-    display_columns = [col for col in display_columns if col in formatted_videos.columns]
+    display_columns = [col for col in display_columns if col in data_videos.columns]
     
     column_mapping = {
         'data_publicacao': 'Data',
@@ -755,10 +715,8 @@ def create_videos_visualizations(data_videos, account_id=None):
         'ctr': 'CTR'
     }
     
-    formatted_videos = formatted_videos[display_columns].rename(columns={col: column_mapping.get(col, col) for col in display_columns})
-    
     # Exibir tabela
-    st.dataframe(formatted_videos, use_container_width=True)
+    show_paginated_table(data_videos[display_columns], formats=videos_formats, labels=column_mapping, key=f"videos_table_{account_id}", sort_by='data_publicacao')
 
 def main():
     st.title("📊 Dashboard PSI - YouTube Insights")
@@ -868,6 +826,11 @@ def main():
         # Mesclar informações de contas
         unique_accounts = pd.concat(accounts).drop_duplicates(subset=[account_column])
         
+        # Particionar os dados por conta uma única vez por atualização
+        channel_frames = partition_by_account(data_channel, account_column)
+        daily_frames = partition_by_account(data_daily, account_column)
+        videos_frames = partition_by_account(data_videos, account_column)
+        
         # Adicionar opção para visualizar todas as contas
         all_accounts_option = pd.DataFrame({
             account_column: ['all'],
@@ -901,17 +864,12 @@ def main():
                 </div>
                 """, unsafe_allow_html=True)
                 
-                # Criar abas para diferentes visualizações
-                tab1, tab2, tab3 = st.tabs(["Canal", "Métricas Diárias", "Vídeos"])
-                
-                with tab1:
-                    create_channel_visualizations(data_channel, account_id)
-                
-                with tab2:
-                    create_daily_visualizations(data_daily, account_id)
-                
-                with tab3:
-                    create_videos_visualizations(data_videos, account_id)
+                # Renderizar sob demanda apenas a aba aberta de cada conta
+                render_lazy_tabs({
+                    "Canal": lambda: create_channel_visualizations(get_account_frame(channel_frames, data_channel, account_id), account_id),
+                    "Métricas Diárias": lambda: create_daily_visualizations(get_account_frame(daily_frames, data_daily, account_id), account_id),
+                    "Vídeos": lambda: create_videos_visualizations(get_account_frame(videos_frames, data_videos, account_id), account_id)
+                }, key=f"account_view_{account_id}")
         else:
             # Mostrar dados da conta selecionada
             account_name = unique_accounts.loc[unique_accounts[account_column] == selected_account, 'nome_canal'].iloc[0]
@@ -921,13 +879,13 @@ def main():
             tab1, tab2, tab3 = st.tabs(["Canal", "Métricas Diárias", "Vídeos"])
             
             with tab1:
-                create_channel_visualizations(data_channel, selected_account)
+                create_channel_visualizations(get_account_frame(channel_frames, data_channel, selected_account), selected_account)
             
             with tab2:
-                create_daily_visualizations(data_daily, selected_account)
+                create_daily_visualizations(get_account_frame(daily_frames, data_daily, selected_account), selected_account)
             
             with tab3:
-                create_videos_visualizations(data_videos, selected_account)
+                create_videos_visualizations(get_account_frame(videos_frames, data_videos, selected_account), selected_account)
     else:
         # Apenas uma conta, mostrar dados diretamente
         # Criar abas para diferentes visualizações
@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
@@ -7,6 +8,12 @@ import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 import os
 import json
+from utils.sheets import read_worksheet
+from utils.attribution import read_ad_workbooks
+from utils.rollups import CATEGORY_COLORS, apply_spend_rollup
+from utils.pagination import paginate
+from utils.tables import show_paginated_table
+from utils.formatting import INTEGER, CURRENCY, PERCENT, RATIO, DATE
 
 st.set_page_config(
     page_title="Dashboard PSI - Objetivos de Campanha",
@@ -221,8 +228,7 @@ def load_campaign_objectives(client):
         
         # Carregar dados de campanhas
         try:
-            sheet_campaigns = sheet.worksheet('campanhas')
-            data_campaigns = pd.DataFrame(sheet_campaigns.get_all_records())
+            data_campaigns = read_worksheet(sheet, 'campanhas')
         except Exception as e:
             st.error(f"Erro ao carregar dados de campanhas: {str(e)}")
             data_campaigns = None
@@ -239,17 +245,7 @@ def process_campaign_data(data_campaigns):
         return None
     
     try:
-        # Converter datas
-        date_columns = ['data_inicio', 'data_fim', 'data_atualizacao']
-        for col in date_columns:
-            if col in data_campaigns.columns:
-                data_campaigns[col] = pd.to_datetime(data_campaigns[col], errors='coerce')
-        
-        # Converter métricas numéricas
-        numeric_columns = ['orcamento', 'gasto_atual', 'conversoes_meta', 'conversoes_atual']
-        for col in numeric_columns:
-            if col in data_campaigns.columns:
-                data_campaigns[col] = pd.to_numeric(data_campaigns[col], errors='coerce')
+        # Os tipos das colunas (datas e valores) já vêm do esquema da aba (ver utils/schemas.py)
         
         # Calcular métricas derivadas
         if all(col in data_campaigns.columns for col in ['gasto_atual', 'orcamento']):
@@ -258,25 +254,32 @@ def process_campaign_data(data_campaigns):
         if all(col in data_campaigns.columns for col in ['conversoes_atual', 'conversoes_meta']):
             data_campaigns['percentual_meta'] = (data_campaigns['conversoes_atual'] / data_campaigns['conversoes_meta'] * 100).round(2)
         
-        # Determinar status atual baseado nas datas
-        if all(col in data_campaigns.columns for col in ['data_inicio', 'data_fim', 'status']):
-            today = pd.Timestamp.now().date()
+        # Determinar status atual e ritmo de gasto baseados nas datas
+        if all(col in data_campaigns.columns for col in ['data_inicio', 'data_fim']):
+            today = pd.Timestamp.now().normalize()
+            start_dates = data_campaigns['data_inicio'].dt.normalize()
+            end_dates = data_campaigns['data_fim'].dt.normalize()
+            has_dates = start_dates.notna() & end_dates.notna()
             
-            # Atualizar status baseado nas datas
-            for idx, row in data_campaigns.iterrows():
-                if pd.isna(row['data_inicio']) or pd.isna(row['data_fim']):
-                    continue
-                
-                start_date = row['data_inicio'].date()
-                end_date = row['data_fim'].date()
-                
-                if row['status'] != 'PAUSADA':  # Não alterar status de campanhas pausadas manualmente
-                    if today < start_date:
-                        data_campaigns.at[idx, 'status'] = 'PLANEJADA'
-                    elif today > end_date:
-                        data_campaigns.at[idx, 'status'] = 'ENCERRADA'
-                    else:
-                        data_campaigns.at[idx, 'status'] = 'ATIVA'
+            if 'status' in data_campaigns.columns:
+                # Não alterar status de campanhas pausadas manualmente
+                to_update = has_dates & (data_campaigns['status'] != 'PAUSADA')
+                derived_status = np.select(
+                    [today < start_dates, today > end_dates],
+                    ['PLANEJADA', 'ENCERRADA'],
+                    default='ATIVA'
+                )
+                data_campaigns['status'] = data_campaigns['status'].where(~to_update, derived_status)
+            
+            # Dias corridos da campanha (contando o dia de início e o de fim)
+            data_campaigns['duracao_dias'] = (end_dates - start_dates).dt.days + 1
+            data_campaigns['dias_decorridos'] = ((today - start_dates).dt.days + 1).clip(lower=0).clip(upper=data_campaigns['duracao_dias'])
+            
+            # Gasto esperado até hoje com distribuição linear do orçamento
+            if all(col in data_campaigns.columns for col in ['orcamento', 'gasto_atual']):
+                valid_duration = data_campaigns['duracao_dias'].where(data_campaigns['duracao_dias'] > 0)
+                data_campaigns['gasto_esperado'] = (data_campaigns['orcamento'] * data_campaigns['dias_decorridos'] / valid_duration).round(2)
+                data_campaigns['ritmo_gasto'] = (data_campaigns['gasto_atual'] / data_campaigns['gasto_esperado'].where(data_campaigns['gasto_esperado'] > 0)).round(2)
         
         return data_campaigns
     
@@ -284,6 +287,86 @@ def process_campaign_data(data_campaigns):
         st.error(f"Erro ao processar dados de objetivos de campanha: {str(e)}")
         return None
 
+# Quantidade de cards de campanha exibidos por página em cada objetivo
+CAMPAIGNS_PER_PAGE = 10
+
+# Função para desenhar o card de uma campanha
+def render_campaign_card(campaign):
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        # Título e plataforma
+        st.markdown(f"### {campaign['nome_campanha']}")
+        st.markdown(f"**Plataforma:** {campaign['plataforma']}")
+        
+        # Status
+        status_class = {
+            'ATIVA': 'status-active',
+            'PAUSADA': 'status-paused',
+            'ENCERRADA': 'status-ended',
+            'PLANEJADA': 'status-planned'
+        }.get(campaign['status'], 'status-active')
+        
+        st.markdown(f"""
+        <span class="{status_class}">{campaign['status']}</span>
+        <span class="objective-{campaign['objetivo'].lower()}">{campaign['objetivo']}</span>
+        """, unsafe_allow_html=True)
+        
+        # Datas
+        if 'data_inicio' in campaign and 'data_fim' in campaign:
+            start_date = campaign['data_inicio'].strftime('%d/%m/%Y') if pd.notna(campaign['data_inicio']) else 'N/A'
+            end_date = campaign['data_fim'].strftime('%d/%m/%Y') if pd.notna(campaign['data_fim']) else 'N/A'
+            st.markdown(f"**Período:** {start_date} a {end_date}")
+        
+        # Descrição
+        if 'descricao' in campaign and pd.notna(campaign['descricao']):
+            st.markdown(f"**Descrição:** {campaign['descricao']}")
+    
+    with col2:
+        # Métricas
+        if 'orcamento' in campaign and 'gasto_atual' in campaign:
+            budget = campaign['orcamento'] if pd.notna(campaign['orcamento']) else 0
+            spent = campaign['gasto_atual'] if pd.notna(campaign['gasto_atual']) else 0
+            budget_pct = (spent / budget * 100) if budget > 0 else 0
+            
+            st.metric("Orçamento", f"R$ {budget:,.2f}")
+            st.metric("Gasto", f"R$ {spent:,.2f} ({budget_pct:.1f}%)")
+        
+        if 'conversoes_meta' in campaign and 'conversoes_atual' in campaign:
+            target = campaign['conversoes_meta'] if pd.notna(campaign['conversoes_meta']) else 0
+            conversions = campaign['conversoes_atual'] if pd.notna(campaign['conversoes_atual']) else 0
+            conv_pct = (conversions / target * 100) if target > 0 else 0
+            
+            st.metric("Meta", f"{target:,.0f}")
+            st.metric("Conversões", f"{conversions:,.0f} ({conv_pct:.1f}%)")
+    
+    st.markdown("---")
+
+# Função para desenhar os cards de campanhas agrupados por objetivo
+@st.fragment
+def render_campaign_cards(data_campaigns):
+    # Contagem por objetivo calculada uma única vez
+    objective_counts = data_campaigns['objetivo'].value_counts(sort=False)
+    
+    for objective, objective_campaigns in data_campaigns.groupby('objetivo', sort=False):
+        # Exibir cabeçalho do objetivo
+        st.markdown(f"""
+        <div class="category-header">
+            <h3>{objective} ({objective_counts[objective]} campanhas)</h3>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Exibir apenas os cards da página atual
+        page_campaigns = paginate(
+            objective_campaigns,
+            CAMPAIGNS_PER_PAGE,
+            key=f"campaign_cards_page_{objective}",
+            label="campanhas"
+        )
+        
+        for _, campaign in page_campaigns.iterrows():
+            render_campaign_card(campaign)
+
 # Função para criar visualizações de objetivos de campanha
 def create_campaign_objectives_visualizations(data_campaigns, platform=None, objective=None):
     if data_campaigns is None or data_campaigns.empty:
@@ -346,13 +429,7 @@ def create_campaign_objectives_visualizations(data_campaigns, platform=None, obj
         y='Quantidade',
         title="Distribuição de Campanhas por Objetivo",
         color='Objetivo',
-        color_discrete_map={
-            'PAX': '#E91E63',
-            'FRANQUIAS': '#9C27B0',
-            'HUB': '#FF9800',
-            'PNP': '#00BCD4',
-            '+PÚBLICO': '#8BC34A'
-        }
+        color_discrete_map=CATEGORY_COLORS
     )
     
     fig.update_layout(
@@ -384,6 +461,13 @@ def create_campaign_objectives_visualizations(data_campaigns, platform=None, obj
         with col3:
             st.metric("% do Orçamento Utilizado", f"{budget_percentage:.2f}%")
         
+        if 'fonte_gasto' in data_campaigns.columns:
+            automatic = (data_campaigns['fonte_gasto'] == 'Plataforma').sum()
+            st.caption(
+                f"Gasto e conversões de {automatic} de {len(data_campaigns)} campanhas calculados a partir das "
+                "métricas do Meta Ads e do Google Ads; as demais usam os valores da planilha."
+            )
+        
         # Agrupar por objetivo
         objective_budget = data_campaigns.groupby('objetivo').agg({
             'orcamento': 'sum',
@@ -486,127 +570,34 @@ def create_campaign_objectives_visualizations(data_campaigns, platform=None, obj
     # Detalhes das campanhas por objetivo
     st.subheader("Detalhes das Campanhas por Objetivo")
     
-    # Agrupar campanhas por objetivo
-    objectives = data_campaigns['objetivo'].unique()
-    
-    for objective in objectives:
-        # Filtrar campanhas pelo objetivo atual
-        objective_campaigns = data_campaigns[data_campaigns['objetivo'] == objective]
-        
-        # Exibir cabeçalho do objetivo
-        st.markdown(f"""
-        <div class="category-header">
-            <h3>{objective}</h3>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Exibir cards para cada campanha
-        for _, campaign in objective_campaigns.iterrows():
-            col1, col2 = st.columns([3, 1])
-            
-            with col1:
-                # Título e plataforma
-                st.markdown(f"### {campaign['nome_campanha']}")
-                st.markdown(f"**Plataforma:** {campaign['plataforma']}")
-                
-                # Status
-                status_class = {
-                    'ATIVA': 'status-active',
-                    'PAUSADA': 'status-paused',
-                    'ENCERRADA': 'status-ended',
-                    'PLANEJADA': 'status-planned'
-                }.get(campaign['status'], 'status-active')
-                
-                st.markdown(f"""
-                <span class="{status_class}">{campaign['status']}</span>
-                <span class="objective-{campaign['objetivo'].lower()}">{campaign['objetivo']}</span>
-                """, unsafe_allow_html=True)
-                
-                # Datas
-                if 'data_inicio' in campaign and 'data_fim' in campaign:
-                    start_date = campaign['data_inicio'].strftime('%d/%m/%Y') if pd.notna(campaign['data_inicio']) else 'N/A'
-                    end_date = campaign['data_fim'].strftime('%d/%m/%Y') if pd.notna(campaign['data_fim']) else 'N/A'
-                    st.markdown(f"**Período:** {start_date} a {end_date}")
-                
-                # Descrição
-                if 'descricao' in campaign and pd.notna(campaign['descricao']):
-                    st.markdown(f"**Descrição:** {campaign['descricao']}")
-            
-            with col2:
-                # Métricas
-                if 'orcamento' in campaign and 'gasto_atual' in campaign:
-                    budget = campaign['orcamento'] if pd.notna(campaign['orcamento']) else 0
-                    spent = campaign['gasto_atual'] if pd.notna(campaign['gasto_atual']) else 0
-                    budget_pct = (spent / budget * 100) if budget > 0 else 0
-                    
-                    st.metric("Orçamento", f"R$ {budget:,.2f}")
-                    st.metric("Gasto", f"R$ {spent:,.2f} ({budget_pct:.1f}%)")
-                
-                if 'conversoes_meta' in campaign and 'conversoes_atual' in campaign:
-                    target = campaign['conversoes_meta'] if pd.notna(campaign['conversoes_meta']) else 0
-                    conversions = campaign['conversoes_atual'] if pd.notna(campaign['conversoes_atual']) else 0
-                    conv_pct = (conversions / target * 100) if target > 0 else 0
-                    
-                    st.metric("Meta", f"{target:,.0f}")
-                    st.metric("Conversões", f"{conversions:,.0f} ({conv_pct:.1f}%)")
-            
-            st.markdown("---")
+    render_campaign_cards(data_campaigns)
     
     # Tabela completa de campanhas
     st.subheader("Todas as Campanhas")
     
-    # Formatar tabela
-    formatted_campaigns = data_campaigns.copy()
-    
-    # Formatar datas
-    date_columns = ['data_inicio', 'data_fim', 'data_atualizacao']
-    for col in date_columns:
-        if col in formatted_campaigns.columns:
-            formatted_campaigns[col] = formatted_campaigns[col].apply(
-                lambda x: x.strftime('%d/%m/%Y') if pd.notna(x) else ""
-            )
-    
-    # Formatar valores monetários
-    if 'orcamento' in formatted_campaigns.columns:
-        formatted_campaigns['orcamento'] = formatted_campaigns['orcamento'].apply(
-            lambda x: f"R$ {x:,.2f}" if pd.notna(x) else ""
-        )
-    
-    if 'gasto_atual' in formatted_campaigns.columns:
-        formatted_campaigns['gasto_atual'] = formatted_campaigns['gasto_atual'].apply(
-            lambda x: f"R$ {x:,.2f}" if pd.notna(x) else ""
-        )
-    
-    # Formatar conversões
-    if 'conversoes_meta' in formatted_campaigns.columns:
-        formatted_campaigns['conversoes_meta'] = formatted_campaigns['conversoes_meta'].apply(
-            lambda x: f"{x:,.0f}" if pd.notna(x) else ""
-        )
-    
-    if 'conversoes_atual' in formatted_campaigns.columns:
-        formatted_campaigns['conversoes_atual'] = formatted_campaigns['conversoes_atual'].apply(
-            lambda x: f"{x:,.0f}" if pd.notna(x) else ""
-        )
-    
-    # Formatar percentuais
-    if 'percentual_orcamento' in formatted_campaigns.columns:
-        formatted_campaigns['percentual_orcamento'] = formatted_campaigns['percentual_orcamento'].apply(
-            lambda x: f"{x:.2f}%" if pd.notna(x) else ""
-        )
-    
-    if 'percentual_meta' in formatted_campaigns.columns:
-        formatted_campaigns['percentual_meta'] = formatted_campaigns['percentual_meta'].apply(
-            lambda x: f"{x:.2f}%" if pd.notna(x) else ""
-        )
+    # Formatos de exibição (os valores continuam numéricos na tabela)
+    campaign_formats = {
+        'data_inicio': DATE,
+        'data_fim': DATE,
+        'orcamento': CURRENCY,
+        'gasto_atual': CURRENCY,
+        'percentual_orcamento': PERCENT,
+        'conversoes_meta': INTEGER,
+        'conversoes_atual': INTEGER,
+        'percentual_meta': PERCENT,
+        'dias_decorridos': INTEGER,
+        'gasto_esperado': CURRENCY,
+        'ritmo_gasto': RATIO
+    }
     
     # Selecionar e renomear colunas para exibição
     display_columns = [
         'nome_campanha', 'plataforma', 'objetivo', 'status', 
-        'data_inicio', 'data_fim', 'orcamento', 'gasto_atual', 
-        'percentual_orcamento', 'conversoes_meta', 'conversoes_atual', 
-        'percentual_meta'
+        'data_inicio', 'data_fim', 'dias_decorridos', 'orcamento', 'gasto_atual', 
+        'gasto_esperado', 'ritmo_gasto', 'percentual_orcamento', 'conversoes_meta', 
+        'conversoes_atual', 'percentual_meta', 'fonte_gasto'
     ]
-    display_columns = [col for col in display_columns if col in formatted_campaigns.columns]
+    display_columns = [col for col in display_columns if col in data_campaigns.columns]
     
     column_mapping = {
         'nome_campanha': 'Campanha',
@@ -620,15 +611,15 @@ def create_campaign_objectives_visualizations(data_campaigns, platform=None, obj
         'percentual_orcamento': '% Orçamento',
         'conversoes_meta': 'Meta',
         'conversoes_atual': 'Conversões',
-        'percentual_meta': '% Meta'
+        'percentual_meta': '% Meta',
+        'dias_decorridos': 'Dias Decorridos',
+        'gasto_esperado': 'Gasto Esperado',
+        'ritmo_gasto': 'Ritmo de Gasto',
+        'fonte_gasto': 'Fonte do Gasto'
     }
     
-    formatted_campaigns = formatted_campaigns[display_columns].rename(
-        columns={col: column_mapping.get(col, col) for col in display_columns}
-    )
-    
     # Exibir tabela
-    st.dataframe(formatted_campaigns, use_container_width=True)
+    show_paginated_table(data_campaigns[display_columns], formats=campaign_formats, labels=column_mapping, key="campaigns_table", sort_by='data_inicio')
 
 def main():
     st.title("📊 Dashboard PSI - Objetivos de Campanha")
@@ -644,6 +635,13 @@ def main():
     # Carregar dados de objetivos de campanha
     data_campaigns = load_campaign_objectives(client)
     
+    # Gasto e conversões atuais a partir das métricas do Meta Ads e do Google Ads
+    # (rollup diário incremental; campanhas sem correspondência mantêm os valores da planilha)
+    if data_campaigns is not None and not data_campaigns.empty:
+        ad_campaigns, ad_metrics = read_ad_workbooks(client)
+        if ad_metrics:
+            data_campaigns = apply_spend_rollup(data_campaigns, ad_campaigns, ad_metrics)
+    
     # Processar dados
     data_campaigns = process_campaign_data(data_campaigns)
     
@@ -0,0 +1,215 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime, timedelta
+import gspread
+from oauth2client.service_account import ServiceAccountCredentials
+import os
+from utils.attribution import build_attribution, read_ad_workbooks, summarize_attribution
+from utils.sheets import read_sales_and_leads
+from utils.charts import render_time_series
+from utils.tables import show_paginated_table
+from utils.formatting import INTEGER, CURRENCY
+
+st.set_page_config(
+    page_title="Dashboard PSI - Atribuição de Campanhas",
+    page_icon="📊",
+    layout="wide"
+)
+
+# Adicionar CSS customizado
+st.markdown("""
+    <style>
+    /* Estilo geral */
+    .stApp {
+        background-color: #FFFFFF;
+    }
+    
+    /* Métricas */
+    [data-testid="metric-container"] {
+        background-color: #f0f2f6;
+        padding: 20px;
+        border-radius: 10px;
+        border: 1px solid rgba(49, 51, 63, 0.1);
+    }
+    </style>
+""", unsafe_allow_html=True)
+
+# Formatos e rótulos de exibição da tabela de atribuição
+ATTRIBUTION_FORMATS = {
+    'custo': CURRENCY,
+    'leads': INTEGER,
+    'vendas': INTEGER,
+    'cpl': CURRENCY,
+    'cps': CURRENCY
+}
+
+ATTRIBUTION_LABELS = {
+    'plataforma': 'Plataforma',
+    'nome_campanha': 'Campanha',
+    'custo': 'Investimento',
+    'leads': 'Leads',
+    'vendas': 'Primeiras Sessões',
+    'cpl': 'Custo por Lead',
+    'cps': 'Custo por Sessão'
+}
+
+# Função para obter credenciais
+def get_credentials():
+    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+    
+    # Tentar várias abordagens para obter credenciais
+    creds = None
+    error_messages = []
+    
+    # 1. Tentar usar os segredos do Streamlit
+    try:
+        if "gcp_service_account" in st.secrets:
+            service_account_info = st.secrets["gcp_service_account"]
+            creds = ServiceAccountCredentials.from_json_keyfile_dict(service_account_info, scope)
+            st.sidebar.success("Usando credenciais dos segredos do Streamlit")
+        else:
+            error_messages.append("Segredos do Streamlit não contêm 'gcp_service_account'")
+    except Exception as e:
+        error_messages.append(f"Erro ao acessar segredos do Streamlit: {str(e)}")
+    
+    # 2. Tentar usar arquivo de credenciais local
+    if creds is None:
+        creds_path = './credenciais.json'
+        if os.path.exists(creds_path):
+            try:
+                creds = ServiceAccountCredentials.from_json_keyfile_name(creds_path, scope)
+                st.sidebar.success("Usando arquivo de credenciais local")
+            except Exception as e:
+                error_messages.append(f"Erro ao usar arquivo de credenciais local: {str(e)}")
+        else:
+            error_messages.append(f"Arquivo de credenciais não encontrado em: {creds_path}")
+    
+    # Se nenhuma credencial foi obtida, mostrar erro e retornar None
+    if creds is None:
+        st.error("Não foi possível obter credenciais para acessar o Google Sheets")
+        st.error("\n".join(error_messages))
+        st.info("Configure os segredos no Streamlit Cloud ou forneça o arquivo credenciais.json")
+        return None
+        
+    return creds
+
+# Função para carregar leads, vendas e as abas de anúncios
+def load_attribution_data(client):
+    try:
+        spreadsheet = client.open("[PAX] CENTRAL DADOS")
+        data_vendas, data_leads = read_sales_and_leads(spreadsheet)
+    except Exception as e:
+        st.error(f"Erro ao carregar leads e vendas: {str(e)}")
+        return None
+    
+    # Uma plataforma indisponível não impede a atribuição das demais
+    campaigns, metrics = read_ad_workbooks(client)
+    
+    if not metrics:
+        st.error("Nenhuma planilha de anúncios disponível para calcular o investimento.")
+        return None
+    
+    return data_leads, data_vendas, campaigns, metrics
+
+# Função para criar visualizações
+def create_visualizations(attribution):
+    if attribution.empty:
+        st.warning("Não há investimento, leads ou vendas atribuídos no período selecionado.")
+        return
+    
+    total_cost = attribution['custo'].sum()
+    total_leads = attribution['leads'].sum()
+    total_sales = attribution['vendas'].sum()
+    
+    # Exibir métricas principais
+    col1, col2, col3, col4, col5 = st.columns(5)
+    
+    with col1:
+        st.metric("Investimento", f"R$ {total_cost:,.2f}")
+    with col2:
+        st.metric("Leads Atribuídos", f"{total_leads:,.0f}")
+    with col3:
+        st.metric("Custo por Lead", f"R$ {total_cost / total_leads:,.2f}" if total_leads > 0 else "-")
+    with col4:
+        st.metric("Primeiras Sessões", f"{total_sales:,.0f}")
+    with col5:
+        st.metric("Custo por Sessão", f"R$ {total_cost / total_sales:,.2f}" if total_sales > 0 else "-")
+    
+    # Evolução diária
+    st.subheader("Custo por Lead e por Sessão ao Longo do Tempo")
+    
+    daily = summarize_attribution(attribution, ['data']).sort_values('data')
+    render_time_series(
+        daily,
+        'data',
+        traces=[
+            {'column': 'cpl', 'name': 'Custo por Lead'},
+            {'column': 'cps', 'name': 'Custo por Sessão', 'connectgaps': True}
+        ],
+        layout=dict(
+            title="Custo por Lead e por Primeira Sessão",
+            xaxis_title="Data",
+            yaxis_title="R$",
+            legend_title="Métricas",
+            template="plotly_white",
+            height=450
+        ),
+        key="attribution_daily"
+    )
+    
+    # Tabela por campanha
+    st.subheader("Atribuição por Campanha")
+    
+    show_paginated_table(
+        summarize_attribution(attribution),
+        formats=ATTRIBUTION_FORMATS,
+        labels=ATTRIBUTION_LABELS,
+        key="attribution_campaigns",
+        sort_by='custo'
+    )
+
+def main():
+    st.title("📊 Dashboard PSI - Atribuição de Campanhas")
+    
+    # Obter credenciais
+    creds = get_credentials()
+    if creds is None:
+        return
+    
+    # Conectar ao Google Sheets
+    client = gspread.authorize(creds)
+    
+    data = load_attribution_data(client)
+    if data is None:
+        return
+    
+    # Junção materializada uma vez por atualização dos dados (em cache)
+    attribution, coverage = build_attribution(*data)
+    
+    # Filtros na barra lateral
+    hoje = datetime.today()
+    st.sidebar.header("Filtros")
+    data_inicio = st.sidebar.date_input("Data de Início", value=hoje - timedelta(days=30))
+    data_fim = st.sidebar.date_input("Data de Fim", value=hoje)
+    
+    platforms = ["Todas"] + sorted(attribution['plataforma'].unique().tolist())
+    selected_platform = st.sidebar.selectbox("Plataforma", platforms)
+    
+    # A página apenas recorta a tabela já atribuída
+    period = attribution[
+        (attribution['data'] >= pd.to_datetime(data_inicio)) &
+        (attribution['data'] <= pd.to_datetime(data_fim))
+    ]
+    if selected_platform != "Todas":
+        period = period[period['plataforma'] == selected_platform]
+    
+    create_visualizations(period)
+    
+    st.caption(
+        f"Histórico completo: {coverage['leads_atribuidos']} de {coverage['leads']} leads e "
+        f"{coverage['vendas_atribuidas']} de {coverage['vendas']} primeiras sessões pagas "
+        "ligados a uma campanha pelo utm_campaign/Campaign (id ou nome da campanha)."
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+from datetime import datetime, timedelta
+import gspread
+from oauth2client.service_account import ServiceAccountCredentials
+import os
+from utils.facts import METRIC_LABELS, build_fact_table, read_fact_sources, summarize_facts
+from utils.charts import date_window, time_series_trace
+from utils.formatting import show_table, INTEGER, DECIMAL, CURRENCY
+
+st.set_page_config(
+    page_title="Dashboard PSI - Visão Geral das Plataformas",
+    page_icon="📊",
+    layout="wide"
+)
+
+# Adicionar CSS customizado
+st.markdown("""
+    <style>
+    /* Estilo geral */
+    .stApp {
+        background-color: #FFFFFF;
+    }
+    
+    /* Métricas */
+    [data-testid="metric-container"] {
+        background-color: #f0f2f6;
+        padding: 20px;
+        border-radius: 10px;
+        border: 1px solid rgba(49, 51, 63, 0.1);
+    }
+    </style>
+""", unsafe_allow_html=True)
+
+# Métricas em destaque no topo da página
+HEADLINE_METRICS = ['custo', 'impressoes', 'alcance', 'cliques', 'novos_seguidores']
+
+# Métricas monetárias ou fracionárias (as demais são contagens)
+METRIC_FORMATS = {
+    'custo': CURRENCY,
+    'valor_conversao': CURRENCY,
+    'horas_assistidas': DECIMAL,
+}
+
+# Função para obter credenciais
+def get_credentials():
+    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+    
+    # Tentar várias abordagens para obter credenciais
+    creds = None
+    error_messages = []
+    
+    # 1. Tentar usar os segredos do Streamlit
+    try:
+        if "gcp_service_account" in st.secrets:
+            service_account_info = st.secrets["gcp_service_account"]
+            creds = ServiceAccountCredentials.from_json_keyfile_dict(service_account_info, scope)
+            st.sidebar.success("Usando credenciais dos segredos do Streamlit")
+        else:
+            error_messages.append("Segredos do Streamlit não contêm 'gcp_service_account'")
+    except Exception as e:
+        error_messages.append(f"Erro ao acessar segredos do Streamlit: {str(e)}")
+    
+    # 2. Tentar usar arquivo de credenciais local
+    if creds is None:
+        creds_path = './credenciais.json'
+        if os.path.exists(creds_path):
+            try:
+                creds = ServiceAccountCredentials.from_json_keyfile_name(creds_path, scope)
+                st.sidebar.success("Usando arquivo de credenciais local")
+            except Exception as e:
+                error_messages.append(f"Erro ao usar arquivo de credenciais local: {str(e)}")
+        else:
+            error_messages.append(f"Arquivo de credenciais não encontrado em: {creds_path}")
+    
+    # Se nenhuma credencial foi obtida, mostrar erro e retornar None
+    if creds is None:
+        st.error("Não foi possível obter credenciais para acessar o Google Sheets")
+        st.error("\n".join(error_messages))
+        st.info("Configure os segredos no Streamlit Cloud ou forneça o arquivo credenciais.json")
+        return None
+        
+    return creds
+
+# Fragmento do gráfico diário: trocar a métrica redesenha apenas este gráfico
+@st.fragment
+def render_platform_trend(facts):
+    metrics = [metric for metric in METRIC_LABELS if metric in set(facts['metrica'].astype(str))]
+    
+    metric = st.selectbox(
+        "Selecione a métrica",
+        options=metrics,
+        format_func=lambda option: METRIC_LABELS[option],
+        index=metrics.index('impressoes') if 'impressoes' in metrics else 0,
+        key="overview_metric"
+    )
+    
+    daily = summarize_facts(facts, ['data', 'plataforma'], metrics=[metric]).sort_values('data')
+    daily_window = date_window(daily, 'data', key="overview_period")
+    
+    fig = go.Figure()
+    for platform, platform_daily in daily_window.groupby('plataforma', observed=True):
+        fig.add_trace(time_series_trace(platform_daily['data'], platform_daily[metric], platform))
+    
+    fig.update_layout(
+        title=f"{METRIC_LABELS[metric]} por Plataforma",
+        xaxis_title="Data",
+        yaxis_title=METRIC_LABELS[metric],
+        legend_title="Plataforma",
+        template="plotly_white",
+        height=450
+    )
+    
+    st.plotly_chart(fig, use_container_width=True)
+
+# Função para criar visualizações
+def create_visualizations(facts):
+    if facts.empty:
+        st.warning("Não há métricas disponíveis no período selecionado.")
+        return
+    
+    # Uma única agregação da tabela de fatos alimenta os indicadores e a tabela
+    by_platform = summarize_facts(facts, ['plataforma'])
+    
+    # Exibir métricas principais
+    headline = [metric for metric in HEADLINE_METRICS if metric in by_platform.columns]
+    for col, metric in zip(st.columns(len(headline) or 1), headline):
+        total = by_platform[metric].sum()
+        with col:
+            if METRIC_FORMATS.get(metric) == CURRENCY:
+                st.metric(METRIC_LABELS[metric], f"R$ {total:,.2f}")
+            else:
+                st.metric(METRIC_LABELS[metric], f"{total:,.0f}")
+    
+    # Tendência diária comparando as plataformas
+    st.subheader("Evolução Diária por Plataforma")
+    render_platform_trend(facts)
+    
+    # Comparativo entre plataformas
+    st.subheader("Comparativo entre Plataformas")
+    metrics = [metric for metric in METRIC_LABELS if metric in by_platform.columns]
+    show_table(
+        by_platform[['plataforma'] + metrics],
+        formats={metric: METRIC_FORMATS.get(metric, INTEGER) for metric in metrics},
+        labels={'plataforma': 'Plataforma', **{metric: METRIC_LABELS[metric] for metric in metrics}},
+        hide_index=True,
+        use_container_width=True
+    )
+    st.caption("Métricas que uma plataforma não fornece aparecem como zero.")
+
+def main():
+    st.title("📊 Dashboard PSI - Visão Geral das Plataformas")
+    
+    # Obter credenciais
+    creds = get_credentials()
+    if creds is None:
+        return
+    
+    # Conectar ao Google Sheets
+    client = gspread.authorize(creds)
+    
+    # Tabela de fatos diária com Meta Ads, Google Ads, Instagram e YouTube (em cache)
+    facts = build_fact_table(read_fact_sources(client))
+    
+    if facts.empty:
+        st.error("Nenhuma planilha de plataforma disponível para montar a visão geral.")
+        return
+    
+    # Filtros na barra lateral
+    hoje = datetime.today()
+    st.sidebar.header("Filtros")
+    data_inicio = st.sidebar.date_input("Data de Início", value=hoje - timedelta(days=30))
+    data_fim = st.sidebar.date_input("Data de Fim", value=hoje)
+    
+    platforms = sorted(facts['plataforma'].astype(str).unique().tolist())
+    selected_platforms = st.sidebar.multiselect("Plataformas", platforms, default=platforms)
+    
+    period = facts[
+        (facts['data'] >= pd.to_datetime(data_inicio)) &
+        (facts['data'] <= pd.to_datetime(data_fim)) &
+        (facts['plataforma'].isin(selected_platforms))
+    ]
+    
+    create_visualizations(period)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from datetime import datetime, timedelta
+import gspread
+from oauth2client.service_account import ServiceAccountCredentials
+import os
+from utils.attribution import read_ad_workbooks
+from utils.rollups import (
+    CATEGORY_COLORS, build_category_daily, campaign_categories, category_period_totals, get_daily_rollup
+)
+from utils.formatting import show_table, INTEGER, CURRENCY, PERCENT, RATIO
+
+st.set_page_config(
+    page_title="Dashboard PSI - Linhas de Negócio",
+    page_icon="📊",
+    layout="wide"
+)
+
+# Adicionar CSS customizado
+st.markdown("""
+    <style>
+    /* Estilo geral */
+    .stApp {
+        background-color: #FFFFFF;
+    }
+    
+    /* Métricas */
+    [data-testid="metric-container"] {
+        background-color: #f0f2f6;
+        padding: 20px;
+        border-radius: 10px;
+        border: 1px solid rgba(49, 51, 63, 0.1);
+    }
+    </style>
+""", unsafe_allow_html=True)
+
+# Opções de métricas para o gráfico diário
+METRIC_OPTIONS = {
+    "Investimento": "custo",
+    "Conversões": "conversoes",
+    "Valor de Conversão": "valor_conversao",
+    "Cliques": "cliques",
+    "Impressões": "impressoes"
+}
+
+# Formatos e rótulos de exibição da tabela de categorias
+CATEGORY_FORMATS = {
+    'custo': CURRENCY,
+    'conversoes': INTEGER,
+    'valor_conversao': CURRENCY,
+    'impressoes': INTEGER,
+    'cliques': INTEGER,
+    'ctr': PERCENT,
+    'cpc': CURRENCY,
+    'cpa': CURRENCY,
+    'roas': RATIO
+}
+
+CATEGORY_LABELS = {
+    'categoria': 'Categoria',
+    'plataforma': 'Plataforma',
+    'custo': 'Investimento',
+    'conversoes': 'Conversões',
+    'valor_conversao': 'Valor de Conversão',
+    'impressoes': 'Impressões',
+    'cliques': 'Cliques',
+    'ctr': 'CTR',
+    'cpc': 'CPC',
+    'cpa': 'CPA',
+    'roas': 'ROAS'
+}
+
+# Função para obter credenciais
+def get_credentials():
+    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+    
+    # Tentar várias abordagens para obter credenciais
+    creds = None
+    error_messages = []
+    
+    # 1. Tentar usar os segredos do Streamlit
+    try:
+        if "gcp_service_account" in st.secrets:
+            service_account_info = st.secrets["gcp_service_account"]
+            creds = ServiceAccountCredentials.from_json_keyfile_dict(service_account_info, scope)
+            st.sidebar.success("Usando credenciais dos segredos do Streamlit")
+        else:
+            error_messages.append("Segredos do Streamlit não contêm 'gcp_service_account'")
+    except Exception as e:
+        error_messages.append(f"Erro ao acessar segredos do Streamlit: {str(e)}")
+    
+    # 2. Tentar usar arquivo de credenciais local
+    if creds is None:
+        creds_path = './credenciais.json'
+        if os.path.exists(creds_path):
+            try:
+                creds = ServiceAccountCredentials.from_json_keyfile_name(creds_path, scope)
+                st.sidebar.success("Usando arquivo de credenciais local")
+            except Exception as e:
+                error_messages.append(f"Erro ao usar arquivo de credenciais local: {str(e)}")
+        else:
+            error_messages.append(f"Arquivo de credenciais não encontrado em: {creds_path}")
+    
+    # Se nenhuma credencial foi obtida, mostrar erro e retornar None
+    if creds is None:
+        st.error("Não foi possível obter credenciais para acessar o Google Sheets")
+        st.error("\n".join(error_messages))
+        st.info("Configure os segredos no Streamlit Cloud ou forneça o arquivo credenciais.json")
+        return None
+        
+    return creds
+
+# Função para montar o rollup diário por categoria a partir das duas plataformas
+def load_category_daily(client):
+    campaigns, metrics = read_ad_workbooks(client)
+    
+    if not metrics:
+        st.error("Nenhuma planilha de anúncios disponível para montar as categorias.")
+        return None
+    
+    # Mesmo rollup diário incremental usado na página de Objetivos
+    rollup = get_daily_rollup()
+    for platform, data in metrics.items():
+        if data is not None and not data.empty:
+            rollup.update(platform, data)
+    
+    return build_category_daily(rollup.daily, campaign_categories(campaigns))
+
+# Fragmento do gráfico diário: trocar a métrica redesenha apenas este gráfico
+@st.fragment
+def render_category_trend(category_daily):
+    metric_name = st.selectbox(
+        "Selecione a métrica",
+        options=list(METRIC_OPTIONS.keys()),
+        key="category_metric"
+    )
+    metric = METRIC_OPTIONS[metric_name]
+    
+    daily = category_daily.groupby(['data', 'categoria'], as_index=False)[metric].sum()
+    
+    fig = px.area(
+        daily,
+        x='data',
+        y=metric,
+        color='categoria',
+        color_discrete_map=CATEGORY_COLORS,
+        labels={'data': 'Data', metric: metric_name, 'categoria': 'Categoria'},
+        title=f"{metric_name} Diário por Categoria"
+    )
+    
+    fig.update_layout(template="plotly_white", height=450)
+    
+    st.plotly_chart(fig, use_container_width=True)
+
+# Função para criar visualizações
+def create_visualizations(category_daily, start, end):
+    period = category_daily[(category_daily['data'] >= pd.Timestamp(start)) & (category_daily['data'] <= pd.Timestamp(end))]
+    
+    if period.empty:
+        st.warning("Não há métricas de anúncios no período selecionado.")
+        return
+    
+    # Totais do período (em cache por período e plataformas)
+    totals = category_period_totals(category_daily, start, end)
+    
+    total_cost = totals['custo'].sum()
+    total_conversions = totals['conversoes'].sum()
+    total_value = totals['valor_conversao'].sum()
+    
+    # Exibir métricas principais
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Investimento", f"R$ {total_cost:,.2f}")
+    with col2:
+        st.metric("Conversões", f"{total_conversions:,.0f}")
+    with col3:
+        st.metric("CPA Médio", f"R$ {total_cost / total_conversions:,.2f}" if total_conversions > 0 else "-")
+    with col4:
+        st.metric("ROAS", f"{total_value / total_cost:.2f}x" if total_cost > 0 else "-")
+    
+    # Comparativo entre categorias
+    st.subheader("Investimento e Retorno por Categoria")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        fig = px.bar(
+            totals,
+            x='categoria',
+            y='custo',
+            color='categoria',
+            color_discrete_map=CATEGORY_COLORS,
+            labels={'categoria': 'Categoria', 'custo': 'Investimento (R$)'},
+            title="Investimento por Categoria"
+        )
+        fig.update_layout(template="plotly_white", showlegend=False)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        fig = px.bar(
+            totals,
+            x='categoria',
+            y='roas',
+            color='categoria',
+            color_discrete_map=CATEGORY_COLORS,
+            labels={'categoria': 'Categoria', 'roas': 'ROAS'},
+            title="ROAS por Categoria"
+        )
+        fig.update_layout(template="plotly_white", showlegend=False)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    show_table(
+        totals.sort_values('custo', ascending=False),
+        formats=CATEGORY_FORMATS,
+        labels=CATEGORY_LABELS,
+        hide_index=True,
+        use_container_width=True
+    )
+    
+    # Mesma comparação separada por plataforma
+    st.subheader("Categorias por Plataforma")
+    
+    show_table(
+        category_period_totals(category_daily, start, end, ('categoria', 'plataforma')),
+        formats=CATEGORY_FORMATS,
+        labels=CATEGORY_LABELS,
+        hide_index=True,
+        use_container_width=True
+    )
+    
+    # Evolução diária
+    st.subheader("Evolução Diária por Categoria")
+    render_category_trend(period)
+
+def main():
+    st.title("📊 Dashboard PSI - Linhas de Negócio")
+    
+    # Obter credenciais
+    creds = get_credentials()
+    if creds is None:
+        return
+    
+    # Conectar ao Google Sheets
+    client = gspread.authorize(creds)
+    
+    category_daily = load_category_daily(client)
+    if category_daily is None:
+        return
+    
+    # Filtros na barra lateral
+    hoje = datetime.today()
+    st.sidebar.header("Filtros")
+    data_inicio = st.sidebar.date_input("Data de Início", value=hoje - timedelta(days=30))
+    data_fim = st.sidebar.date_input("Data de Fim", value=hoje)
+    
+    platforms = sorted(category_daily['plataforma'].unique().tolist())
+    selected_platforms = st.sidebar.multiselect("Plataformas", platforms, default=platforms)
+    
+    category_daily = category_daily[category_daily['plataforma'].isin(selected_platforms)]
+    
+    create_visualizations(category_daily, data_inicio, data_fim)
+
+if __name__ == "__main__":
+    main()
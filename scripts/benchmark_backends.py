@@ -0,0 +1,99 @@
+"""Compara os backends pandas e Polars nas transformações de utils/backend.py.
+
+Uso:
+    python scripts/benchmark_backends.py [linhas] [repetições]
+
+Os dados são sintéticos: as células em texto, como as de get_all_values(),
+passam pelos esquemas de utils/schemas.py (decode_values), então os backends
+recebem os mesmos DataFrames tipados que read_worksheet() devolve.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import backend  # noqa: E402
+from utils.schemas import META_ADS, get_schema  # noqa: E402
+from utils.sheets import decode_values  # noqa: E402
+
+
+# Função para montar as células de uma aba no formato de get_all_values()
+def to_values(data):
+    return [list(data.columns)] + data.astype(str).to_numpy().tolist()
+
+
+# Função para gerar abas sintéticas de campanhas e métricas diárias já tipadas
+def make_sheets(rows, campaigns=500, seed=0):
+    rng = np.random.default_rng(seed)
+    campaign_ids = [f"C{i}" for i in range(campaigns)]
+
+    raw_campaigns = pd.DataFrame({
+        'id_campanha': campaign_ids,
+        'nome_campanha': [f"Campanha {i}" for i in range(campaigns)],
+        'objetivo': rng.choice(['PAX', 'FRANQUIAS', 'HUB', 'PNP'], campaigns),
+    })
+
+    dates = pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 2000, rows), unit='D')
+    raw_metrics = pd.DataFrame({
+        'data': dates.strftime('%Y-%m-%d'),
+        'id_campanha': rng.choice(campaign_ids, rows),
+        'impressoes': rng.integers(0, 10000, rows),
+        'cliques': rng.integers(0, 500, rows),
+        'conversoes': rng.integers(0, 50, rows),
+        'custo': rng.uniform(0, 1000, rows).round(2),
+        'valor_conversao': rng.uniform(0, 5000, rows).round(2),
+    }).astype(str)
+
+    # Células vazias como as que o Google Sheets devolve
+    blank = rng.random(rows) < 0.01
+    raw_metrics.loc[blank, 'custo'] = ''
+
+    data_campaigns, _ = decode_values(to_values(raw_campaigns), get_schema(META_ADS, 'campanhas'))
+    data_metrics, _ = decode_values(to_values(raw_metrics), get_schema(META_ADS, 'metricas'))
+
+    return data_campaigns, data_metrics
+
+
+# Função para medir o menor tempo de várias execuções
+def best_time(function, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    backends = ['pandas']
+    if backend.pl is not None:
+        backends.append('polars')
+    else:
+        print("Polars não está instalado; medindo apenas o backend pandas.")
+
+    data_campaigns, data_metrics = make_sheets(rows)
+    processed = backend.process_ad_metrics(data_campaigns, data_metrics, backend='pandas')
+
+    steps = {
+        'process_ad_metrics': lambda name: backend.process_ad_metrics(data_campaigns, data_metrics, backend=name),
+        'aggregate_ad_metrics (data)': lambda name: backend.aggregate_ad_metrics(processed, ['data'], backend=name),
+        'aggregate_ad_metrics (campanha)': lambda name: backend.aggregate_ad_metrics(processed, ['nome_campanha', 'objetivo'], backend=name),
+    }
+
+    print(f"{rows:,} linhas, melhor de {repeats} execuções (segundos)")
+    print(f"{'etapa':<34}" + "".join(f"{name:>10}" for name in backends))
+
+    for step, function in steps.items():
+        timings = [best_time(lambda: function(name), repeats) for name in backends]
+        print(f"{step:<34}" + "".join(f"{timing:>10.3f}" for timing in timings))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Verifica o cache de miniaturas (utils/image_cache.py) contra um servidor HTTP local.
+
+Uso:
+    python scripts/check_image_cache.py
+
+Um http.server local faz o papel da CDN. São conferidos: acerto do cache,
+imagem quebrada (com marcador de falha), conexão recusada, esquemas não
+permitidos, redirecionamento para file://, limite de tamanho, prazo total
+de download e a remoção das miniaturas menos usadas em _evict.
+"""
+import io
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import image_cache  # noqa: E402
+
+
+# Função para gerar uma imagem PNG válida
+def png_bytes(size=(800, 600), color=(200, 30, 30)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color=color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+REQUESTS = Counter()
+ROUTES = {
+    '/ok.png': png_bytes(),
+    '/outra.png': png_bytes(color=(30, 200, 30)),
+    '/grande.png': png_bytes(size=(2000, 2000)),
+    '/quebrada.jpg': b'isto nao e uma imagem',
+}
+
+
+class CdnHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        REQUESTS[self.path] += 1
+
+        if self.path == '/lenta.png':
+            time.sleep(3)
+
+        if self.path == '/redireciona':
+            self.send_response(302)
+            self.send_header('Location', 'file:///etc/passwd')
+            self.end_headers()
+            return
+
+        content = ROUTES.get(self.path, ROUTES['/ok.png'] if self.path == '/lenta.png' else None)
+        if content is None:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+# Função para obter uma porta local sem nenhum servidor escutando
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CdnHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    placeholder = image_cache._placeholder_bytes()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Acerto do cache: a segunda leitura não vai ao servidor
+        first = image_cache.get_thumbnail(f"{base}/ok.png", cache_dir)
+        second = image_cache.get_thumbnail(f"{base}/ok.png", cache_dir)
+        assert first == second and first != placeholder
+        assert REQUESTS['/ok.png'] == 1
+        assert Image.open(io.BytesIO(first)).size[0] <= image_cache.THUMBNAIL_SIZE[0]
+        print("ok - acerto do cache")
+
+        # Imagem quebrada: imagem neutra e nenhuma nova tentativa dentro de FAILURE_TTL
+        assert image_cache.get_thumbnail(f"{base}/quebrada.jpg", cache_dir) == placeholder
+        assert image_cache.get_thumbnail(f"{base}/quebrada.jpg", cache_dir) == placeholder
+        assert REQUESTS['/quebrada.jpg'] == 1
+        print("ok - imagem quebrada com marcador de falha")
+
+        # Conexão recusada
+        assert image_cache.get_thumbnail(f"http://127.0.0.1:{closed_port()}/x.png", cache_dir) == placeholder
+        print("ok - conexão recusada")
+
+        # Esquemas não permitidos e redirecionamento para file://
+        assert image_cache.get_thumbnail("file:///etc/passwd", cache_dir) == placeholder
+        assert image_cache.get_thumbnail(f"{base}/redireciona", cache_dir) == placeholder
+        print("ok - apenas http/https")
+
+        # Limite de tamanho da imagem original
+        assert len(ROUTES['/grande.png']) > 10_000
+        original_limit = image_cache.MAX_DOWNLOAD_BYTES
+        image_cache.MAX_DOWNLOAD_BYTES = 10_000
+        try:
+            assert image_cache.get_thumbnail(f"{base}/grande.png", cache_dir) == placeholder
+        finally:
+            image_cache.MAX_DOWNLOAD_BYTES = original_limit
+        print("ok - limite de tamanho")
+
+        # Prazo total: a página não espera downloads lentos
+        start = time.perf_counter()
+        thumbnails = image_cache.get_thumbnails([f"{base}/lenta.png", f"{base}/outra.png"], cache_dir, deadline=1)
+        assert time.perf_counter() - start < 2
+        assert thumbnails[f"{base}/lenta.png"] == placeholder
+        assert thumbnails[f"{base}/outra.png"] != placeholder
+        print("ok - prazo total de download")
+
+    # Remoção das menos usadas: as mais antigas saem primeiro
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for position, name in enumerate(['a', 'b', 'c']):
+            path = os.path.join(cache_dir, f"{name}.jpg")
+            with open(path, "wb") as cached_file:
+                cached_file.write(b"x" * 100)
+            os.utime(path, (1000 + position, 1000 + position))
+
+        image_cache._evict(cache_dir, 200)
+        assert sorted(os.listdir(cache_dir)) == ['b.jpg', 'c.jpg']
+        print("ok - remoção das menos usadas")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
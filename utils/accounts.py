@@ -0,0 +1,17 @@
+# Função para particionar um DataFrame por conta em uma única passagem
+def partition_by_account(data, account_column='id_conta'):
+    """Retorna um dicionário {id_conta: DataFrame} com as linhas de cada conta."""
+    if data is None or data.empty or account_column not in data.columns:
+        return {}
+
+    return {account_id: frame for account_id, frame in data.groupby(account_column, sort=False)}
+
+
+# Função para obter os dados de uma conta a partir das partições
+def get_account_frame(partitions, data, account_id=None):
+    """Retorna as linhas da conta sem refiltrar o DataFrame completo."""
+    if data is None or account_id is None:
+        return data
+
+    # Conta sem linhas neste DataFrame: devolver um recorte vazio com as mesmas colunas
+    return partitions.get(account_id, data.iloc[0:0])
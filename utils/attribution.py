@@ -0,0 +1,212 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import streamlit as st
+
+from utils.cohorts import event_masks
+from utils.schemas import GOOGLE_ADS, LEAD_SALE_FIELDS, META_ADS
+from utils.sheets import read_worksheet
+
+# Plataformas de anúncios com investimento diário
+PLATFORMS = ['Meta Ads', 'Google Ads']
+
+# Planilha de cada plataforma
+AD_SPREADSHEETS = {
+    'Meta Ads': META_ADS,
+    'Google Ads': GOOGLE_ADS,
+}
+
+# Plataforma indicada pelo utm_source/Source (usada para desempatar nomes repetidos)
+SOURCE_PLATFORMS = {
+    'facebook': 'Meta Ads',
+    'fb': 'Meta Ads',
+    'instagram': 'Meta Ads',
+    'ig': 'Meta Ads',
+    'meta': 'Meta Ads',
+    'google': 'Google Ads',
+    'youtube': 'Google Ads',
+}
+
+# Chave da linha diária de atribuição
+ATTRIBUTION_KEYS = ['plataforma', 'id_campanha', 'data']
+
+
+# Função para normalizar identificadores de campanha
+def campaign_keys(values):
+    """Normaliza ids/nomes de campanha para a chave de junção.
+
+    Remove acentos, passa para minúsculas e troca qualquer sequência de
+    símbolos por "_" (ex.: "Campanha Conversão - Abril" → "campanha_conversao_abril").
+    Cada texto distinto é normalizado uma única vez; vazios viram nulos.
+    """
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+    uniques = pa.array(pd.Series(uniques, dtype=object).astype(str), type=pa.string())
+
+    keys = pc.replace_substring_regex(pc.utf8_normalize(uniques, 'NFKD'), r'\p{Mn}', '')
+    keys = pc.replace_substring_regex(pc.utf8_lower(keys), r'[^a-z0-9]+', '_')
+    keys = pc.utf8_trim(keys, characters='_')
+    keys = pc.if_else(pc.equal(keys, ''), None, keys).to_numpy(zero_copy_only=False)
+
+    result = np.where(codes >= 0, keys.take(codes) if len(keys) else None, None)
+    return pd.Series(result, index=values.index, dtype=object)
+
+
+# Função para identificar a plataforma de origem de cada lead/venda
+def source_platforms(values):
+    sources = campaign_keys(values)
+    return sources.map(SOURCE_PLATFORMS)
+
+
+# Função para ler as abas de campanhas e métricas das plataformas de anúncios
+def read_ad_workbooks(client):
+    """Retorna `(campanhas, metricas)`, dicionários {plataforma: aba}.
+
+    Uma plataforma indisponível gera um aviso e fica de fora, sem impedir as demais.
+    """
+    campaigns = {}
+    metrics = {}
+
+    for platform in PLATFORMS:
+        try:
+            sheet = client.open(AD_SPREADSHEETS[platform])
+            campaigns[platform] = read_worksheet(sheet, 'campanhas')
+            metrics[platform] = read_worksheet(sheet, 'metricas')
+        except Exception as e:
+            st.warning(f"Não foi possível carregar os dados de {platform}: {str(e)}")
+
+    return campaigns, metrics
+
+
+# Função para montar o dicionário chave → campanha das plataformas
+def campaign_lookup(campaigns):
+    """Recebe {plataforma: aba 'campanhas'} e retorna as chaves aceitas de cada campanha.
+
+    Uma campanha é encontrada tanto pelo id quanto pelo nome.
+    """
+    frames = []
+    for platform, data in campaigns.items():
+        if data is None or data.empty:
+            continue
+
+        for column in ['id_campanha', 'nome_campanha']:
+            frames.append(pd.DataFrame({
+                'chave': campaign_keys(data[column]),
+                'plataforma': platform,
+                'id_campanha': data['id_campanha'].astype(str).to_numpy(),
+            }))
+
+    if not frames:
+        return pd.DataFrame(columns=['chave', 'plataforma', 'id_campanha'])
+
+    return pd.concat(frames, ignore_index=True).dropna(subset=['chave']).drop_duplicates()
+
+
+# Função para contar leads ou vendas por chave de campanha, origem e dia
+def _daily_events(data, date_column, campaign_column, source_column):
+    if data.empty or campaign_column not in data.columns:
+        return pd.DataFrame(columns=['chave', 'origem', 'data', 'eventos'])
+
+    events = pd.DataFrame({
+        'chave': campaign_keys(data[campaign_column]),
+        'origem': source_platforms(data[source_column]) if source_column in data.columns else None,
+        'data': data[date_column].dt.normalize(),
+    })
+
+    return events.groupby(['chave', 'origem', 'data'], dropna=False).size().rename('eventos').reset_index()
+
+
+# Função para ligar as contagens diárias às campanhas (junção por hash da chave)
+def _attach_campaigns(events, lookup):
+    """Retorna as contagens com plataforma e id_campanha.
+
+    Quando a chave existe em mais de uma campanha (ex.: o mesmo nome no Meta e
+    no Google), vale a campanha da plataforma indicada pela origem; se ainda
+    assim houver empate, o evento fica sem atribuição.
+    """
+    merged = events.merge(lookup, on='chave', how='inner')
+    group = ['chave', 'origem', 'data']
+
+    candidates = merged.groupby(group, dropna=False)['id_campanha'].transform('size')
+    merged = merged[(candidates == 1) | (merged['plataforma'] == merged['origem'])]
+
+    candidates = merged.groupby(group, dropna=False)['id_campanha'].transform('size')
+    return merged[candidates == 1]
+
+
+# Função para somar o investimento diário de cada campanha
+def _daily_spend(metrics):
+    frames = []
+    for platform, data in metrics.items():
+        if data is None or data.empty:
+            continue
+
+        frames.append(pd.DataFrame({
+            'plataforma': platform,
+            'id_campanha': data['id_campanha'].astype(str).to_numpy(),
+            'data': data['data'].dt.normalize().to_numpy(),
+            'custo': data['custo'].fillna(0).to_numpy(),
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=ATTRIBUTION_KEYS + ['custo'])
+
+    spend = pd.concat(frames, ignore_index=True).dropna(subset=['data'])
+    return spend.groupby(ATTRIBUTION_KEYS, as_index=False)['custo'].sum()
+
+
+# Função para materializar a atribuição diária por campanha
+@st.cache_data(show_spinner=False)
+def build_attribution(data_leads, data_vendas, campaigns, metrics):
+    """Junta investimento, leads e primeiras sessões pagas por plataforma, campanha e dia.
+
+    `campaigns` e `metrics` são dicionários {plataforma: aba}. Retorna
+    `(atribuicao, cobertura)`: a tabela diária com `custo`, `leads`, `vendas`,
+    `cpl` e `cps`, e as quantidades de leads e vendas com e sem campanha.
+    Calculada uma vez por atualização dos dados; a página só filtra o resultado.
+    """
+    campaign_column = LEAD_SALE_FIELDS['Campanha']
+    source_column = LEAD_SALE_FIELDS['Origem']
+
+    vendas = data_vendas[data_vendas['Status'] == 'Pago']
+    vendas = vendas[event_masks(vendas)['sessao']]
+
+    lookup = campaign_lookup(campaigns)
+    lead_events = _daily_events(data_leads, 'Submitted At', campaign_column['leads'], source_column['leads'])
+    sale_events = _daily_events(vendas, 'Data', campaign_column['vendas'], source_column['vendas'])
+
+    leads = _attach_campaigns(lead_events, lookup).groupby(ATTRIBUTION_KEYS)['eventos'].sum().rename('leads')
+    sales = _attach_campaigns(sale_events, lookup).groupby(ATTRIBUTION_KEYS)['eventos'].sum().rename('vendas')
+    spend = _daily_spend(metrics).set_index(ATTRIBUTION_KEYS)['custo']
+
+    attribution = pd.concat([spend, leads, sales], axis=1).fillna(0).reset_index()
+    attribution[['leads', 'vendas']] = attribution[['leads', 'vendas']].astype('int64')
+    attribution['cpl'] = attribution['custo'] / attribution['leads'].where(attribution['leads'] > 0)
+    attribution['cps'] = attribution['custo'] / attribution['vendas'].where(attribution['vendas'] > 0)
+
+    # Nome da campanha para exibição
+    names = pd.concat(
+        [data[['id_campanha', 'nome_campanha']].astype(str).assign(plataforma=platform)
+         for platform, data in campaigns.items() if data is not None and not data.empty]
+        or [pd.DataFrame(columns=['id_campanha', 'nome_campanha', 'plataforma'])]
+    ).drop_duplicates(['plataforma', 'id_campanha'])
+    attribution = attribution.merge(names, on=['plataforma', 'id_campanha'], how='left')
+    attribution['nome_campanha'] = attribution['nome_campanha'].fillna(attribution['id_campanha'])
+
+    coverage = {
+        'leads': int(lead_events['eventos'].sum()),
+        'leads_atribuidos': int(leads.sum()),
+        'vendas': int(sale_events['eventos'].sum()),
+        'vendas_atribuidas': int(sales.sum()),
+    }
+
+    return attribution.sort_values(ATTRIBUTION_KEYS, ignore_index=True), coverage
+
+
+# Função para consolidar a atribuição de um período por campanha
+def summarize_attribution(attribution, group_columns=('plataforma', 'nome_campanha')):
+    """Soma custo, leads e vendas por `group_columns` e recalcula CPL e CPS."""
+    summary = attribution.groupby(list(group_columns), as_index=False)[['custo', 'leads', 'vendas']].sum()
+    summary['cpl'] = summary['custo'] / summary['leads'].where(summary['leads'] > 0)
+    summary['cps'] = summary['custo'] / summary['vendas'].where(summary['vendas'] > 0)
+    return summary
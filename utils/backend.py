@@ -0,0 +1,167 @@
+import os
+
+import pandas as pd
+
+from utils.dates import SAMPLE_SIZE, candidate_formats, detect_date_format
+
+# Polars é opcional: sem ele todas as transformações usam pandas
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# Backend padrão, escolhido por implantação (ex.: PSI_BACKEND=polars)
+BACKENDS = ('pandas', 'polars')
+DEFAULT_BACKEND = os.environ.get('PSI_BACKEND', 'pandas').lower()
+
+AD_BASE_METRICS = ['impressoes', 'cliques', 'conversoes', 'custo', 'valor_conversao']
+
+
+# Função para resolver qual backend será usado
+def resolve_backend(backend=None):
+    """Retorna 'pandas' ou 'polars' (quando solicitado e instalado)."""
+    backend = (backend or DEFAULT_BACKEND).lower()
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: {backend}. Use um de {BACKENDS}.")
+
+    if backend == 'polars' and pl is None:
+        return 'pandas'
+
+    return backend
+
+
+# Função para converter um DataFrame vindo do Google Sheets para Polars
+def _to_polars(data, numeric_columns=()):
+    """Converte para um LazyFrame, tipando as colunas object do get_all_records.
+
+    As colunas object misturam números e textos vazios; as numéricas viram
+    Float64 (textos inválidos viram nulos) e as demais viram texto.
+    """
+    columns = []
+    for col in data.columns:
+        values = data[col]
+        if values.dtype == object:
+            dtype = pl.Float64 if col in numeric_columns else pl.String
+            columns.append(pl.Series(col, values.tolist(), dtype=dtype, strict=False))
+        else:
+            columns.append(pl.from_pandas(values))
+    return pl.DataFrame(columns).lazy()
+
+
+# Expressões Polars dos indicadores derivados de anúncios
+def _polars_ad_kpis():
+    return [
+        (pl.col('cliques') / pl.col('impressoes') * 100).round(2).alias('ctr'),
+        (pl.col('custo') / pl.col('cliques')).round(2).alias('cpc'),
+        (pl.col('custo') / pl.col('conversoes')).round(2).alias('cpa'),
+        (pl.col('valor_conversao') / pl.col('custo')).round(2).alias('roas'),
+    ]
+
+
+# Função para calcular os indicadores derivados de anúncios com pandas
+def _pandas_ad_kpis(data):
+    data['ctr'] = (data['cliques'] / data['impressoes'] * 100).round(2)
+    data['cpc'] = (data['custo'] / data['cliques']).round(2)
+    data['cpa'] = (data['custo'] / data['conversoes']).round(2)
+    data['roas'] = (data['valor_conversao'] / data['custo']).round(2)
+    return data
+
+
+# Função para executar o plano Polars e devolver um DataFrame pandas
+def _polars_collect(query):
+    # O plano preguiçoso é otimizado e executado em paralelo por collect()
+    return query.collect().to_pandas()
+
+
+# Função para escolher o formato de uma coluna de datas em texto
+def _date_format(values):
+    # Formato que lê toda a amostra ou, com valores inválidos, o que lê mais valores
+    detected = detect_date_format(values)
+    if detected is not None:
+        return detected
+
+    sample = pd.Series(values.dropna().unique()[:SAMPLE_SIZE], dtype=object).astype(str)
+    return max(candidate_formats(), key=lambda fmt: pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum())
+
+
+# Função para listar as colunas de data que ainda estão em texto
+def _text_date_formats(data, date_columns):
+    """Retorna {coluna: formato} só para as colunas de texto; as já tipadas pelo esquema ficam como estão.
+
+    O formato é escolhido uma vez por coluna e usado explicitamente pelos dois
+    backends, que assim leem as datas da mesma forma.
+    """
+    return {col: _date_format(data[col]) for col in date_columns if data[col].dtype == object}
+
+
+# Função para converter tipos das colunas
+def coerce_columns(data, numeric_columns=(), date_columns=(), backend=None):
+    """Converte colunas numéricas e de data (valores inválidos viram nulos)."""
+    numeric_columns = [col for col in numeric_columns if col in data.columns]
+    date_columns = [col for col in date_columns if col in data.columns]
+    date_formats = _text_date_formats(data, date_columns)
+
+    if resolve_backend(backend) == 'polars':
+        query = _to_polars(data, numeric_columns).with_columns(
+            [pl.col(col).cast(pl.Float64, strict=False) for col in numeric_columns]
+            + [pl.col(col).str.to_datetime(format=fmt, strict=False) for col, fmt in date_formats.items()]
+        )
+        return _polars_collect(query)
+
+    data = data.copy()
+    for col, fmt in date_formats.items():
+        data[col] = pd.to_datetime(data[col], format=fmt, errors='coerce')
+    for col in numeric_columns:
+        data[col] = pd.to_numeric(data[col], errors='coerce')
+    return data
+
+
+# Função para tipar as métricas de anúncios, calcular indicadores e juntar as campanhas
+def process_ad_metrics(data_campaigns, data_metrics, backend=None):
+    """Equivalente ao processamento das páginas de anúncios: tipos, CTR/CPC/CPA/ROAS e merge."""
+    numeric_columns = [col for col in AD_BASE_METRICS if col in data_metrics.columns]
+
+    if resolve_backend(backend) == 'polars':
+        date_formats = _text_date_formats(data_metrics, ['data'] if 'data' in data_metrics.columns else [])
+        metrics = _to_polars(data_metrics, numeric_columns).with_columns(
+            [pl.col(col).str.to_datetime(format=fmt, strict=False) for col, fmt in date_formats.items()]
+            + [pl.col(col).cast(pl.Float64, strict=False) for col in numeric_columns]
+        ).with_columns(_polars_ad_kpis())
+
+        # Mesmos sufixos do pd.merge para colunas presentes nas duas abas
+        overlap = (set(data_metrics.columns) & set(data_campaigns.columns)) - {'id_campanha'}
+        metrics = metrics.rename({col: f'{col}_x' for col in overlap})
+        campaigns = _to_polars(data_campaigns).rename({col: f'{col}_y' for col in overlap})
+
+        return _polars_collect(metrics.join(campaigns, on='id_campanha', how='left'))
+
+    data_metrics = coerce_columns(data_metrics, numeric_columns, ['data'], backend='pandas')
+    data_metrics = _pandas_ad_kpis(data_metrics)
+    return pd.merge(data_metrics, data_campaigns, on='id_campanha', how='left')
+
+
+# Função para agregar métricas de anúncios e recalcular os indicadores
+def aggregate_ad_metrics(data, group_columns, backend=None):
+    """Soma as métricas base por `group_columns` e recalcula CTR, CPC, CPA e ROAS.
+
+    Linhas com chave de agrupamento vazia (ex.: métricas de uma campanha que
+    não está na aba 'campanhas') ficam de fora nos dois backends, como no
+    groupby do pandas.
+    """
+    if isinstance(group_columns, str):
+        group_columns = [group_columns]
+
+    if resolve_backend(backend) == 'polars':
+        query = (
+            _to_polars(data[group_columns + AD_BASE_METRICS])
+            .drop_nulls(group_columns)
+            .group_by(group_columns, maintain_order=False)
+            .agg([pl.col(col).sum() for col in AD_BASE_METRICS])
+            .sort(group_columns)
+            .with_columns(_polars_ad_kpis())
+        )
+        return _polars_collect(query)
+
+    metrics = data.groupby(group_columns).agg({col: 'sum' for col in AD_BASE_METRICS}).reset_index()
+    return _pandas_ad_kpis(metrics)
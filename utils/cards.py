@@ -0,0 +1,69 @@
+import html
+
+import pandas as pd
+import streamlit as st
+
+
+# Função para escapar uma coluna de texto para uso em HTML
+def escape_text(values):
+    """Converte a Series em texto seguro para HTML (nulos viram texto vazio)."""
+    return values.astype(object).fillna('').astype(str).map(html.escape)
+
+
+# Função para formatar contagens para os cards
+def format_count(values, suffix=''):
+    """Formata a Series como inteiros com separador de milhar."""
+    return values.fillna(0).map('{:,.0f}'.format) + suffix
+
+
+# Função para formatar percentuais para os cards
+def format_percent(values):
+    """Formata a Series (já em escala 0-100) com duas casas e o símbolo %."""
+    return values.fillna(0).map('{:.2f}%'.format)
+
+
+# Função para desenhar uma lista de cards em um único bloco HTML
+def render_cards(images, captions, details, metrics, prefix, missing_image_text):
+    """Monta todos os cards de uma vez e envia um único elemento ao navegador.
+
+    `images` e `captions` são Series alinhadas (URL da imagem e legenda);
+    `details` e `metrics` mapeiam o rótulo exibido para uma Series de texto
+    já formatado. As classes CSS seguem o padrão `{prefix}-card`,
+    `{prefix}-image`, `{prefix}-metric` etc. definido em cada página.
+    """
+    if len(images) == 0:
+        return
+
+    image_urls = escape_text(images)
+    has_image = image_urls.str.strip() != ''
+
+    media = pd.Series(
+        f'<p class="{prefix}-no-image">{html.escape(missing_image_text)}</p>',
+        index=images.index
+    )
+    media = media.where(
+        ~has_image,
+        f'<img class="{prefix}-image" src="' + image_urls + '"/>'
+        + f'<p class="{prefix}-caption">' + escape_text(captions) + '</p>'
+    )
+
+    body = pd.Series('', index=images.index)
+    for label, values in details.items():
+        body = body + f'<p><strong>{html.escape(label)}:</strong> ' + escape_text(values) + '</p>'
+
+    metric_blocks = pd.Series('', index=images.index)
+    for label, values in metrics.items():
+        metric_blocks = (
+            metric_blocks
+            + f'<div class="{prefix}-metric"><div class="{prefix}-metric-value">'
+            + escape_text(values)
+            + f'</div><div class="{prefix}-metric-label">{html.escape(label)}</div></div>'
+        )
+
+    cards = (
+        f'<div class="{prefix}-card"><div class="{prefix}-card-media">' + media + '</div>'
+        + f'<div class="{prefix}-card-body">' + body
+        + f'<div class="{prefix}-metrics">' + metric_blocks + '</div></div></div>'
+    )
+
+    st.markdown(''.join(cards), unsafe_allow_html=True)
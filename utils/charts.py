@@ -0,0 +1,113 @@
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+# Acima deste número de pontos por série os traços passam a usar WebGL
+WEBGL_THRESHOLD = 500
+
+# Número máximo de pontos enviados ao navegador por série
+MAX_POINTS = 1500
+
+
+# Função para escolher os pontos de uma série com o algoritmo LTTB
+def lttb_indices(x, y, threshold):
+    """Retorna os índices dos pontos mantidos pelo Largest-Triangle-Three-Buckets.
+
+    O LTTB preserva picos e vales da série escolhendo, em cada faixa, o ponto
+    que forma o maior triângulo com o ponto anterior e a média da faixa seguinte.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    bucket_size = (n - 2) / (threshold - 2)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    selected = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        areas = np.abs(
+            (x[selected] - avg_x) * (y[start:end] - y[selected])
+            - (x[selected] - x[start:end]) * (avg_y - y[selected])
+        )
+        selected = start + int(np.argmax(areas))
+        indices[i + 1] = selected
+
+    return indices
+
+
+# Função para criar o traço de uma série temporal longa
+def time_series_trace(x, y, name, max_points=MAX_POINTS, **kwargs):
+    """Cria um go.Scatter (ou go.Scattergl em séries longas) já reduzido por LTTB."""
+    valid = x.notna() & y.notna()
+    x = x[valid]
+    y = y[valid]
+
+    if len(x) > max_points:
+        # Posições relativas ao primeiro ponto para manter a precisão das datas
+        x_values = x.astype('int64').to_numpy(dtype='float64')
+        x_values = x_values - x_values[0]
+        keep = lttb_indices(x_values, y.to_numpy(dtype='float64'), max_points)
+        x = x.iloc[keep]
+        y = y.iloc[keep]
+
+    if len(x) > WEBGL_THRESHOLD:
+        return go.Scattergl(x=x, y=y, mode='lines', name=name, **kwargs)
+
+    return go.Scatter(x=x, y=y, mode='lines+markers', name=name, **kwargs)
+
+
+# Função para recortar o período exibido em séries longas
+def date_window(data, date_column, key, max_points=MAX_POINTS):
+    """Exibe um seletor de período quando a série excede `max_points`.
+
+    O Streamlit não devolve o zoom do gráfico ao servidor, então aproximar é
+    feito por este seletor: períodos menores são enviados em resolução total.
+    """
+    if len(data) <= max_points:
+        return data
+
+    min_date = data[date_column].min().date()
+    max_date = data[date_column].max().date()
+
+    start_date, end_date = st.slider(
+        "Período",
+        min_value=min_date,
+        max_value=max_date,
+        value=(min_date, max_date),
+        format="DD/MM/YYYY",
+        key=key
+    )
+
+    dates = data[date_column].dt.date
+    window = data[(dates >= start_date) & (dates <= end_date)]
+
+    if len(window) > max_points:
+        st.caption(f"Série reduzida para {max_points} pontos por métrica. Diminua o período para ver todos os dias.")
+
+    return window
+
+
+# Fragmento de gráfico de série temporal: mudar o período redesenha apenas este gráfico
+@st.fragment
+def render_time_series(data, date_column, traces, layout, key):
+    """Desenha as séries de `traces` (dicts com 'column', 'name' e opções do traço)."""
+    window = date_window(data, date_column, key=f"{key}_periodo")
+
+    fig = go.Figure()
+
+    for trace in traces:
+        options = {option: value for option, value in trace.items() if option not in ('column', 'name')}
+        fig.add_trace(time_series_trace(window[date_column], window[trace['column']], trace['name'], **options))
+
+    fig.update_layout(**layout)
+
+    st.plotly_chart(fig, use_container_width=True, key=key)
@@ -0,0 +1,239 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+# Janelas (em dias após o lead) acompanhadas em cada coorte
+HORIZONS = [1, 7, 14, 30, 60]
+
+# Eventos de conversão: rótulo e filtro sobre as vendas pagas
+EVENTS = {
+    'sessao': 'Primeira Sessão',
+    'pacote': 'Primeiro Pacote',
+}
+
+
+# Função para identificar quais vendas pagas são cada evento de conversão
+def event_masks(data_vendas):
+    return {
+        'sessao': data_vendas['Recebedores'] == 'Recebedor padrão',
+        'pacote': data_vendas['Pacote'] == '1º Pacote',
+    }
+
+
+# Função para calcular os dias até cada evento por lead
+def conversion_days(data_vendas, vinculos):
+    """Retorna, por lead, os dias até a primeira sessão e até o primeiro pacote.
+
+    `vinculos` é o resultado de `match_sales_to_leads` para as vendas pagas;
+    leads sem o evento ficam com NaN na coluna correspondente.
+    """
+    sales = data_vendas.loc[vinculos.index]
+    days = {}
+
+    for event, mask in event_masks(sales).items():
+        days[event] = vinculos.loc[mask.to_numpy(), :].groupby('lead')['dias_para_converter'].min()
+
+    return pd.DataFrame(days).rename_axis('lead')
+
+
+class CohortMatrix:
+    """Matriz de coortes semanais de leads × janelas de conversão.
+
+    A quantidade de leads por semana é acumulada à medida que a aba recebe
+    linhas novas; as conversões de cada lead ficam guardadas e, a cada
+    atualização, só as semanas com leads novos ou conversões alteradas são
+    recalculadas.
+    """
+
+    def __init__(self, date_column='Submitted At'):
+        self.date_column = date_column
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.rows = 0
+        self._weeks = np.array([], dtype='datetime64[ns]')
+        self._conversions = pd.DataFrame({event: pd.Series(dtype='float64') for event in EVENTS})
+        self.matrix = pd.DataFrame(
+            {'leads': pd.Series(dtype='int64'),
+             **{f'{event}_{horizon}d': pd.Series(dtype='int64') for event in EVENTS for horizon in HORIZONS}},
+            index=pd.DatetimeIndex([], name='semana')
+        )
+
+    # Semana (segunda-feira) de cada data
+    @staticmethod
+    def _week_start(dates):
+        dates = pd.Series(dates).dt.normalize()
+        return (dates - pd.to_timedelta(dates.dt.dayofweek, unit='D')).to_numpy(dtype='datetime64[ns]')
+
+    # Incorporar leads novos e conversões alteradas
+    def update(self, leads, conversions):
+        """Sincroniza a matriz e retorna True se alguma semana mudou.
+
+        `conversions` vem de `conversion_days`, indexado pela posição do lead.
+        """
+        with self._lock:
+            # Linhas já incorporadas devem manter a mesma semana; senão recomeçar
+            if self.rows and len(leads) >= self.rows:
+                positions = np.unique(np.linspace(0, self.rows - 1, min(self.rows, 64)).astype(int))
+                current = self._week_start(leads[self.date_column].iloc[positions])
+                if not np.array_equal(current, self._weeks[positions], equal_nan=True):
+                    self._reset()
+            elif self.rows:
+                self._reset()
+
+            touched = []
+
+            if len(leads) > self.rows:
+                new_weeks = self._week_start(leads[self.date_column].iloc[self.rows:])
+                self._weeks = np.concatenate([self._weeks, new_weeks])
+                self.rows = len(leads)
+                touched.append(new_weeks)
+
+            conversions = conversions.reindex(columns=list(EVENTS)).astype('float64')
+            conversions = conversions[conversions.index < self.rows]
+
+            # Leads cujas conversões mudaram desde a última atualização
+            both = self._conversions.index.union(conversions.index)
+            old = self._conversions.reindex(both)
+            new = conversions.reindex(both)
+            changed = both[((old != new) & ~(old.isna() & new.isna())).any(axis=1).to_numpy()]
+
+            if len(changed):
+                touched.append(self._weeks[changed.to_numpy(dtype='int64')])
+                self._conversions = conversions
+
+            if not touched:
+                return False
+
+            touched = pd.DatetimeIndex(np.concatenate(touched)).dropna().unique()
+            self._recompute(touched)
+            return True
+
+    def _recompute(self, weeks):
+        in_weeks = np.isin(self._weeks, weeks.to_numpy())
+        rows = pd.DataFrame(index=weeks.sort_values())
+
+        rows['leads'] = pd.Series(self._weeks[in_weeks]).value_counts()
+        conversions = self._conversions[in_weeks[self._conversions.index.to_numpy(dtype='int64')]]
+        conversion_weeks = self._weeks[conversions.index.to_numpy(dtype='int64')]
+
+        for event in EVENTS:
+            days = conversions[event].to_numpy()
+            for horizon in HORIZONS:
+                converted = pd.Series(days <= horizon).groupby(conversion_weeks).sum()
+                rows[f'{event}_{horizon}d'] = converted
+
+        rows = rows.fillna(0).astype('int64')
+        rows.index.name = 'semana'
+
+        matrix = pd.concat([self.matrix.drop(index=weeks, errors='ignore'), rows[rows['leads'] > 0]])
+        self.matrix = matrix.sort_index()
+
+    # Percentual de leads convertidos por coorte e janela
+    def rates(self, event, reference_date=None):
+        """Matriz semana × janela com o % de leads convertidos.
+
+        Janelas que ainda não terminaram para a coorte (a semana mais o
+        horizonte passa de `reference_date`) ficam vazias.
+        """
+        reference_date = pd.Timestamp(reference_date or pd.Timestamp.today()).normalize()
+        columns = [f'{event}_{horizon}d' for horizon in HORIZONS]
+
+        rates = self.matrix[columns].div(self.matrix['leads'], axis=0) * 100
+        rates.columns = HORIZONS
+
+        # O último lead da semana entra seis dias depois do início dela
+        week_end = self.matrix.index + pd.Timedelta(days=6)
+        for horizon in HORIZONS:
+            rates.loc[week_end + pd.Timedelta(days=horizon) > reference_date, horizon] = np.nan
+
+        return rates
+
+    # Dias até o evento para os leads convertidos
+    def conversion_days(self, event):
+        return self._conversions[event].dropna()
+
+
+# Lock da criação das matrizes (sessões simultâneas pedem a mesma aba de leads)
+_store_lock = threading.Lock()
+
+
+# Função para manter as matrizes entre execuções e sessões
+@st.cache_resource(show_spinner=False)
+def _cohort_store():
+    return {}
+
+
+# Função para obter a matriz de coortes persistente de uma aba de leads
+def get_cohort_matrix(name):
+    store = _cohort_store()
+
+    with _store_lock:
+        if name not in store:
+            store[name] = CohortMatrix()
+
+        return store[name]
+
+
+# Fragmento das coortes: trocar o evento redesenha apenas esta seção
+@st.fragment
+def render_cohorts(cohorts, key):
+    event = st.segmented_control(
+        "Evento",
+        options=list(EVENTS.keys()),
+        format_func=lambda option: EVENTS[option],
+        default='sessao',
+        key=f"cohort_event_{key}"
+    ) or 'sessao'
+
+    rates = cohorts.rates(event)
+
+    if rates.empty:
+        st.info("Não há leads suficientes para montar as coortes.")
+        return
+
+    fig = px.imshow(
+        rates,
+        labels=dict(x="Dias após o lead", y="Semana do lead", color="% convertidos"),
+        x=[f"{horizon} dia" if horizon == 1 else f"{horizon} dias" for horizon in HORIZONS],
+        y=rates.index.strftime('%d/%m/%Y'),
+        color_continuous_scale="Blues",
+        aspect="auto",
+        text_auto='.1f',
+        title=f"% de Leads com {EVENTS[event]} por Coorte Semanal"
+    )
+
+    fig.update_layout(
+        template="plotly_white",
+        height=max(400, 18 * len(rates)),
+        yaxis=dict(autorange='reversed')
+    )
+
+    st.plotly_chart(fig, use_container_width=True, key=f"cohort_heatmap_{key}")
+    st.caption("Células vazias: a janela ainda não terminou para a coorte.")
+
+    # Distribuição do tempo até a conversão
+    days = cohorts.conversion_days(event)
+
+    if days.empty:
+        st.info("Nenhum lead convertido ainda.")
+        return
+
+    fig = px.histogram(
+        x=days.to_numpy(),
+        nbins=int(min(days.max(), 90)) + 1,
+        labels={'x': 'Dias até a conversão'},
+        title=f"Dias entre o Lead e a {EVENTS[event]}"
+    )
+
+    fig.update_layout(
+        template="plotly_white",
+        yaxis_title="Leads",
+        showlegend=False
+    )
+
+    st.plotly_chart(fig, use_container_width=True, key=f"cohort_days_{key}")
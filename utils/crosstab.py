@@ -0,0 +1,136 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from utils.formatting import show_table, INTEGER, PERCENT
+
+# Quantidade mínima de leads para exibir a conversão de uma combinação
+MIN_SAMPLE = 30
+
+# Pares sugeridos ao abrir o explorador
+DEFAULT_PAIR = ('Renda', 'Investimento')
+
+
+# Função para transformar colunas categóricas em códigos inteiros
+def encode_fields(data, columns):
+    """Retorna `(codigos, categorias)`: matriz linhas × colunas (-1 = vazio) e as categorias de cada coluna."""
+    codes = np.empty((len(data), len(columns)), dtype=np.int32)
+    categories = []
+
+    for position, column in enumerate(columns):
+        values = data[column].astype('category')
+        codes[:, position] = values.cat.codes.to_numpy()
+        categories.append(tuple(values.cat.categories.astype(str)))
+
+    return codes, tuple(categories)
+
+
+# Função para pré-calcular leads e convertidos de todos os pares de campos
+@st.cache_data(show_spinner=False, max_entries=20)
+def build_pair_cube(codes, converted, categories):
+    """Cubo esparso {(i, j): DataFrame} com `leads` e `convertidos` por combinação de valores.
+
+    Cada par é contado com um único np.bincount sobre o código combinado das
+    duas colunas; só as combinações com leads são guardadas.
+    """
+    cube = {}
+    converted = np.asarray(converted, dtype=np.float64)
+
+    # Código 0 reservado para respostas vazias, evitando filtrar linhas a cada par
+    shifted = np.asfortranarray(codes + 1)
+
+    for i, j in combinations(range(codes.shape[1]), 2):
+        size_a, size_b = len(categories[i]) + 1, len(categories[j]) + 1
+        combined = shifted[:, i].astype(np.int64) * size_b + shifted[:, j]
+
+        leads = np.bincount(combined, minlength=size_a * size_b)
+        convertidos = np.bincount(combined, weights=converted, minlength=size_a * size_b)
+
+        observed = np.flatnonzero(leads)
+        observed = observed[(observed // size_b > 0) & (observed % size_b > 0)]
+        cube[(i, j)] = pd.DataFrame({
+            'a': observed // size_b - 1,
+            'b': observed % size_b - 1,
+            'leads': leads[observed],
+            'convertidos': convertidos[observed].astype(np.int64),
+        })
+
+    return cube
+
+
+# Função para montar a tabela de um par a partir do cubo
+def pair_table(cube, categories, first, second, min_sample=MIN_SAMPLE):
+    """Retorna as combinações do par `(first, second)` com a conversão (vazia abaixo de `min_sample`)."""
+    swapped = first > second
+    i, j = (second, first) if swapped else (first, second)
+
+    table = cube[(i, j)].copy()
+    if swapped:
+        table = table.rename(columns={'a': 'b', 'b': 'a'})
+
+    table['valor_a'] = np.array(categories[first], dtype=object)[table['a'].to_numpy()]
+    table['valor_b'] = np.array(categories[second], dtype=object)[table['b'].to_numpy()]
+    table['conversao'] = (table['convertidos'] / table['leads'] * 100).where(table['leads'] >= min_sample)
+
+    return table[['valor_a', 'valor_b', 'leads', 'convertidos', 'conversao']]
+
+
+# Fragmento do explorador de pares: trocar os campos não recalcula o cubo
+@st.fragment
+def render_crosstab(cube, categories, field_names, key):
+    col1, col2, col3 = st.columns([2, 2, 1])
+
+    default_first = field_names.index(DEFAULT_PAIR[0]) if DEFAULT_PAIR[0] in field_names else 0
+    default_second = field_names.index(DEFAULT_PAIR[1]) if DEFAULT_PAIR[1] in field_names else 1
+
+    with col1:
+        first_name = st.selectbox("Linhas", options=field_names, index=default_first, key=f"crosstab_linhas_{key}")
+
+    with col2:
+        second_name = st.selectbox("Colunas", options=field_names, index=default_second, key=f"crosstab_colunas_{key}")
+
+    with col3:
+        min_sample = st.number_input("Mínimo de leads", min_value=1, value=MIN_SAMPLE, step=5, key=f"crosstab_minimo_{key}")
+
+    if first_name == second_name:
+        st.info("Escolha dois campos diferentes.")
+        return
+
+    table = pair_table(cube, categories, field_names.index(first_name), field_names.index(second_name), min_sample)
+
+    if table.empty:
+        st.info("Não há leads com resposta nos dois campos no período.")
+        return
+
+    matrix = table.pivot(index='valor_a', columns='valor_b', values='conversao')
+    leads = table.pivot(index='valor_a', columns='valor_b', values='leads').reindex_like(matrix)
+
+    fig = px.imshow(
+        matrix,
+        labels=dict(x=second_name, y=first_name, color="Conversão (%)"),
+        color_continuous_scale="Blues",
+        aspect="auto",
+        text_auto='.1f',
+        title=f"Conversão Real por {first_name} × {second_name}"
+    )
+
+    fig.update_traces(
+        customdata=leads.fillna(0).to_numpy(),
+        hovertemplate=f"{first_name}: %{{y}}<br>{second_name}: %{{x}}<br>Conversão: %{{z:.1f}}%<br>Leads: %{{customdata}}<extra></extra>"
+    )
+    fig.update_layout(template="plotly_white", height=max(400, 40 * len(matrix)))
+
+    st.plotly_chart(fig, use_container_width=True, key=f"crosstab_heatmap_{key}")
+    st.caption(f"Células vazias: combinações com menos de {min_sample} leads no período.")
+
+    show_table(
+        table.sort_values('leads', ascending=False),
+        formats={'leads': INTEGER, 'convertidos': INTEGER, 'conversao': PERCENT},
+        labels={'valor_a': first_name, 'valor_b': second_name, 'leads': 'Leads', 'convertidos': 'Convertidos', 'conversao': 'Conversão (%)'},
+        hide_index=True,
+        use_container_width=True,
+        key=f"crosstab_table_{key}"
+    )
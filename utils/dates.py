@@ -0,0 +1,224 @@
+import numpy as np
+import pandas as pd
+
+# Formato do pandas que lê toda a família ISO 8601: só data, com 'T' ou espaço,
+# frações de segundo e sufixos de fuso ('Z', '+0000', '-03:00')
+ISO8601 = 'ISO8601'
+
+# Formatos aceitos, do mais específico para o mais genérico dentro de cada ordem
+ISO_FORMATS = [
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%d',
+]
+DAYFIRST_FORMATS = [
+    '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M',
+    '%d/%m/%Y',
+]
+MONTHFIRST_FORMATS = [
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y %H:%M',
+    '%m/%d/%Y',
+]
+
+# Nome de cada ordem de dia/mês nas mensagens de erro
+ORDER_LABELS = {
+    tuple(DAYFIRST_FORMATS): 'dd/mm/aaaa',
+    tuple(MONTHFIRST_FORMATS): 'mm/dd/aaaa',
+}
+
+# Quantidade de valores distintos usados para detectar o formato da coluna
+SAMPLE_SIZE = 200
+# Quantidade de exemplos exibidos por formato no diagnóstico
+MAX_EXAMPLES = 3
+
+
+class MixedDateFormatError(ValueError):
+    """Coluna com datas em mais de um formato reconhecido."""
+
+
+# Função para listar os formatos candidatos na ordem de preferência
+def candidate_formats(dayfirst=False):
+    """Formatos ISO primeiro e depois dia/mês ou mês/dia, conforme `dayfirst`."""
+    return ISO_FORMATS + (DAYFIRST_FORMATS if dayfirst else MONTHFIRST_FORMATS)
+
+
+# Função para testar quais valores são lidos por um formato
+def _matches(values, date_format):
+    return pd.to_datetime(values, format=date_format, errors='coerce').notna()
+
+
+# Função para detectar o formato de uma coluna de datas a partir de uma amostra
+def detect_date_format(values, dayfirst=False, sample_size=SAMPLE_SIZE):
+    """Retorna o formato que lê toda a amostra de valores distintos, ou None.
+
+    Com `dayfirst`, datas como 05/06/2024 são lidas como 5 de junho; sem ele,
+    como 6 de maio. Nunca se mistura as duas ordens na mesma coluna.
+    """
+    sample = pd.Series(pd.unique(pd.Series(values, dtype=object).dropna())[:sample_size], dtype=object)
+    sample = sample.astype(str).str.strip()
+    sample = sample[sample != '']
+
+    if sample.empty:
+        return None
+
+    for date_format in candidate_formats(dayfirst):
+        if _matches(sample, date_format).all():
+            return date_format
+
+    return None
+
+
+# Função para reescrever datas dd/mm/aaaa ou mm/dd/aaaa de largura fixa em ISO
+def _to_iso(values, date_format):
+    """Reordena os caracteres para aaaa-mm-dd, que o pandas lê com o parser ISO.
+
+    Retorna `(textos_iso, largura_fixa)`; só as posições marcadas em
+    `largura_fixa` têm o tamanho e as barras esperadas pelo formato.
+
+    O parser de formatos não ISO (strptime) é várias vezes mais lento; como as
+    planilhas usam datas com zeros à esquerda, basta trocar as posições.
+    """
+    width = len(pd.Timestamp(2000, 1, 1).strftime(date_format))
+    # Um caractere a mais para identificar textos maiores que o formato
+    chars = values.astype(str).to_numpy().astype(f'U{width + 1}').view('U1').reshape(len(values), width + 1)
+    fixed_width = (chars[:, width] == '') & (chars[:, width - 1] != '') & (chars[:, 2] == '/') & (chars[:, 5] == '/')
+
+    day, month = (0, 3) if date_format.startswith('%d') else (3, 0)
+    order = [6, 7, 8, 9, 2, month, month + 1, 5, day, day + 1] + list(range(10, width))
+    iso = chars[:, order].copy()
+    iso[:, 4] = '-'
+    iso[:, 7] = '-'
+
+    return pd.Series(iso.view(f'U{width}').ravel(), index=values.index), pd.Series(fixed_width, index=values.index)
+
+
+# Função para converter datas ISO 8601 (com ou sem hora e fuso)
+def _parse_iso(values):
+    # Datas com fuso são levadas para UTC e perdem o fuso, para comparar com os filtros de período
+    parsed = pd.to_datetime(values, format=ISO8601, errors='coerce', utc=True)
+    return parsed.dt.tz_convert(None).astype('datetime64[ns]')
+
+
+# Função para converter valores com um formato explícito
+def _parse_with_format(values, date_format):
+    if date_format == ISO8601:
+        return _parse_iso(values)
+
+    parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    fixed_width = pd.Series(False, index=values.index)
+
+    if date_format in DAYFIRST_FORMATS + MONTHFIRST_FORMATS:
+        iso, fixed_width = _to_iso(values, date_format)
+
+        if fixed_width.any():
+            iso_format = '%Y-%m-%d' + date_format[len('%d/%m/%Y'):]
+            parsed[fixed_width] = pd.to_datetime(iso[fixed_width], format=iso_format, errors='coerce')
+
+    # Demais valores (sem zeros à esquerda ou já em ISO) vão direto ao formato explícito
+    if (~fixed_width).any():
+        parsed[~fixed_width] = pd.to_datetime(values[~fixed_width], format=date_format, errors='coerce')
+
+    return parsed
+
+
+# Função para converter valores de uma mesma ordem de dia/mês, com ou sem hora
+def _parse_order(values, formats):
+    parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+
+    for date_format in formats:
+        pending = parsed.isna()
+        if not pending.any():
+            break
+        parsed[pending] = _parse_with_format(values[pending], date_format)
+
+    return parsed
+
+
+# Função para converter uma coluna sem formato declarado
+def _parse_families(values, dayfirst):
+    """Lê ISO 8601 e a ordem de dia/mês indicada por `dayfirst`, com ou sem hora.
+
+    Só há conflito quando a coluna tem valores que apenas dd/mm lê e valores
+    que apenas mm/dd lê; nesse caso levanta `MixedDateFormatError`.
+    """
+    parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+
+    # ISO começa com o ano (aaaa-); o restante vai para a ordem de dia/mês
+    iso = (values.str.slice(4, 5) == '-').to_numpy(dtype=bool)
+    if iso.any():
+        parsed[iso] = _parse_iso(values[iso])
+
+    remaining = values[~iso & values.notna().to_numpy()]
+    if remaining.empty:
+        return parsed
+
+    preferred, other = (DAYFIRST_FORMATS, MONTHFIRST_FORMATS) if dayfirst else (MONTHFIRST_FORMATS, DAYFIRST_FORMATS)
+    as_preferred = _parse_order(remaining, preferred)
+    parsed[remaining.index] = as_preferred
+
+    # Valores que só a outra ordem lê só são conflito se outros só forem lidos pela ordem esperada
+    unread = remaining[as_preferred.isna()]
+    only_other = unread[_parse_order(unread, other).notna()] if not unread.empty else unread
+    if not only_other.empty:
+        read = remaining[as_preferred.notna()]
+        only_preferred = read[_parse_order(read, other).isna()]
+
+        if not only_preferred.empty:
+            raise MixedDateFormatError(_mixed_format_message([
+                (ORDER_LABELS[tuple(preferred)], only_preferred),
+                (ORDER_LABELS[tuple(other)], only_other),
+            ]))
+
+    return parsed
+
+
+# Função para montar o diagnóstico de colunas com formatos misturados
+def _mixed_format_message(groups):
+    lines = []
+    for date_format, values in groups:
+        examples = ', '.join(f"'{value}'" for value in values[:MAX_EXAMPLES])
+        lines.append(f"{date_format}: {len(values)} valor(es) distinto(s) (ex.: {examples})")
+
+    return (
+        "Datas em formatos misturados; padronize a coluna na planilha.\n"
+        + "\n".join(f"- {line}" for line in lines)
+    )
+
+
+# Função para converter uma coluna de texto em datas
+def parse_dates(values, date_format=None, dayfirst=False):
+    """Converte `values` em datetime64 (sem fuso).
+
+    Com `date_format`, usa só esse formato (ISO8601 para a família ISO).
+    Sem ele, aceita ISO 8601 e dd/mm ou mm/dd (conforme `dayfirst`), com ou
+    sem hora, na mesma coluna. Cada texto distinto é convertido uma única vez
+    e o resultado é reaproveitado nas linhas repetidas.
+
+    Retorna `(datas, invalidos)`, com `invalidos` marcando as células
+    preenchidas que não puderam ser lidas. Se a coluna misturar datas que só
+    dd/mm lê com datas que só mm/dd lê, levanta `MixedDateFormatError` com um
+    resumo por ordem.
+    """
+    values = pd.Series(values, dtype=object)
+
+    # Converter só os textos distintos e espalhar o resultado pelas linhas
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    uniques = np.char.strip(np.asarray(uniques, dtype=str))
+    uniques = pd.Series(uniques, dtype=object).mask(uniques == '')
+    blank = (codes == -1) | uniques.isna().to_numpy()[codes]
+
+    if uniques.isna().all():
+        return pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]'), pd.Series(False, index=values.index)
+
+    if date_format is None:
+        parsed_uniques = _parse_families(uniques, dayfirst)
+    else:
+        parsed_uniques = _parse_with_format(uniques, date_format)
+
+    parsed = pd.Series(parsed_uniques.to_numpy().take(codes), index=values.index, dtype='datetime64[ns]')
+    parsed[codes == -1] = pd.NaT
+
+    return parsed, pd.Series(parsed.isna().to_numpy() & ~blank, index=values.index)
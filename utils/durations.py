@@ -0,0 +1,51 @@
+import pandas as pd
+
+# Formatos aceitos para a duração dos vídeos
+CLOCK_PATTERN = r'^(?:(?P<horas>\d+):)?(?P<minutos>\d+):(?P<segundos>\d{1,2}(?:\.\d+)?)$'
+SECONDS_PATTERN = r'^\d+(?:\.\d+)?$'
+ISO_PATTERN = (
+    r'^P(?:(?P<dias>\d+)D)?'
+    r'(?:T(?:(?P<horas>\d+)H)?(?:(?P<minutos>\d+)M)?(?:(?P<segundos>\d+(?:\.\d+)?)S)?)?$'
+)
+
+
+# Função para converter a coluna de duração em segundos
+def parse_durations(values):
+    """Converte durações em segundos de forma vetorizada.
+
+    Aceita HH:MM:SS, MM:SS, segundos simples e ISO-8601 (ex.: PT12M5S).
+    Retorna `(segundos, invalidos)`: uma Series float com NaN onde o valor
+    não pôde ser interpretado e uma máscara booleana com essas linhas
+    (valores vazios não são considerados inválidos).
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        seconds = values.astype('float64')
+        return seconds, pd.Series(False, index=values.index)
+
+    text = values.astype('string').str.strip().str.upper().str.replace(',', '.', regex=False)
+    seconds = pd.Series(float('nan'), index=values.index, dtype='float64')
+
+    # HH:MM:SS ou MM:SS
+    clock = text.str.extract(CLOCK_PATTERN).astype('float64')
+    clock_seconds = clock['horas'].fillna(0) * 3600 + clock['minutos'] * 60 + clock['segundos']
+    seconds = seconds.fillna(clock_seconds)
+
+    # Segundos simples
+    plain = text.where(text.str.match(SECONDS_PATTERN, na=False))
+    seconds = seconds.fillna(pd.to_numeric(plain, errors='coerce'))
+
+    # ISO-8601 (PT#H#M#S); "P" e "PT" sozinhos não são durações válidas
+    iso = text.str.extract(ISO_PATTERN).astype('float64')
+    has_component = iso.notna().any(axis=1)
+    iso_seconds = (
+        iso['dias'].fillna(0) * 86400
+        + iso['horas'].fillna(0) * 3600
+        + iso['minutos'].fillna(0) * 60
+        + iso['segundos'].fillna(0)
+    )
+    seconds = seconds.fillna(iso_seconds.where(has_component)).astype('float64')
+
+    is_blank = text.isna() | (text == '')
+    invalid = (seconds.isna() & ~is_blank).astype(bool)
+
+    return seconds, invalid
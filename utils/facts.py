@@ -0,0 +1,200 @@
+import pandas as pd
+import streamlit as st
+
+from utils.schemas import GOOGLE_ADS, INSTAGRAM_INSIGHTS, META_ADS, YOUTUBE_INSIGHTS
+from utils.sheets import read_worksheet
+
+# Colunas da tabela de fatos unificada (formato longo, uma linha por métrica)
+FACT_COLUMNS = ['data', 'plataforma', 'conta', 'item', 'metrica', 'valor']
+
+# Abas que alimentam a tabela de fatos.
+# Cada origem informa as colunas de data, conta e item (campanha ou conteúdo;
+# None para métricas da conta) e o nome unificado de cada métrica. Métricas
+# acumuladas (ex.: inscritos, visualizações totais do vídeo) ficam de fora
+# para que a soma por dia não conte o mesmo valor duas vezes.
+AD_METRICS = {
+    'impressoes': 'impressoes',
+    'cliques': 'cliques',
+    'conversoes': 'conversoes',
+    'custo': 'custo',
+    'valor_conversao': 'valor_conversao',
+}
+
+FACT_SOURCES = [
+    {
+        'plataforma': 'Meta Ads',
+        'planilha': META_ADS,
+        'aba': 'metricas',
+        'data': 'data',
+        'conta': 'id_conta',
+        'item': 'id_campanha',
+        'metricas': AD_METRICS,
+    },
+    {
+        'plataforma': 'Google Ads',
+        'planilha': GOOGLE_ADS,
+        'aba': 'metricas',
+        'data': 'data',
+        'conta': 'id_conta',
+        'item': 'id_campanha',
+        'metricas': AD_METRICS,
+    },
+    {
+        'plataforma': 'Instagram',
+        'planilha': INSTAGRAM_INSIGHTS,
+        'aba': 'metricas_diarias',
+        'data': 'data',
+        'conta': 'id_conta',
+        'item': None,
+        'metricas': {
+            'alcance': 'alcance',
+            'impressoes': 'impressoes',
+            'visitas_perfil': 'visitas_perfil',
+            'cliques_site': 'cliques',
+            'novos_seguidores': 'novos_seguidores',
+        },
+    },
+    {
+        'plataforma': 'Instagram',
+        'planilha': INSTAGRAM_INSIGHTS,
+        'aba': 'posts',
+        'data': 'data_publicacao',
+        'conta': 'id_conta',
+        'item': 'id_post',
+        'metricas': {
+            'curtidas': 'curtidas',
+            'comentarios': 'comentarios',
+            'compartilhamentos': 'compartilhamentos',
+            'salvos': 'salvos',
+        },
+    },
+    {
+        'plataforma': 'YouTube',
+        'planilha': YOUTUBE_INSIGHTS,
+        'aba': 'metricas_diarias',
+        'data': 'data',
+        'conta': 'id_conta',
+        'item': None,
+        'metricas': {
+            'visualizacoes': 'visualizacoes',
+            'impressoes': 'impressoes',
+            'horas_assistidas': 'horas_assistidas',
+            'novos_inscritos': 'novos_seguidores',
+        },
+    },
+    {
+        'plataforma': 'YouTube',
+        'planilha': YOUTUBE_INSIGHTS,
+        'aba': 'videos',
+        'data': 'data_publicacao',
+        'conta': 'id_conta',
+        'item': 'id_video',
+        'metricas': {
+            'likes': 'curtidas',
+            'comentarios': 'comentarios',
+            'compartilhamentos': 'compartilhamentos',
+        },
+    },
+]
+
+# Nomes das métricas unificadas para exibição
+METRIC_LABELS = {
+    'impressoes': 'Impressões',
+    'cliques': 'Cliques',
+    'conversoes': 'Conversões',
+    'custo': 'Investimento',
+    'valor_conversao': 'Valor de Conversão',
+    'alcance': 'Alcance',
+    'visitas_perfil': 'Visitas ao Perfil',
+    'novos_seguidores': 'Novos Seguidores',
+    'visualizacoes': 'Visualizações',
+    'horas_assistidas': 'Horas Assistidas',
+    'curtidas': 'Curtidas',
+    'comentarios': 'Comentários',
+    'compartilhamentos': 'Compartilhamentos',
+    'salvos': 'Salvos',
+}
+
+
+# Função para ler todas as abas das origens, abrindo cada planilha uma vez
+def read_fact_sources(client):
+    """Retorna {(planilha, aba): DataFrame}; planilhas inacessíveis geram um aviso e são ignoradas."""
+    frames = {}
+    spreadsheets = {}
+
+    for source in FACT_SOURCES:
+        title = source['planilha']
+
+        try:
+            if title not in spreadsheets:
+                spreadsheets[title] = client.open(title)
+            frames[(title, source['aba'])] = read_worksheet(spreadsheets[title], source['aba'])
+        except Exception as e:
+            st.warning(f"Não foi possível carregar a aba '{source['aba']}' de {title}: {str(e)}")
+
+    return frames
+
+
+# Função para converter uma aba de origem para o formato longo
+def _melt_source(data, source):
+    metrics = {column: metric for column, metric in source['metricas'].items() if column in data.columns}
+    if not metrics or source['data'] not in data.columns:
+        return None
+
+    ids = pd.DataFrame({
+        'data': data[source['data']].dt.normalize(),
+        'conta': data[source['conta']].astype(str) if source['conta'] in data.columns else '',
+        'item': data[source['item']].astype(str) if source['item'] in data.columns else '',
+    })
+
+    long = pd.concat([ids, data[list(metrics)].rename(columns=metrics)], axis=1).melt(
+        id_vars=['data', 'conta', 'item'],
+        var_name='metrica',
+        value_name='valor'
+    )
+    long['plataforma'] = source['plataforma']
+
+    return long.dropna(subset=['data', 'valor'])
+
+
+# Função para montar a tabela de fatos unificada
+@st.cache_data(show_spinner=False, max_entries=1)
+def build_fact_table(frames):
+    """Empilha todas as origens de FACT_SOURCES em uma tabela longa diária.
+
+    Linhas com a mesma data, plataforma, conta, item e métrica são somadas.
+    As colunas de texto ficam como categorias, então a tabela inteira ocupa
+    pouco mais que as colunas de data e valor.
+    """
+    parts = []
+    for source in FACT_SOURCES:
+        data = frames.get((source['planilha'], source['aba']))
+        if data is None or data.empty:
+            continue
+
+        long = _melt_source(data, source)
+        if long is not None:
+            parts.append(long)
+
+    if not parts:
+        return pd.DataFrame({column: pd.Series(dtype=object) for column in FACT_COLUMNS})
+
+    facts = pd.concat(parts, ignore_index=True)
+    facts = facts.groupby(FACT_COLUMNS[:-1], as_index=False, sort=False)['valor'].sum()
+
+    for column in ['plataforma', 'conta', 'item', 'metrica']:
+        facts[column] = facts[column].astype('category')
+
+    return facts[FACT_COLUMNS].sort_values(['data', 'plataforma'], ignore_index=True)
+
+
+# Função para agregar a tabela de fatos
+def summarize_facts(facts, group_columns, metrics=None):
+    """Soma `valor` por `group_columns` e devolve as métricas como colunas."""
+    if metrics is not None:
+        facts = facts[facts['metrica'].isin(metrics)]
+
+    group_columns = list(group_columns)
+    summary = facts.groupby(group_columns + ['metrica'], observed=True)['valor'].sum()
+
+    return summary.unstack('metrica', fill_value=0).reset_index().rename_axis(columns=None)
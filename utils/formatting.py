@@ -0,0 +1,81 @@
+import streamlit as st
+
+# Formatos de exibição das tabelas.
+# Os valores continuam numéricos (e ordenáveis) no DataFrame; a formatação é
+# aplicada pelo navegador via column_config. Os formatos "localized" e
+# "percent" seguem o locale do navegador, o que em pt-BR produz os
+# separadores brasileiros (ex.: 1.234,56 e 12,5%).
+INTEGER = 'inteiro'
+DECIMAL = 'decimal'
+CURRENCY = 'moeda'
+PERCENT = 'percentual'
+RATIO = 'razao'
+DATE = 'data'
+DATETIME = 'data_hora'
+
+
+# Função para montar o column_config de uma tabela
+def build_column_config(formats, labels=None):
+    """Converte {coluna: formato} em column_config do st.dataframe."""
+    labels = labels or {}
+    column_config = {}
+
+    for col, fmt in formats.items():
+        label = labels.get(col, col)
+
+        if fmt == INTEGER:
+            column_config[col] = st.column_config.NumberColumn(label, format="localized")
+        elif fmt == DECIMAL:
+            column_config[col] = st.column_config.NumberColumn(label, format="localized")
+        elif fmt == CURRENCY:
+            column_config[col] = st.column_config.NumberColumn(f"{label} (R$)", format="localized")
+        elif fmt == PERCENT:
+            column_config[col] = st.column_config.NumberColumn(label, format="percent")
+        elif fmt == RATIO:
+            column_config[col] = st.column_config.NumberColumn(f"{label} (x)", format="localized")
+        elif fmt == DATE:
+            column_config[col] = st.column_config.DateColumn(label, format="DD/MM/YYYY")
+        elif fmt == DATETIME:
+            column_config[col] = st.column_config.DatetimeColumn(label, format="DD/MM/YYYY HH:mm")
+        else:
+            raise ValueError(f"Formato de exibição desconhecido para '{col}': {fmt}")
+
+    # Colunas sem formato definido recebem apenas o rótulo
+    for col, label in labels.items():
+        if col not in column_config:
+            column_config[col] = st.column_config.Column(label)
+
+    return column_config
+
+
+# Função para preparar os valores numéricos para exibição
+def prepare_display_frame(data, formats):
+    """Ajusta escala e arredondamento por coluna sem converter os valores em texto."""
+    data = data.copy()
+
+    for col, fmt in formats.items():
+        if col not in data.columns:
+            continue
+
+        if fmt == INTEGER:
+            data[col] = data[col].round(0)
+        elif fmt in (DECIMAL, CURRENCY, RATIO):
+            data[col] = data[col].round(2)
+        elif fmt == PERCENT:
+            # O formato "percent" espera frações (0,05 = 5%)
+            data[col] = (data[col] / 100).round(4)
+
+    return data
+
+
+# Função para exibir uma tabela formatada
+def show_table(data, formats, labels=None, **kwargs):
+    """Exibe `data` com formatos brasileiros mantendo os tipos numéricos das colunas."""
+    formats = {col: fmt for col, fmt in formats.items() if col in data.columns}
+    labels = {col: label for col, label in (labels or {}).items() if col in data.columns}
+
+    st.dataframe(
+        prepare_display_frame(data, formats),
+        column_config=build_column_config(formats, labels),
+        **kwargs
+    )
@@ -0,0 +1,219 @@
+import base64
+import hashlib
+import io
+import os
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+
+from PIL import Image
+
+# Diretório e limites do cache local de miniaturas
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "thumbnails")
+MAX_CACHE_BYTES = 50 * 1024 * 1024
+THUMBNAIL_SIZE = (240, 240)
+DOWNLOAD_TIMEOUT = 5
+# Tamanho máximo aceito para a imagem original (evita baixar arquivos enormes)
+MAX_DOWNLOAD_BYTES = 5 * 1024 * 1024
+# Esquemas de URL aceitos (file://, ftp:// etc. nunca são abertos pelo servidor)
+ALLOWED_SCHEMES = ('http', 'https')
+# Downloads simultâneos e tempo total de espera por renderização
+DOWNLOAD_WORKERS = 8
+DOWNLOAD_DEADLINE = 10
+# Tempo, em segundos, em que uma falha de download não é tentada de novo
+FAILURE_TTL = 10 * 60
+
+
+class _SafeRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """Segue redirecionamentos apenas para http/https."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        if urllib.parse.urlsplit(newurl).scheme.lower() not in ALLOWED_SCHEMES:
+            raise urllib.error.HTTPError(newurl, code, "Redirecionamento para esquema não permitido", headers, fp)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+_opener = urllib.request.build_opener(_SafeRedirectHandler)
+
+
+# Função para gerar a imagem exibida quando o download falha
+@lru_cache(maxsize=1)
+def _placeholder_bytes():
+    image = Image.new("RGB", THUMBNAIL_SIZE, color=(224, 224, 224))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+# Função para baixar e redimensionar uma imagem remota
+def _download_thumbnail(url):
+    if urllib.parse.urlsplit(url).scheme.lower() not in ALLOWED_SCHEMES:
+        raise ValueError(f"Esquema de URL não permitido: {url}")
+
+    request = urllib.request.Request(url, headers={"User-Agent": "dashboard-psi"})
+    with _opener.open(request, timeout=DOWNLOAD_TIMEOUT) as response:
+        content = response.read(MAX_DOWNLOAD_BYTES + 1)
+
+    if len(content) > MAX_DOWNLOAD_BYTES:
+        raise ValueError(f"Imagem maior que {MAX_DOWNLOAD_BYTES} bytes: {url}")
+
+    image = Image.open(io.BytesIO(content))
+    image = image.convert("RGB")
+    image.thumbnail(THUMBNAIL_SIZE)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+# Função para remover as miniaturas menos usadas quando o cache passa do limite
+def _evict(cache_dir, max_bytes):
+    entries = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".jpg"):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total_bytes = sum(size for _, size, _ in entries)
+
+    # O horário de modificação é atualizado a cada leitura, então os mais antigos são os menos usados
+    for _, size, path in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total_bytes -= size
+
+
+# Caminhos da miniatura e do marcador de falha de uma URL
+def _cache_paths(url, cache_dir):
+    name = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, name + ".jpg"), os.path.join(cache_dir, name + ".fail")
+
+
+# Função para ler uma miniatura já gravada (None se não existir)
+def _read_cached(path):
+    try:
+        with open(path, "rb") as cached_file:
+            content = cached_file.read()
+        os.utime(path)
+        return content
+    except FileNotFoundError:
+        return None
+
+
+# Função para saber se o download de uma URL falhou há pouco tempo
+def _recent_failure(failure_path):
+    try:
+        return time.time() - os.stat(failure_path).st_mtime < FAILURE_TTL
+    except FileNotFoundError:
+        return False
+
+
+# Função para baixar uma miniatura e gravá-la no cache (None em caso de falha)
+def _fetch_to_cache(url, cache_dir, max_bytes):
+    path, failure_path = _cache_paths(url, cache_dir)
+
+    try:
+        content = _download_thumbnail(url)
+    except Exception:
+        # Marcador de falha: a URL só é tentada de novo depois de FAILURE_TTL
+        with open(failure_path, "wb"):
+            pass
+        os.utime(failure_path)
+        return None
+
+    # Gravação atômica para não expor arquivos incompletos a outras sessões
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    with os.fdopen(fd, "wb") as tmp_file:
+        tmp_file.write(content)
+    os.replace(tmp_path, path)
+
+    try:
+        os.remove(failure_path)
+    except FileNotFoundError:
+        pass
+
+    _evict(cache_dir, max_bytes)
+    return content
+
+
+# Função para obter a miniatura de uma imagem remota a partir do cache em disco
+def get_thumbnail(url, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    """Retorna os bytes JPEG da miniatura de `url`, baixando-a só na primeira vez.
+
+    Em caso de falha no download ou na leitura da imagem é retornada uma
+    imagem neutra no lugar, e a URL não é tentada de novo por FAILURE_TTL.
+    """
+    return get_thumbnails([url], cache_dir, max_bytes)[url]
+
+
+# Função para obter várias miniaturas, baixando as que faltam em paralelo
+def get_thumbnails(urls, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, deadline=DOWNLOAD_DEADLINE):
+    """Retorna {url: bytes JPEG} para `urls`.
+
+    As miniaturas ausentes do cache são baixadas por até DOWNLOAD_WORKERS
+    threads. As que não terminam em `deadline` segundos recebem a imagem neutra
+    nesta renderização; o download continua em segundo plano e a miniatura
+    aparece na próxima.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    thumbnails = {}
+    misses = []
+
+    for url in dict.fromkeys(urls):
+        path, failure_path = _cache_paths(url, cache_dir)
+        content = _read_cached(path)
+
+        if content is not None:
+            thumbnails[url] = content
+        elif _recent_failure(failure_path):
+            thumbnails[url] = _placeholder_bytes()
+        else:
+            misses.append(url)
+
+    if misses:
+        executor = ThreadPoolExecutor(max_workers=min(DOWNLOAD_WORKERS, len(misses)))
+        futures = {executor.submit(_fetch_to_cache, url, cache_dir, max_bytes): url for url in misses}
+        done, _ = wait(futures, timeout=deadline)
+        # Não bloquear a página: downloads em andamento terminam sozinhos
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        for future, url in futures.items():
+            content = future.result() if future in done and future.exception() is None else None
+            thumbnails[url] = content if content is not None else _placeholder_bytes()
+
+    return thumbnails
+
+
+# Função para converter os bytes de uma miniatura em data URI
+def _data_uri(content):
+    return "data:image/jpeg;base64," + base64.b64encode(content).decode("ascii")
+
+
+# Função para obter a miniatura como data URI para uso direto em HTML
+def thumbnail_data_uri(url):
+    """Retorna a miniatura local de `url` embutida em um data URI."""
+    return _data_uri(get_thumbnail(url))
+
+
+# Função para trocar uma coluna de URLs pelas miniaturas locais
+def local_thumbnails(urls):
+    """Substitui cada URL preenchida da Series pelo data URI da sua miniatura."""
+    urls = urls.fillna("").astype(str).str.strip()
+    has_url = urls != ""
+
+    thumbnails = get_thumbnails(urls[has_url].tolist())
+    uris = {url: _data_uri(content) for url, content in thumbnails.items()}
+    return urls.where(~has_url, urls[has_url].map(uris))
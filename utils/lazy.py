@@ -0,0 +1,19 @@
+import streamlit as st
+
+
+# Função para renderizar abas sob demanda
+def render_lazy_tabs(sections, key):
+    """Substitui st.tabs executando apenas a seção aberta pelo usuário.
+
+    `sections` mapeia o rótulo de cada aba para uma função sem argumentos que
+    desenha o seu conteúdo. Enquanto nenhuma aba é aberta nada é calculado.
+    """
+    selected_section = st.segmented_control(
+        "Visualização",
+        options=list(sections.keys()),
+        key=key,
+        label_visibility="collapsed"
+    )
+    
+    if selected_section is not None:
+        sections[selected_section]()
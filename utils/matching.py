@@ -0,0 +1,237 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import streamlit as st
+
+from utils.schemas import IDENTITY_COLUMNS
+
+# Ordem de confiança das chaves usadas para ligar uma venda ao lead
+MATCH_KEYS = ['email', 'telefone', 'nome']
+
+# Linhas conferidas a cada atualização para detectar edições no histórico da aba
+SENTINEL_ROWS = 64
+
+
+# Função para encontrar a coluna de um tipo de identificação
+def find_identity_column(data, kind):
+    """Retorna a primeira coluna de `data` aceita para `kind` (ver IDENTITY_COLUMNS), ou None."""
+    for column in IDENTITY_COLUMNS[kind]:
+        if column in data.columns:
+            return column
+    return None
+
+
+# Função para aplicar uma normalização apenas aos valores distintos
+def _normalize_unique(values, function):
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+    uniques = pa.array(pd.Series(uniques, dtype=object).astype(str), type=pa.string())
+    normalized = function(uniques).to_numpy(zero_copy_only=False)
+    result = np.where(codes >= 0, normalized.take(codes) if len(normalized) else None, None)
+    return pd.Series(result, index=values.index, dtype=object)
+
+
+# Funções de normalização das chaves (valores sem chave válida viram nulos).
+# Usam pyarrow.compute (instalado com o Streamlit), que roda vetorizado em C.
+def _emails(values):
+    emails = pc.utf8_lower(pc.utf8_trim_whitespace(values))
+    return pc.if_else(pc.match_substring(emails, '@'), emails, None)
+
+
+def _phones(values):
+    digits = pc.utf8_ltrim(pc.replace_substring_regex(values, r'\D', ''), characters='0')
+    # Remover o código do país e manter DDD + 8 últimos dígitos (o nono dígito varia entre cadastros)
+    has_country = pc.and_(pc.greater_equal(pc.utf8_length(digits), 12), pc.starts_with(digits, '55'))
+    digits = pc.if_else(has_country, pc.utf8_slice_codeunits(digits, 2), digits)
+    valid = pc.is_in(pc.utf8_length(digits), pa.array([10, 11], type=pa.int32()))
+    key = pc.binary_join_element_wise(pc.utf8_slice_codeunits(digits, 0, 2), pc.utf8_slice_codeunits(digits, -8), '')
+    return pc.if_else(valid, key, None)
+
+
+def _names(values):
+    names = pc.replace_substring_regex(pc.utf8_normalize(values, 'NFKD'), r'\p{Mn}', '')
+    names = pc.utf8_trim_whitespace(pc.replace_substring_regex(pc.utf8_lower(names), r'\s+', ' '))
+    # Só nomes com sobrenome: um primeiro nome sozinho gera vínculos demais
+    return pc.if_else(pc.match_substring(names, ' '), names, None)
+
+
+NORMALIZERS = {'email': _emails, 'telefone': _phones, 'nome': _names}
+
+
+# Função para transformar uma coluna de identificação em chaves de hash
+def identity_keys(values, kind):
+    """Normaliza `values` conforme `kind` e retorna hashes uint64 (0 = sem chave)."""
+    normalized = _normalize_unique(values, NORMALIZERS[kind])
+    missing = normalized.isna().to_numpy()
+    keys = pd.util.hash_array(normalized.fillna('').to_numpy(dtype=object))
+    keys[missing] = 0
+    return keys
+
+
+class LeadIndex:
+    """Índice de hash das chaves de identidade dos leads.
+
+    A aba de leads só recebe linhas novas no final; a cada atualização apenas
+    essas linhas são normalizadas e incorporadas. Se as linhas de controle do
+    trecho já indexado mudarem (edição ou exclusão na planilha), o índice é
+    reconstruído.
+    """
+
+    def __init__(self, date_column='Submitted At'):
+        self.date_column = date_column
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.rows = 0
+        self._sentinels = pd.Series(dtype='uint64')
+        self._keys = {
+            kind: pd.DataFrame({
+                'chave': pd.Series(dtype='uint64'),
+                'momento_lead': pd.Series(dtype='datetime64[ns]'),
+                'lead': pd.Series(dtype='int64'),
+            })
+            for kind in MATCH_KEYS
+        }
+
+    # Colunas usadas na impressão digital das linhas de controle
+    def _fingerprint_columns(self, leads):
+        columns = [find_identity_column(leads, kind) for kind in MATCH_KEYS] + [self.date_column]
+        return [column for column in columns if column is not None and column in leads.columns]
+
+    def _sentinel_hashes(self, leads, rows):
+        positions = np.unique(np.linspace(0, rows - 1, min(rows, SENTINEL_ROWS)).astype(int))
+        sample = leads.iloc[positions][self._fingerprint_columns(leads)]
+        return pd.Series(pd.util.hash_pandas_object(sample, index=False).to_numpy(), index=positions)
+
+    # Incorporar os leads novos ao índice
+    def update(self, leads):
+        """Sincroniza o índice com `leads` e retorna True se algo mudou."""
+        with self._lock:
+            if self.rows and (len(leads) < self.rows or not self._sentinels.equals(self._sentinel_hashes(leads, self.rows))):
+                self._reset()
+
+            if len(leads) == self.rows:
+                return False
+
+            new_leads = leads.iloc[self.rows:]
+            positions = np.arange(self.rows, len(leads))
+            submitted = new_leads[self.date_column].to_numpy(dtype='datetime64[ns]')
+
+            for kind in MATCH_KEYS:
+                column = find_identity_column(leads, kind)
+                if column is None:
+                    continue
+
+                new_keys = pd.DataFrame({
+                    'chave': identity_keys(new_leads[column], kind),
+                    'momento_lead': submitted,
+                    'lead': positions,
+                })
+                new_keys = new_keys[(new_keys['chave'] != 0) & new_keys['momento_lead'].notna()]
+
+                keys = self._keys[kind]
+                needs_sort = not keys.empty and not new_keys.empty and new_keys['momento_lead'].min() < keys['momento_lead'].max()
+                keys = pd.concat([keys, new_keys], ignore_index=True)
+
+                # merge_asof exige as chaves ordenadas pelo horário do lead
+                if needs_sort or not keys['momento_lead'].is_monotonic_increasing:
+                    keys = keys.sort_values('momento_lead', kind='stable', ignore_index=True)
+
+                self._keys[kind] = keys
+
+            self.rows = len(leads)
+            self._sentinels = self._sentinel_hashes(leads, self.rows)
+            return True
+
+    # Ligar cada venda ao lead que a originou
+    def match(self, sales, date_column='Data'):
+        """Retorna, para as vendas com lead, a posição do lead, a chave usada e o horário do lead.
+
+        Cada venda é ligada ao lead mais recente com a mesma chave enviado até
+        o fim do dia da venda, tentando e-mail, depois telefone e por fim nome.
+        """
+        # A data da venda não tem horário: vale qualquer lead enviado até o fim do dia
+        sale_time = sales[date_column].dt.normalize() + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns')
+        pending = pd.Series(sale_time.notna().to_numpy(), index=sales.index)
+        matches = []
+
+        with self._lock:
+            for kind in MATCH_KEYS:
+                column = find_identity_column(sales, kind)
+                if column is None or self._keys[kind].empty or not pending.any():
+                    continue
+
+                left = pd.DataFrame({
+                    'chave': identity_keys(sales.loc[pending, column], kind),
+                    'momento_venda': sale_time[pending].to_numpy(),
+                    'venda': sales.index[pending.to_numpy()],
+                })
+                left = left[left['chave'] != 0].sort_values('momento_venda', kind='stable')
+
+                merged = pd.merge_asof(
+                    left,
+                    self._keys[kind],
+                    left_on='momento_venda',
+                    right_on='momento_lead',
+                    by='chave',
+                    direction='backward'
+                ).dropna(subset=['lead'])
+
+                merged['chave'] = kind
+                matches.append(merged[['venda', 'lead', 'chave', 'momento_lead']])
+                pending.loc[merged['venda'].to_numpy()] = False
+
+        if not matches:
+            return pd.DataFrame(
+                {'lead': pd.Series(dtype='int64'), 'chave': pd.Series(dtype=object),
+                 'momento_lead': pd.Series(dtype='datetime64[ns]')},
+                index=sales.index[:0]
+            )
+
+        result = pd.concat(matches).set_index('venda')
+        result.index.name = None
+        result['lead'] = result['lead'].astype('int64')
+        return result.reindex(sales.index.intersection(result.index))
+
+
+# Lock da criação dos índices (sessões simultâneas pedem a mesma aba de leads)
+_store_lock = threading.Lock()
+
+
+# Função para manter os índices entre execuções e sessões
+@st.cache_resource(show_spinner=False)
+def _index_store():
+    return {}
+
+
+# Função para obter o índice persistente de uma aba de leads
+def get_lead_index(name):
+    store = _index_store()
+
+    with _store_lock:
+        if name not in store:
+            store[name] = LeadIndex()
+
+        return store[name]
+
+
+# Função para ligar as vendas pagas aos leads
+def match_sales_to_leads(data_leads, data_vendas, index_name='central_leads'):
+    """Atualiza o índice de leads e retorna as vendas ligadas a um lead.
+
+    O resultado tem o índice de `data_vendas` e as colunas `lead` (rótulo da
+    linha em `data_leads`), `chave`, `momento_lead` e `dias_para_converter`.
+    """
+    index = get_lead_index(index_name)
+    index.update(data_leads)
+
+    matches = index.match(data_vendas)
+    matches['lead'] = data_leads.index[matches['lead'].to_numpy()]
+    matches['dias_para_converter'] = (
+        data_vendas.loc[matches.index, 'Data'].dt.normalize() - matches['momento_lead'].dt.normalize()
+    ).dt.days
+
+    return matches
@@ -0,0 +1,42 @@
+import math
+
+import streamlit as st
+
+
+# Função para paginar um DataFrame
+def paginate(data, page_size, key, label="itens"):
+    """Exibe o seletor de página e retorna apenas as linhas da página atual.
+
+    Só a fatia retornada é desenhada pela página, então a quantidade de
+    elementos enviados ao navegador não cresce com o tamanho de `data`.
+    """
+    total_items = len(data)
+    total_pages = max(1, math.ceil(total_items / page_size))
+
+    if total_pages == 1:
+        return data
+
+    # A página fica só no session_state (o widget não recebe `value`) e é
+    # mantida dentro do intervalo quando os filtros mudam
+    st.session_state.setdefault(key, 1)
+    if st.session_state[key] > total_pages:
+        st.session_state[key] = total_pages
+
+    col1, col2 = st.columns([1, 3])
+
+    with col1:
+        page = st.number_input(
+            "Página",
+            min_value=1,
+            max_value=total_pages,
+            step=1,
+            key=key
+        )
+
+    start = (page - 1) * page_size
+    end = min(start + page_size, total_items)
+
+    with col2:
+        st.caption(f"Exibindo {start + 1}–{end} de {total_items} {label} (página {page} de {total_pages})")
+
+    return data.iloc[start:end]
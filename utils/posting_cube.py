@@ -0,0 +1,215 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from utils.formatting import show_table, INTEGER, DECIMAL
+
+WEEKDAY_LABELS = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado', 'Domingo']
+STATISTICS = {'Média': 'media', 'Mediana': 'mediana'}
+
+# Quantidade mínima de publicações para um horário entrar no ranking
+MIN_SLOT_POSTS = 2
+
+
+class PostingTimeCube:
+    """Cubo 7×24 (dia da semana × hora) com média, mediana e contagem por métrica.
+
+    As publicações já incorporadas são identificadas por uma impressão digital
+    da linha; a cada atualização apenas as publicações novas, alteradas ou
+    removidas são processadas e só os horários afetados são recalculados.
+
+    Uma versão barata da aba (quantidade de linhas, última publicação, último
+    id e soma das métricas) evita calcular as impressões digitais quando nada
+    mudou desde a última renderização.
+
+    `update` monta um novo cubo e o troca em uma única atribuição; as leituras
+    (`heatmap`, `top_slots`) usam sempre um cubo completo, sem precisar do lock.
+    """
+
+    def __init__(self, metrics):
+        self.metrics = list(metrics)
+        self._lock = threading.Lock()
+        self._version = None
+        self._samples = pd.DataFrame(
+            {'dia_semana': pd.Series(dtype='int8'), 'hora': pd.Series(dtype='int8'),
+             **{metric: pd.Series(dtype='float64') for metric in self.metrics}},
+            index=pd.Index([], dtype='uint64')
+        )
+
+        slots = pd.MultiIndex.from_product([range(7), range(24)], names=['dia_semana', 'hora'])
+        self.cube = pd.DataFrame({'posts': 0}, index=slots)
+        for metric in self.metrics:
+            self.cube[f'{metric}_media'] = np.nan
+            self.cube[f'{metric}_mediana'] = np.nan
+
+    # Versão barata da aba de publicações (sem impressão digital das linhas)
+    @staticmethod
+    def _posts_version(posts, id_column, metrics):
+        return (
+            len(posts),
+            posts['data_publicacao'].max(),
+            posts[id_column].iloc[-1] if id_column in posts.columns and len(posts) else None,
+            tuple(float(pd.to_numeric(posts[metric], errors='coerce').sum()) for metric in metrics),
+        )
+
+    # Incorporar as publicações ao cubo
+    def update(self, posts, id_column=None):
+        """Sincroniza o cubo com `posts` e retorna True se algum horário mudou."""
+        metrics = [metric for metric in self.metrics if metric in posts.columns]
+
+        # Mesma versão da última sincronização: nada a recalcular
+        version = self._posts_version(posts, id_column, metrics)
+        if version == self._version:
+            return False
+
+        posts = posts[posts['data_publicacao'].notna()]
+
+        key_columns = ([id_column] if id_column in posts.columns else []) + ['data_publicacao'] + metrics
+        fingerprints = pd.util.hash_pandas_object(posts[key_columns], index=False)
+
+        with self._lock:
+            is_new = ~fingerprints.isin(self._samples.index)
+            removed = self._samples.index.difference(fingerprints)
+
+            if not is_new.any() and removed.empty:
+                self._version = version
+                return False
+
+            new_posts = posts[is_new.to_numpy()]
+            new_samples = pd.DataFrame(
+                {'dia_semana': new_posts['data_publicacao'].dt.dayofweek.astype('int8'),
+                 'hora': new_posts['data_publicacao'].dt.hour.astype('int8'),
+                 **{metric: pd.to_numeric(new_posts[metric], errors='coerce') for metric in metrics}}
+            )
+            new_samples.index = pd.Index(fingerprints[is_new].to_numpy(), dtype='uint64')
+            new_samples = new_samples[~new_samples.index.duplicated()]
+
+            # Horários afetados pelas publicações adicionadas ou removidas
+            touched = pd.MultiIndex.from_frame(
+                pd.concat([self._samples.loc[removed, ['dia_semana', 'hora']], new_samples[['dia_semana', 'hora']]])
+                .astype('int64')
+                .drop_duplicates()
+            )
+
+            samples = pd.concat([self._samples.drop(index=removed), new_samples])
+            self._samples = samples
+
+            slot_index = pd.MultiIndex.from_frame(samples[['dia_semana', 'hora']].astype('int64'))
+            affected = samples[slot_index.isin(touched)]
+            grouped = affected.groupby(['dia_semana', 'hora'])
+
+            cube = self.cube.copy()
+            cube.loc[touched, 'posts'] = grouped.size().reindex(touched, fill_value=0).to_numpy()
+            for metric in metrics:
+                stats = grouped[metric].agg(['mean', 'median']).reindex(touched)
+                cube.loc[touched, f'{metric}_media'] = stats['mean'].to_numpy()
+                cube.loc[touched, f'{metric}_mediana'] = stats['median'].to_numpy()
+
+            self.cube = cube
+            self._version = version
+            return True
+
+    # Matriz 7×24 de uma métrica para o mapa de calor
+    def heatmap(self, metric, statistic='media'):
+        matrix = self.cube[f'{metric}_{statistic}'].unstack('hora')
+        matrix.index = WEEKDAY_LABELS
+        return matrix
+
+    # Horários com os maiores valores de uma métrica
+    def top_slots(self, metric, statistic='media', n=5):
+        column = f'{metric}_{statistic}'
+        cube = self.cube
+        slots = cube[cube['posts'] > 0]
+
+        if (slots['posts'] >= MIN_SLOT_POSTS).any():
+            slots = slots[slots['posts'] >= MIN_SLOT_POSTS]
+
+        slots = slots.dropna(subset=[column]).nlargest(n, column).reset_index()
+        slots['dia'] = np.array(WEEKDAY_LABELS)[slots['dia_semana']]
+        slots['horario'] = slots['hora'].astype(str).str.zfill(2) + 'h'
+
+        return slots[['dia', 'horario', column, 'posts']].rename(columns={column: metric})
+
+
+# Lock da criação dos cubos (sessões simultâneas pedem a mesma conta)
+_store_lock = threading.Lock()
+
+
+# Função para manter os cubos entre execuções e sessões
+@st.cache_resource(show_spinner=False)
+def _cube_store():
+    return {}
+
+
+# Função para obter o cubo de horários de uma conta
+def get_posting_cube(source, account_id, metrics):
+    """Retorna o cubo persistente de `source` (ex.: 'instagram') para a conta."""
+    store = _cube_store()
+    key = (source, account_id, tuple(metrics))
+
+    with _store_lock:
+        if key not in store:
+            store[key] = PostingTimeCube(metrics)
+
+        return store[key]
+
+
+# Fragmento do mapa de calor de horários: trocar a métrica redesenha apenas esta seção
+@st.fragment
+def render_posting_times(cube, metric_labels, key, color_scale):
+    col1, col2 = st.columns(2)
+
+    with col1:
+        metric_label = st.selectbox(
+            "Selecione a métrica",
+            options=list(metric_labels.keys()),
+            key=f"posting_metric_{key}"
+        )
+
+    with col2:
+        statistic_label = st.selectbox(
+            "Estatística",
+            options=list(STATISTICS.keys()),
+            key=f"posting_statistic_{key}"
+        )
+
+    metric = metric_labels[metric_label]
+    statistic = STATISTICS[statistic_label]
+
+    # Criar mapa de calor
+    fig = px.imshow(
+        cube.heatmap(metric, statistic),
+        labels=dict(x="Hora do Dia", y="Dia da Semana", color=metric_label),
+        x=list(range(24)),
+        color_continuous_scale=color_scale,
+        aspect="auto",
+        title=f"{metric_label} ({statistic_label.lower()}) por Dia da Semana e Hora"
+    )
+
+    # Ajustar layout
+    fig.update_layout(
+        template="plotly_white",
+        height=400,
+        xaxis=dict(
+            tickmode='linear',
+            tick0=0,
+            dtick=1
+        )
+    )
+
+    st.plotly_chart(fig, use_container_width=True, key=f"posting_heatmap_{key}")
+
+    # Ranking dos melhores horários
+    st.markdown("**Melhores horários**")
+
+    show_table(
+        cube.top_slots(metric, statistic),
+        formats={metric: DECIMAL, 'posts': INTEGER},
+        labels={'dia': 'Dia', 'horario': 'Horário', metric: metric_label, 'posts': 'Publicações'},
+        hide_index=True,
+        use_container_width=True,
+        key=f"posting_top_slots_{key}"
+    )
@@ -0,0 +1,248 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.attribution import campaign_keys, campaign_lookup
+from utils.backend import AD_BASE_METRICS, aggregate_ad_metrics
+from utils.schemas import BLANK_CATEGORY
+
+# Métricas das abas 'metricas' somadas por campanha e dia
+ROLLUP_METRICS = AD_BASE_METRICS
+
+# Chave das linhas do rollup diário
+ROLLUP_KEYS = ['plataforma', 'id_campanha', 'data']
+
+
+class DailyRollup:
+    """Totais diários das métricas de anúncios por plataforma e campanha.
+
+    Cada dia das abas de métricas tem uma impressão digital (soma dos hashes
+    das suas linhas). A cada atualização só os dias novos ou com impressão
+    digital diferente (ex.: o dia corrente, que a integração reescreve) são
+    reagregados; dias que sumiram da aba são removidos.
+    """
+
+    def __init__(self, metrics=ROLLUP_METRICS):
+        self.metrics = list(metrics)
+        self._lock = threading.Lock()
+        self._fingerprints = {}
+        self.daily = pd.DataFrame(
+            {column: pd.Series(dtype=dtype) for column, dtype in
+             [('plataforma', object), ('id_campanha', object), ('data', 'datetime64[ns]')]
+             + [(metric, 'float64') for metric in self.metrics]}
+        ).set_index(ROLLUP_KEYS)
+
+    # Impressão digital de cada dia de uma aba de métricas
+    def _day_fingerprints(self, data, days):
+        columns = ['id_campanha', 'data'] + [metric for metric in self.metrics if metric in data.columns]
+        hashes = pd.util.hash_pandas_object(data[columns], index=False)
+        return hashes.groupby(days.to_numpy()).sum()
+
+    # Incorporar os dias novos ou alterados de uma plataforma
+    def update(self, platform, data):
+        """Sincroniza o rollup com a aba 'metricas' de `platform`; retorna os dias reagregados."""
+        with self._lock:
+            days = data['data'].dt.normalize()
+            valid = days.notna()
+            data, days = data[valid], days[valid]
+
+            fingerprints = self._day_fingerprints(data, days)
+            previous = self._fingerprints.get(platform, pd.Series(dtype='uint64'))
+
+            both = fingerprints.index.union(previous.index)
+            changed = both[(fingerprints.reindex(both, fill_value=0) != previous.reindex(both, fill_value=0)).to_numpy()]
+
+            if changed.empty:
+                return changed
+
+            # Descartar os dias alterados e reagregar apenas eles
+            current = self.daily.index
+            stale = (current.get_level_values('plataforma') == platform) & current.get_level_values('data').isin(changed)
+            in_changed = days.isin(changed).to_numpy()
+
+            subset = data[in_changed]
+            fresh = pd.DataFrame({
+                'plataforma': platform,
+                'id_campanha': subset['id_campanha'].astype(str).to_numpy(),
+                'data': days[in_changed].to_numpy(),
+                **{metric: (subset[metric].fillna(0).to_numpy() if metric in subset.columns else 0.0)
+                   for metric in self.metrics},
+            }).groupby(ROLLUP_KEYS)[self.metrics].sum()
+
+            self.daily = pd.concat([self.daily[~stale], fresh]).sort_index()
+            self._fingerprints[platform] = fingerprints
+            return changed
+
+    # Totais de cada campanha entre duas datas
+    def totals(self, campaigns):
+        """Soma as métricas de cada linha de `campaigns` no seu período.
+
+        `campaigns` tem `plataforma_ads`, `id_campanha_ads`, `data_inicio` e
+        `data_fim` (datas vazias não limitam o período). Retorna um DataFrame
+        com o índice de `campaigns` e uma coluna por métrica; campanhas sem
+        correspondência nas abas de métricas ficam com NaN.
+        """
+        daily = self.daily.reset_index()
+        mapped = campaigns.dropna(subset=['id_campanha_ads'])
+
+        merged = mapped.reset_index(names='linha').merge(
+            daily,
+            left_on=['plataforma_ads', 'id_campanha_ads'],
+            right_on=['plataforma', 'id_campanha'],
+            how='left'
+        )
+
+        in_period = (
+            merged['data'].notna() &
+            (merged['data_inicio'].isna() | (merged['data'] >= merged['data_inicio'].dt.normalize())) &
+            (merged['data_fim'].isna() | (merged['data'] <= merged['data_fim'].dt.normalize()))
+        )
+
+        totals = merged[in_period].groupby('linha')[self.metrics].sum()
+        totals = totals.reindex(mapped.index, fill_value=0)
+        return totals.reindex(campaigns.index)
+
+
+# Lock da criação dos rollups (sessões simultâneas pedem o mesmo rollup)
+_store_lock = threading.Lock()
+
+
+# Função para manter os rollups entre execuções e sessões
+@st.cache_resource(show_spinner=False)
+def _rollup_store():
+    return {}
+
+
+# Função para obter o rollup persistente das abas de métricas de anúncios
+def get_daily_rollup(name='anuncios'):
+    store = _rollup_store()
+
+    with _store_lock:
+        if name not in store:
+            store[name] = DailyRollup()
+
+        return store[name]
+
+
+# Função para ligar as campanhas de objetivo às campanhas das plataformas
+def map_objective_campaigns(objectives, campaigns):
+    """Retorna `plataforma_ads` e `id_campanha_ads` para cada campanha de objetivo.
+
+    A campanha é procurada pelo `id_campanha` e, sem resultado, pelo
+    `nome_campanha` (ambos normalizados, ver `campaign_keys`). Uma chave
+    encontrada em mais de uma plataforma só vale se uma delas for a
+    `plataforma` declarada no objetivo.
+    """
+    lookup = campaign_lookup(campaigns)
+    result = pd.DataFrame({'plataforma_ads': None, 'id_campanha_ads': None}, index=objectives.index, dtype=object)
+    declared = objectives['plataforma'] if 'plataforma' in objectives.columns else pd.Series(None, index=objectives.index)
+
+    for column in ['id_campanha', 'nome_campanha']:
+        pending = result['id_campanha_ads'].isna()
+        if column not in objectives.columns or not pending.any():
+            continue
+
+        keys = pd.DataFrame({
+            'linha': objectives.index[pending.to_numpy()],
+            'chave': campaign_keys(objectives.loc[pending, column]).to_numpy(),
+            'declarada': declared[pending].to_numpy(),
+        }).dropna(subset=['chave'])
+
+        candidates = keys.merge(lookup, on='chave', how='inner').drop_duplicates(['linha', 'plataforma', 'id_campanha'])
+        count = candidates.groupby('linha')['id_campanha'].transform('size')
+        candidates = candidates[(count == 1) | (candidates['plataforma'] == candidates['declarada'])]
+        candidates = candidates[candidates.groupby('linha')['id_campanha'].transform('size') == 1].set_index('linha')
+
+        result.loc[candidates.index, 'plataforma_ads'] = candidates['plataforma']
+        result.loc[candidates.index, 'id_campanha_ads'] = candidates['id_campanha']
+
+    return result
+
+
+# Função para substituir o gasto e as conversões manuais pelos valores das plataformas
+def apply_spend_rollup(objectives, campaigns, metrics, rollup=None):
+    """Atualiza o rollup diário e preenche `gasto_atual` e `conversoes_atual`.
+
+    `campaigns` e `metrics` são dicionários {plataforma: aba}. Campanhas sem
+    correspondência nas plataformas mantêm os valores digitados na planilha;
+    a coluna `fonte_gasto` indica de onde veio cada valor.
+    """
+    rollup = rollup or get_daily_rollup()
+
+    for platform, data in metrics.items():
+        if data is not None and not data.empty:
+            rollup.update(platform, data)
+
+    objectives = objectives.copy()
+    mapped = map_objective_campaigns(objectives, campaigns)
+    # Sem datas de início/fim na planilha, o período da campanha não é limitado
+    period = objectives.reindex(columns=['data_inicio', 'data_fim']).apply(pd.to_datetime)
+    totals = rollup.totals(pd.concat([period, mapped], axis=1))
+
+    automatic = mapped['id_campanha_ads'].notna()
+    objectives['gasto_atual'] = totals['custo'].where(automatic, objectives.get('gasto_atual'))
+    objectives['conversoes_atual'] = totals['conversoes'].where(automatic, objectives.get('conversoes_atual'))
+    objectives['fonte_gasto'] = np.where(automatic, 'Plataforma', 'Planilha')
+
+    return objectives
+
+
+# Linhas de negócio das campanhas (mesmas cores da página de Objetivos)
+CATEGORY_COLORS = {
+    'PAX': '#E91E63',
+    'FRANQUIAS': '#9C27B0',
+    'HUB': '#FF9800',
+    'PNP': '#00BCD4',
+    '+PÚBLICO': '#8BC34A'
+}
+
+# Categoria das campanhas sem 'categoria' preenchida
+UNCATEGORIZED = 'Sem categoria'
+
+
+# Função para listar a categoria de cada campanha das plataformas
+def campaign_categories(campaigns):
+    """Recebe {plataforma: aba 'campanhas'} e retorna plataforma, id_campanha e categoria."""
+    frames = [
+        pd.DataFrame({
+            'plataforma': platform,
+            'id_campanha': data['id_campanha'].astype(str).to_numpy(),
+            'categoria': (data['categoria'].astype(object).replace(BLANK_CATEGORY, '').fillna('')
+                          .astype(str).str.strip().str.upper().to_numpy()
+                          if 'categoria' in data.columns else ''),
+        })
+        for platform, data in campaigns.items() if data is not None and not data.empty
+    ]
+
+    if not frames:
+        return pd.DataFrame(columns=['plataforma', 'id_campanha', 'categoria'])
+
+    categories = pd.concat(frames, ignore_index=True).drop_duplicates(['plataforma', 'id_campanha'])
+    categories['categoria'] = categories['categoria'].replace('', UNCATEGORIZED)
+    return categories
+
+
+# Função para consolidar o rollup diário por categoria
+@st.cache_data(show_spinner=False, max_entries=1)
+def build_category_daily(daily, categories):
+    """Soma o rollup diário (ver DailyRollup) por data, plataforma e categoria.
+
+    Campanhas que não estão na aba 'campanhas' entram em UNCATEGORIZED.
+    """
+    daily = daily.reset_index().merge(categories, on=['plataforma', 'id_campanha'], how='left')
+    daily['categoria'] = daily['categoria'].fillna(UNCATEGORIZED)
+
+    return daily.groupby(['data', 'plataforma', 'categoria'], as_index=False)[ROLLUP_METRICS].sum()
+
+
+# Função para calcular os totais de um período por categoria
+@st.cache_data(show_spinner=False, max_entries=20)
+def category_period_totals(category_daily, start, end, group_columns=('categoria',)):
+    """Totais e indicadores (CTR, CPC, CPA, ROAS) de `start` a `end`, inclusive."""
+    period = category_daily[
+        (category_daily['data'] >= pd.Timestamp(start)) &
+        (category_daily['data'] <= pd.Timestamp(end))
+    ]
+    return aggregate_ad_metrics(period, list(group_columns))
@@ -0,0 +1,232 @@
+# Registro de esquemas das abas do Google Sheets.
+#
+# Cada aba mapeia o nome da coluna para o tipo esperado:
+#   'text'     - texto (células vazias ficam como "")
+#   'int'      - número inteiro (células vazias viram NaN)
+#   'float'    - número decimal (células vazias viram NaN)
+#   'date'     - data/hora; aceita um dicionário {'type': 'date', 'format': ..., 'dayfirst': ...}.
+#                Sem 'format', aceita ISO 8601 (com 'T', frações e fuso, convertido para UTC
+#                sem fuso) e dd/mm ou mm/dd conforme 'dayfirst', com ou sem hora (ver utils/dates.py)
+#   'category' - texto com poucos valores distintos, armazenado como pd.Categorical;
+#                células vazias viram a categoria BLANK_CATEGORY ("Não informado"),
+#                que continua sendo contada nas tabelas como o "" era antes
+# Colunas não declaradas são lidas como numéricas quando todas as células
+# preenchidas são números, e como texto caso contrário (como no get_all_records).
+
+CENTRAL_DADOS = "[PAX] CENTRAL DADOS"
+META_ADS = "[PAX] META ADS"
+GOOGLE_ADS = "[PAX] GOOGLE ADS"
+INSTAGRAM_INSIGHTS = "[PAX] INSTAGRAM INSIGHTS"
+YOUTUBE_INSIGHTS = "[PAX] YOUTUBE INSIGHTS"
+OBJETIVOS_CAMPANHA = "[PAX] OBJETIVOS CAMPANHA"
+
+# Categoria das células vazias nas colunas 'category'
+BLANK_CATEGORY = "Não informado"
+
+# Campos equivalentes entre leads e vendas (perguntas do formulário e UTMs)
+LEAD_SALE_FIELDS = {
+    'Idade': {
+        'leads': 'Qual a sua idade?',
+        'vendas': 'Qual a sua idade?'
+    },
+    'Estado Civil': {
+        'leads': 'Qual é o seu estado civil?',
+        'vendas': 'Qual é o seu estado civil?'
+    },
+    'Escolaridade': {
+        'leads': 'Qual é o seu nível de escolaridade?',
+        'vendas': 'Qual é o seu nível de escolaridade?'
+    },
+    'Experiência com TCC': {
+        'leads': 'Já fez terapia com uma psicóloga da abordagem da TCC (Terapia Cognitivo Comportamental) antes?',
+        'vendas': 'Já fez terapia com uma psicóloga da abordagem da TCC Terapia Cognitivo Comportamental antes?'
+    },
+    'Motivo Terapia': {
+        'leads': 'Qual seria o principal motivo para buscar terapia?',
+        'vendas': 'Qual seria o principal motivo para buscar terapia?'
+    },
+    'Renda': {
+        'leads': 'Selecione a sua média de renda familiar.',
+        'vendas': 'Selecione a sua média de renda familiar.'
+    },
+    'Estado Emocional': {
+        'leads': 'Como você se sente hoje com relação a suas emoções e relacionamentos?',
+        'vendas': 'Como você se sente hoje com relação a suas emoções e relacionamentos?'
+    },
+    'Maior Desafio': {
+        'leads': 'Com base na sua resposta anterior, qual está sendo o seu maior desafio?',
+        'vendas': 'Com base na sua resposta anterior, qual está sendo o seu maior desafio?'
+    },
+    'Capacidade de Lidar': {
+        'leads': 'Você se sente capaz de lidar com as demandas diárias ou está se sentindo sobrecarregado(a)?',
+        'vendas': 'Você se sente capaz de lidar com as demandas diárias ou está se sentindo sobrecarregado(a)?'
+    },
+    'Necessidade de Ajuda': {
+        'leads': 'Você sente que precisa de ajuda para lidar com essas dificuldades?',
+        'vendas': 'Você sente que precisa de ajuda para lidar com essas dificuldades?'
+    },
+    'Investimento': {
+        'leads': 'Escolha o investimento ideal para você:',
+        'vendas': 'Escolha o investimento ideal para você:'
+    },
+    'Origem': {
+        'leads': 'utm_source',
+        'vendas': 'Source'
+    },
+    'Meio': {
+        'leads': 'utm_medium',
+        'vendas': 'Medium'
+    },
+    'Campanha': {
+        'leads': 'utm_campaign',
+        'vendas': 'Campaign'
+    }
+}
+
+# Nomes aceitos para as colunas de identificação do lead/comprador
+IDENTITY_COLUMNS = {
+    'email': ['Email', 'E-mail', 'email', 'e-mail'],
+    'telefone': ['Telefone', 'Celular', 'WhatsApp', 'Phone', 'telefone'],
+    'nome': ['Nome', 'Nome completo', 'Name', 'nome'],
+}
+
+# Identificação sempre como texto (telefones não devem virar números)
+IDENTITY_SCHEMA = {column: 'text' for columns in IDENTITY_COLUMNS.values() for column in columns}
+
+AD_CAMPAIGNS_SCHEMA = {
+    'id_campanha': 'text',
+    'nome_campanha': 'text',
+    'id_conta': 'text',
+    'nome_conta': 'text',
+    'objetivo': 'text',
+    'status': 'text',
+    'categoria': 'category',
+}
+
+AD_METRICS_SCHEMA = {
+    'data': 'date',
+    'id_campanha': 'text',
+    'id_conta': 'text',
+    'impressoes': 'int',
+    'cliques': 'int',
+    'conversoes': 'int',
+    'custo': 'float',
+    'valor_conversao': 'float',
+}
+
+SCHEMAS = {
+    (CENTRAL_DADOS, 'central_vendas'): {
+        'Data': {'type': 'date', 'dayfirst': True},
+        # Respostas e UTMs se repetem entre as linhas: categorias ocupam bem menos memória
+        **{fields['vendas']: 'category' for fields in LEAD_SALE_FIELDS.values()},
+        **IDENTITY_SCHEMA,
+    },
+    (CENTRAL_DADOS, 'central_leads'): {
+        'Submitted At': {'type': 'date', 'dayfirst': True},
+        **{fields['leads']: 'category' for fields in LEAD_SALE_FIELDS.values()},
+        'utm_content': 'category',
+        'utm_term': 'category',
+        **IDENTITY_SCHEMA,
+    },
+    (META_ADS, 'campanhas'): AD_CAMPAIGNS_SCHEMA,
+    (META_ADS, 'metricas'): AD_METRICS_SCHEMA,
+    (GOOGLE_ADS, 'campanhas'): AD_CAMPAIGNS_SCHEMA,
+    (GOOGLE_ADS, 'metricas'): {
+        **AD_METRICS_SCHEMA,
+        'rede': 'text',
+        'palavra_chave': 'text',
+    },
+    (INSTAGRAM_INSIGHTS, 'perfil'): {
+        'id_conta': 'text',
+        'nome_usuario': 'text',
+        'seguidores': 'int',
+        'seguindo': 'int',
+        'posts': 'int',
+        'alcance': 'int',
+        'impressoes': 'int',
+        'engajamento': 'float',
+        'data_atualizacao': 'date',
+    },
+    (INSTAGRAM_INSIGHTS, 'metricas_diarias'): {
+        'id_conta': 'text',
+        'data': 'date',
+        'seguidores': 'int',
+        'alcance': 'int',
+        'impressoes': 'int',
+        'visitas_perfil': 'int',
+        'cliques_site': 'int',
+        'novos_seguidores': 'int',
+    },
+    (INSTAGRAM_INSIGHTS, 'posts'): {
+        'id_conta': 'text',
+        'id_post': 'text',
+        'tipo': 'category',
+        'legenda': 'text',
+        'url_imagem': 'text',
+        'data_publicacao': 'date',
+        'curtidas': 'int',
+        'comentarios': 'int',
+        'salvos': 'int',
+        'compartilhamentos': 'int',
+        'alcance': 'int',
+        'impressoes': 'int',
+        'engajamento': 'float',
+    },
+    (YOUTUBE_INSIGHTS, 'canal'): {
+        'id_conta': 'text',
+        'nome_canal': 'text',
+        'inscritos': 'int',
+        'videos': 'int',
+        'visualizacoes': 'int',
+        'horas_assistidas': 'float',
+        'data_atualizacao': 'date',
+    },
+    (YOUTUBE_INSIGHTS, 'metricas_diarias'): {
+        'id_conta': 'text',
+        'data': 'date',
+        'inscritos': 'int',
+        'visualizacoes': 'int',
+        'horas_assistidas': 'float',
+        'novos_inscritos': 'int',
+        'impressoes': 'int',
+        'ctr': 'float',
+    },
+    (YOUTUBE_INSIGHTS, 'videos'): {
+        'id_conta': 'text',
+        'id_video': 'text',
+        'titulo': 'text',
+        'thumbnail': 'text',
+        'categoria': 'category',
+        'duracao': 'text',
+        'data_publicacao': 'date',
+        'visualizacoes': 'int',
+        'likes': 'int',
+        'comentarios': 'int',
+        'compartilhamentos': 'int',
+        'tempo_assistido': 'float',
+        'impressoes': 'int',
+        'ctr': 'float',
+    },
+    (OBJETIVOS_CAMPANHA, 'campanhas'): {
+        'id_campanha': 'text',
+        'nome_campanha': 'text',
+        'plataforma': 'text',
+        'objetivo': 'text',
+        'status': 'text',
+        'descricao': 'text',
+        'data_inicio': 'date',
+        'data_fim': 'date',
+        'data_atualizacao': 'date',
+        'orcamento': 'float',
+        'gasto_atual': 'float',
+        'conversoes_meta': 'int',
+        'conversoes_atual': 'int',
+    },
+}
+
+
+# Função para obter o esquema de uma aba
+def get_schema(spreadsheet_title, worksheet_name):
+    """Retorna {coluna: especificação} da aba (vazio se a aba não tiver esquema)."""
+    schema = SCHEMAS.get((spreadsheet_title, worksheet_name), {})
+    return {col: spec if isinstance(spec, dict) else {'type': spec} for col, spec in schema.items()}
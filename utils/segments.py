@@ -0,0 +1,102 @@
+import numpy as np
+import streamlit as st
+
+# Quantidade de bits ligados em cada byte (contagem sem desempacotar)
+POPCOUNT = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.uint8)
+
+
+class BitmapIndex:
+    """Bitmaps compactados (np.packbits) por valor das colunas categóricas.
+
+    Cada valor vira uma sequência de bits com uma posição por linha. Um filtro
+    com várias condições é avaliado com OR entre os valores escolhidos de uma
+    coluna e AND entre colunas, operando sobre bytes em vez de máscaras
+    booleanas do DataFrame inteiro.
+    """
+
+    def __init__(self, data, columns):
+        self.size = len(data)
+        self.bitmaps = {}
+        self.categories = {}
+
+        for column in columns:
+            if column not in data.columns:
+                continue
+
+            values = data[column].astype('category')
+            self.categories[column] = list(values.cat.categories)
+            self.bitmaps[column] = self._value_bitmaps(values.cat.codes.to_numpy(), values.cat.categories)
+
+    # Bitmaps de todos os valores de uma coluna a partir de um único agrupamento das linhas
+    def _value_bitmaps(self, codes, categories):
+        """Ordena as linhas pelo código uma vez e liga os bits de cada valor só nas suas posições.
+
+        Cada linha é visitada uma única vez, em vez de uma comparação da coluna
+        inteira por valor (custo linhas × valores nas colunas de UTM).
+        """
+        n_bytes = (self.size + 7) // 8
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(categories) + 1))
+
+        bitmaps = {}
+        for code, value in enumerate(categories):
+            rows = order[bounds[code]:bounds[code + 1]]
+            # Posições distintas: somar os bits de cada byte equivale ao OR
+            bits = np.bincount(rows >> 3, weights=np.right_shift(0x80, rows & 7), minlength=n_bytes)
+            bitmaps[value] = bits.astype(np.uint8)
+
+        return bitmaps
+
+    # Bitmap de uma máscara booleana qualquer (ex.: leads convertidos)
+    @staticmethod
+    def from_mask(mask):
+        return np.packbits(np.asarray(mask, dtype=bool))
+
+    # Bitmap com todas as linhas
+    def all(self):
+        return self.from_mask(np.ones(self.size, dtype=bool))
+
+    # Avaliar um filtro {coluna: [valores]}
+    def evaluate(self, conditions):
+        """Retorna o bitmap das linhas que atendem a todas as colunas de `conditions`.
+
+        Colunas com lista vazia são ignoradas; valores inexistentes na coluna
+        não selecionam nenhuma linha.
+        """
+        result = self.all()
+        empty = np.zeros_like(result)
+
+        for column, selected in conditions.items():
+            if not selected:
+                continue
+
+            bitmaps = self.bitmaps.get(column, {})
+            union = empty.copy()
+            for value in selected:
+                union |= bitmaps.get(value, empty)
+
+            result &= union
+
+        return result
+
+    # Quantidade de linhas em um bitmap
+    @staticmethod
+    def count(bitmap):
+        return int(POPCOUNT[bitmap].sum(dtype=np.int64))
+
+    # Máscara booleana de um bitmap, para recortar o DataFrame
+    def mask(self, bitmap):
+        return np.unpackbits(bitmap, count=self.size).astype(bool)
+
+
+# Função para montar os índices de leads e vendas uma vez por carga dos dados
+# Só a carga atual fica em memória: sem limite, cada atualização da aba guardaria mais um par de índices
+@st.cache_resource(show_spinner=False, max_entries=1)
+def build_segment_indexes(data_leads, data_vendas, leads_columns, vendas_columns):
+    """Retorna `(indice_leads, indice_vendas)` sobre as abas completas.
+
+    Os índices só são refeitos quando os dados carregados mudam; o período e
+    os demais filtros da página entram como bitmaps (`from_mask`) combinados
+    com AND ao resultado de `evaluate`.
+    """
+    return BitmapIndex(data_leads, leads_columns), BitmapIndex(data_vendas, vendas_columns)
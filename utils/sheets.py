@@ -0,0 +1,135 @@
+import pandas as pd
+import streamlit as st
+
+from utils.dates import parse_dates
+from utils.schemas import BLANK_CATEGORY, LEAD_SALE_FIELDS, get_schema
+
+# Quantidade de exemplos de valores inválidos exibidos por coluna
+MAX_ERROR_EXAMPLES = 3
+
+
+# Função para converter texto em número no mesmo padrão do gspread
+def _parse_numbers(values):
+    # Vírgula é separador de milhar nos valores formatados do Sheets (ex.: 2,000.1)
+    return pd.to_numeric(values.str.replace(',', '', regex=False), errors='coerce')
+
+
+# Função para decodificar uma coluna de texto no tipo declarado
+def decode_column(values, spec):
+    """Converte a Series de texto cru no tipo de `spec`.
+
+    Retorna `(coluna, invalidos)`, onde `invalidos` marca as células
+    preenchidas que não puderam ser convertidas.
+    """
+    column_type = spec.get('type', 'auto')
+    blank = values.str.strip() == ''
+
+    if column_type == 'text':
+        return values, pd.Series(False, index=values.index)
+
+    if column_type == 'category':
+        # Vazios ficam como uma categoria explícita, para não sumirem das contagens
+        return values.mask(blank, BLANK_CATEGORY).astype('category'), pd.Series(False, index=values.index)
+
+    if column_type in ('int', 'float'):
+        decoded = _parse_numbers(values)
+    elif column_type == 'date':
+        # Formato explícito do esquema ou detectado uma vez para a coluna inteira
+        return parse_dates(values, date_format=spec.get('format'), dayfirst=spec.get('dayfirst', False))
+    elif column_type == 'auto':
+        # Sem esquema: número apenas se todas as células preenchidas forem números
+        decoded = _parse_numbers(values)
+        if (decoded.isna() & ~blank).any():
+            return values, pd.Series(False, index=values.index)
+    else:
+        raise ValueError(f"Tipo de coluna desconhecido: {column_type}")
+
+    return decoded, decoded.isna() & ~blank
+
+
+# Função para montar um DataFrame tipado a partir das células cruas da aba
+def decode_values(values, schema):
+    """Converte o retorno de get_all_values() em DataFrame tipado por coluna.
+
+    Retorna `(dados, erros)`, com `erros` listando as colunas que tinham
+    valores incompatíveis com o tipo declarado.
+    """
+    if not values:
+        return pd.DataFrame(), []
+
+    header, rows = values[0], values[1:]
+
+    if len(header) != len(set(header)):
+        duplicated = sorted({col for col in header if header.count(col) > 1})
+        raise ValueError(f"Cabeçalho com colunas repetidas: {', '.join(duplicated)}")
+
+    # Transpor as linhas em colunas sem criar um dicionário por linha
+    columns = list(zip(*rows)) if rows else [()] * len(header)
+
+    data = {}
+    errors = []
+    for col, cells in zip(header, columns):
+        raw = pd.Series(cells, dtype=object)
+        decoded, invalid = decode_column(raw, schema.get(col, {}))
+        data[col] = decoded
+
+        if invalid.any():
+            examples = ', '.join(f"'{value}'" for value in raw[invalid].unique()[:MAX_ERROR_EXAMPLES])
+            errors.append(
+                f"{col}: {invalid.sum()} valor(es) incompatível(is) com o tipo "
+                f"{schema[col]['type']} (ex.: {examples})"
+            )
+
+    return pd.DataFrame(data), errors
+
+
+# Função para carregar uma aba já tipada pelo esquema registrado
+def read_worksheet(spreadsheet, worksheet_name):
+    """Lê a aba com get_all_values() e aplica o esquema de utils/schemas.py.
+
+    Valores incompatíveis com o tipo declarado viram nulos e são reportados
+    em um aviso, em vez de serem convertidos silenciosamente.
+    """
+    values = spreadsheet.worksheet(worksheet_name).get_all_values()
+    data, errors = decode_values(values, get_schema(spreadsheet.title, worksheet_name))
+
+    if errors:
+        st.warning(
+            f"Valores inválidos na aba '{worksheet_name}' de {spreadsheet.title}:\n\n"
+            + "\n".join(f"- {error}" for error in errors)
+        )
+
+    return data
+
+
+# Função para usar o mesmo dicionário de categorias em colunas equivalentes
+def share_categories(left, right, column_pairs):
+    """Aplica às colunas `(coluna_left, coluna_right)` a união das categorias das duas.
+
+    Com o mesmo dicionário, value_counts e comparações entre os dois
+    DataFrames se alinham pelos códigos, sem reconciliar textos.
+    """
+    for left_column, right_column in column_pairs:
+        if left_column not in left.columns or right_column not in right.columns:
+            continue
+
+        left_values = left[left_column].astype('category')
+        right_values = right[right_column].astype('category')
+        dtype = pd.CategoricalDtype(left_values.cat.categories.union(right_values.cat.categories))
+
+        left[left_column] = left_values.astype(dtype)
+        right[right_column] = right_values.astype(dtype)
+
+    return left, right
+
+
+# Função para carregar as abas de vendas e leads da central de dados
+def read_sales_and_leads(spreadsheet):
+    """Lê 'central_vendas' e 'central_leads' com categorias compartilhadas entre as duas."""
+    data_vendas = read_worksheet(spreadsheet, 'central_vendas')
+    data_leads = read_worksheet(spreadsheet, 'central_leads')
+
+    column_pairs = [(fields['leads'], fields['vendas']) for fields in LEAD_SALE_FIELDS.values()]
+    data_leads, data_vendas = share_categories(data_leads, data_vendas, column_pairs)
+
+    return data_vendas, data_leads
@@ -0,0 +1,92 @@
+import numpy as np
+
+# Quantil da normal para 95% de confiança
+Z_95 = 1.959963984540054
+
+# Nível de significância usado para marcar diferenças em relação à taxa geral
+ALPHA = 0.05
+
+# Colunas acrescentadas por add_significance
+SIGNIFICANCE_COLUMNS = ['IC 95% Inf (%)', 'IC 95% Sup (%)', 'z vs Geral', 'p-valor', 'Diferença']
+
+
+# Função complementar de erro vetorizada (sem depender do scipy).
+# Aproximação de Chebyshev com erro relativo < 1,2e-7 (Numerical Recipes, erfcc).
+def _erfc(x):
+    x = np.asarray(x, dtype=np.float64)
+    z = np.abs(x)
+    t = 1.0 / (1.0 + 0.5 * z)
+    poly = -z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (
+        -0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (
+            -0.82215223 + t * 0.17087277))))))))
+    result = t * np.exp(poly)
+    return np.where(x >= 0, result, 2.0 - result)
+
+
+# Função para calcular intervalos de Wilson de várias proporções de uma vez
+def wilson_interval(successes, trials, z=Z_95):
+    """Retorna `(inferior, superior)` em frações; linhas sem tentativas ficam NaN.
+
+    Ao contrário do intervalo normal, o de Wilson continua dentro de [0, 1] e
+    fica largo quando a amostra é pequena (ex.: 1 venda em 3 leads).
+    """
+    successes = np.asarray(successes, dtype=np.float64)
+    trials = np.asarray(trials, dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = successes / trials
+        denominator = 1 + z ** 2 / trials
+        center = (rate + z ** 2 / (2 * trials)) / denominator
+        margin = z * np.sqrt(rate * (1 - rate) / trials + z ** 2 / (4 * trials ** 2)) / denominator
+
+    valid = trials > 0
+    return np.where(valid, center - margin, np.nan), np.where(valid, center + margin, np.nan)
+
+
+# Função para comparar cada grupo com o restante da base
+def two_proportion_test(successes, trials, total_successes, total_trials):
+    """Teste z de duas proporções de cada grupo contra os demais leads.
+
+    Retorna `(z, p_valor)`. O qui-quadrado da tabela 2×2 (grupo × demais) com
+    1 grau de liberdade é `z²` e tem o mesmo p-valor. Grupos que cobrem a base
+    inteira ou sem variação na taxa ficam NaN.
+    """
+    successes = np.asarray(successes, dtype=np.float64)
+    trials = np.asarray(trials, dtype=np.float64)
+    rest_successes = total_successes - successes
+    rest_trials = total_trials - trials
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pooled = total_successes / total_trials
+        se = np.sqrt(pooled * (1 - pooled) * (1 / trials + 1 / rest_trials))
+        z = (successes / trials - rest_successes / rest_trials) / se
+
+    z = np.where((trials > 0) & (rest_trials > 0) & (se > 0), z, np.nan)
+    p_value = _erfc(np.abs(z) / np.sqrt(2))
+
+    return z, np.where(np.isnan(z), np.nan, p_value)
+
+
+# Função para anexar intervalo e significância a uma tabela de contagens
+def add_significance(table, successes, trials, total_successes, total_trials, alpha=ALPHA):
+    """Acrescenta a `table` as colunas de IC 95% (em %), z, p-valor e a direção da diferença.
+
+    `successes` e `trials` são nomes de colunas de `table`; todas as linhas são
+    calculadas em uma única passada, então `table` pode empilhar vários campos.
+    """
+    table = table.copy()
+    low, high = wilson_interval(table[successes], table[trials])
+    z, p_value = two_proportion_test(table[successes], table[trials], total_successes, total_trials)
+
+    table['IC 95% Inf (%)'] = low * 100
+    table['IC 95% Sup (%)'] = high * 100
+    table['z vs Geral'] = z
+    table['p-valor'] = p_value
+    significant = p_value < alpha
+    table['Diferença'] = np.select(
+        [significant & (z > 0), significant & (z < 0)],
+        ['Acima da média', 'Abaixo da média'],
+        default='Não significativa'
+    )
+
+    return table
@@ -0,0 +1,74 @@
+import streamlit as st
+
+from utils.formatting import show_table
+from utils.pagination import paginate
+
+ORDER_OPTIONS = ["Decrescente", "Crescente"]
+
+
+# Função para filtrar as linhas que contêm um texto em alguma coluna textual
+def filter_rows(data, text):
+    """Mantém as linhas em que alguma coluna de texto contém `text` (sem diferenciar maiúsculas)."""
+    text = text.strip()
+    text_columns = data.select_dtypes(include=['object', 'string', 'category']).columns
+
+    if not text or len(text_columns) == 0:
+        return data
+
+    matches = None
+    for col in text_columns:
+        column_matches = data[col].astype('string').str.contains(text, case=False, regex=False, na=False)
+        matches = column_matches if matches is None else matches | column_matches
+
+    return data[matches]
+
+
+# Fragmento de tabela paginada: filtro, ordenação e página são aplicados no servidor
+@st.fragment
+def show_paginated_table(data, formats, labels=None, key="table", page_size=50, sort_by=None, ascending=False):
+    """Exibe `data` paginada, enviando ao navegador apenas a página atual.
+
+    O filtro de texto e a ordenação são aplicados às colunas tipadas antes do
+    recorte da página, então valem para a tabela inteira e não só para as
+    linhas visíveis.
+    """
+    labels = labels or {}
+    sort_options = list(data.columns)
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+
+    with col1:
+        search_text = st.text_input("Filtrar", key=f"{key}_filtro", placeholder="Buscar nas colunas de texto")
+
+    with col2:
+        sort_column = st.selectbox(
+            "Ordenar por",
+            options=sort_options,
+            index=sort_options.index(sort_by) if sort_by in sort_options else 0,
+            format_func=lambda col: labels.get(col, col),
+            key=f"{key}_ordenar"
+        )
+
+    with col3:
+        order = st.selectbox(
+            "Ordem",
+            options=ORDER_OPTIONS,
+            index=0 if not ascending else 1,
+            key=f"{key}_ordem"
+        )
+
+    filtered = filter_rows(data, search_text)
+    filtered = filtered.sort_values(
+        sort_column,
+        ascending=(order == "Crescente"),
+        na_position='last',
+        kind='stable'
+    )
+
+    if filtered.empty:
+        st.info("Nenhuma linha corresponde ao filtro.")
+        return
+
+    page = paginate(filtered, page_size, key=f"{key}_pagina", label="linhas")
+
+    show_table(page, formats=formats, labels=labels, use_container_width=True, key=key)